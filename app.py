@@ -1,4 +1,5 @@
-from flask import Flask, render_template, g
+import click
+from flask import Flask, current_app, render_template
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from config import Config
@@ -6,13 +7,18 @@ from db import db
 
 # Import models
 from models.user import User
-from models.restaurant import Restaurant
+from models.restaurant import Restaurant, RestaurantHours
 from models.menu import Menu
 from models.cart import Cart
-from models.order import Order, OrderItem
+from models.order import Order, OrderItem, OrderDailyRollup, OrderNumberSequence, OrderStatusEvent
 
 # Auth utility
 from utils.auth import get_current_user
+from utils.query_budget import init_query_budget
+from dao.catalog_cache import init_catalog_cache
+from dao.cart_summary import init_cart_summary
+from dao.dispatch import init_dispatch
+from utils.geo import init_geocoder
 
 # Import blueprints
 from controllers.auth_controller import auth_bp
@@ -24,6 +30,7 @@ from controllers.public_controller import public_bp
 from controllers.cart_controller import cart_bp
 from controllers.checkout_controller import checkout_bp
 from controllers.dashboard_controller import dashboard_bp
+from controllers.events_controller import events_bp
 
 from datetime import datetime
 
@@ -35,6 +42,11 @@ def create_app():
     # Initialize database + migration
     db.init_app(app)
     migrate = Migrate(app, db)
+    init_query_budget(app)
+    init_catalog_cache(app)
+    init_cart_summary(app)
+    init_geocoder(app)
+    init_dispatch(app)
 
     # Initialize Flask-Login
     login_manager = LoginManager()
@@ -44,6 +56,10 @@ def create_app():
 
     @login_manager.user_loader
     def load_user(user_id):
+        # Share the request's user with g.current_user instead of loading it again
+        user = get_current_user()
+        if user is not None and str(user.id) == str(user_id):
+            return user
         return db.session.get(User, int(user_id))
 
     # Register blueprints
@@ -56,15 +72,12 @@ def create_app():
     app.register_blueprint(cart_bp, url_prefix="/cart")
     app.register_blueprint(checkout_bp)
     app.register_blueprint(dashboard_bp)
+    app.register_blueprint(events_bp)
 
-    # Global user load
-    @app.before_request
-    def load_current_user():
-        g.current_user = get_current_user()
-
+    # Current user is loaded lazily, once per request (see utils.auth)
     @app.context_processor
     def inject_user():
-        return dict(current_user=g.current_user)
+        return dict(current_user=get_current_user())
 
     # Error handlers
     @app.errorhandler(404)
@@ -80,6 +93,95 @@ def create_app():
         db.session.rollback()
         return render_template("errors/500.html"), 500
 
+    # CLI commands
+    @app.cli.command("backfill-order-rollup")
+    def backfill_order_rollup():
+        """Rebuild order_daily_rollup from the orders table"""
+        from dao.order_dao import OrderDAO
+        buckets = OrderDAO().rebuild_daily_rollup()
+        if buckets is None:
+            print("Order rollup backfill failed.")
+        else:
+            print(f"Order rollup rebuilt: {buckets} buckets.")
+
+    @app.cli.command("reconcile-restaurant-counters")
+    @click.option("--interval", default=0, help="Repeat every N seconds (0 runs once)")
+    def reconcile_restaurant_counters(interval):
+        """Recompute restaurant order/revenue/rating counters from orders"""
+        import time
+        from dao.order_dao import OrderDAO
+        order_dao = OrderDAO()
+        while True:
+            corrected = order_dao.reconcile_restaurant_counters()
+            db.session.remove()
+            if corrected is None:
+                print("Restaurant counter reconciliation failed.")
+            else:
+                print(f"Restaurant counters reconciled: {corrected} corrected.")
+            if not interval:
+                break
+            time.sleep(interval)
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index():
+        """Create and repopulate the restaurant/menu full-text index"""
+        from dao.search_index import Fts5SearchIndex, reset_search_index
+        if db.engine.dialect.name != "sqlite":
+            print("Full-text index is only available on SQLite; searches use ILIKE.")
+            return
+        rows = Fts5SearchIndex().rebuild()
+        reset_search_index()
+        print(f"Search index rebuilt: {rows} rows.")
+
+    @app.cli.command("assign-orders")
+    @click.option("--interval", default=0, help="Repeat every N seconds (0 runs once)")
+    def assign_orders(interval):
+        """Batch-assign open pickups to idle couriers"""
+        import time
+        from dao.assignment import BatchAssigner
+        assigner = BatchAssigner()
+        while True:
+            summary = assigner.run()
+            db.session.remove()
+            print(f"Assigned {summary['assigned']} of {summary['orders']} open orders "
+                  f"to {summary['couriers']} idle couriers (avg pickup {summary['avg_pickup_km']} km).")
+            if not interval:
+                break
+            time.sleep(interval)
+
+    @app.cli.command("simulate-assignment")
+    @click.option("--couriers", default=60, help="Simulated couriers")
+    @click.option("--minutes", default=240, help="Simulated shift length")
+    @click.option("--rate", default=1.5, help="Orders per minute")
+    @click.option("--seed", default=42, help="Random seed")
+    def simulate_assignment(couriers, minutes, rate, seed):
+        """Replay one synthetic shift under greedy claiming and batch assignment"""
+        from utils.dispatch_simulator import replay
+        for policy in ("greedy", "batch"):
+            result = replay(policy, couriers=couriers, minutes=minutes, orders_per_minute=rate,
+                            radius_km=app.config["MAX_DELIVERY_DISTANCE"],
+                            wait_weight=app.config["DISPATCH_WAIT_WEIGHT"], seed=seed)
+            print(f"{policy:>6}: {result['assigned']}/{result['orders']} assigned, "
+                  f"{result['throughput_per_hour']}/h, avg pickup wait {result['avg_pickup_wait_min']} min, "
+                  f"p90 {result['p90_pickup_wait_min']} min, {result['left_open']} left open")
+
+    @app.cli.command("simulate-dispatch")
+    @click.option("--couriers", default=5000, help="Simulated couriers")
+    @click.option("--orders", default=5000, help="Simulated open pickups")
+    @click.option("--radius", default=None, type=float, help="Search radius in km (default MAX_DELIVERY_DISTANCE)")
+    @click.option("--seed", default=42, help="Random seed")
+    def simulate_dispatch(couriers, orders, radius, seed):
+        """Benchmark the dispatch grid index against a linear scan on synthetic data"""
+        from utils.dispatch_simulator import benchmark_grid
+        radius = radius or app.config["MAX_DELIVERY_DISTANCE"]
+        result = benchmark_grid(couriers=couriers, orders=orders, radius_km=radius,
+                                cell_km=app.config["DISPATCH_GRID_CELL_KM"], seed=seed)
+        print(f"{orders} pickups, {couriers} couriers, radius {radius} km")
+        print(f"grid build: {result['build_ms']:.1f} ms")
+        print(f"grid rank:  {result['rank_ms']:.1f} ms total, {result['rank_us_per_courier']:.0f} us per courier")
+        print(f"linear scan (extrapolated): {result['scan_ms']:.1f} ms total")
+        print(f"mismatches vs linear scan on {result['sampled']} couriers: {result['mismatches']}")
+
     return app
 
 
@@ -198,7 +300,6 @@ def seed_data():
             name=r["name"],
             description=r["description"],
             cuisine=r["cuisine"],
-            rating=r["rating"],
             delivery_time=r["delivery_time"],
             type=r["type"],
             address=r["address"],
@@ -210,9 +311,14 @@ def seed_data():
             image=restaurant_images[i],
             is_verified=True,
         )
+        restaurant.seed_rating(r["rating"], current_app.config.get('RATING_PRIOR_WEIGHT', 5))
+        restaurant.refresh_hours()
         db.session.add(restaurant)
 
     db.session.commit()
+    # Score the seeded ratings
+    from dao.order_dao import OrderDAO
+    OrderDAO().reconcile_restaurant_counters()
 
     # Menu items
     sample_menus = [
@@ -243,6 +349,10 @@ def seed_data():
 
     db.session.commit()
 
+    # Seeded rows bypass the DAOs, so index them in one pass
+    from dao.search_index import get_search_index
+    get_search_index().rebuild()
+
     print("Database seeded successfully!")
     print("Login credentials:")
     print("Admin: admin / admin123")
@@ -21,6 +21,31 @@ class Config:
     SESSION_USE_SIGNER = True
     SESSION_KEY_PREFIX = 'foodhub:'
     PERMANENT_SESSION_LIFETIME = 86400  # 24 hours
+    # Seconds a signed role/active snapshot in the session is trusted before the user is re-read (0 disables)
+    AUTH_SNAPSHOT_MAX_AGE = int(os.environ.get('AUTH_SNAPSHOT_MAX_AGE') or 300)
+    
+    # Public catalog cache; CATALOG_CACHE_BACKEND may be a redis-py client
+    # or utils.cache.LocalCacheBackend() to share entries between workers
+    CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL') or 300)  # seconds
+    CATALOG_CACHE_SIZE = 2048
+    CATALOG_CACHE_BACKEND = None
+
+    # Per-user cart summary behind the cart badge and totals. Set
+    # CART_SUMMARY_CACHE_BACKEND to a redis-py client when running more than
+    # one worker; without it each worker keeps its own copy and only sees
+    # another worker's menu edits once the short TTL expires
+    CART_SUMMARY_CACHE_TTL = int(os.environ.get('CART_SUMMARY_CACHE_TTL') or 30)  # seconds
+    CART_SUMMARY_CACHE_SIZE = 10000
+    CART_SUMMARY_CACHE_BACKEND = None
+    CART_BATCH_MAX_ITEMS = 50  # lines or operations per /cart/add, /cart/update or /cart/batch request
+
+    # Order status event stream (/events/orders)
+    EVENT_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+    # Every open stream holds a worker thread (a whole sync worker) for up to
+    # EVENT_STREAM_MAX_AGE seconds at a time; run the app with threaded or
+    # gevent workers, and keep EVENT_STREAM_MAX_CLIENTS below the thread count
+    EVENT_STREAM_MAX_AGE = 300  # seconds before the browser is asked to reconnect
+    EVENT_STREAM_MAX_CLIENTS = 50  # open streams per process; more get a 503 (0 = unlimited)
     
     # Upload configuration
     UPLOAD_FOLDER = 'static/uploads'
@@ -39,10 +64,29 @@ class Config:
     ORDERS_PER_PAGE = 20
     USERS_PER_PAGE = 25
     
+    # Query budget: max SQL statements per request (0 disables the check)
+    SQL_QUERY_BUDGET = int(os.environ.get('SQL_QUERY_BUDGET') or 0)
+    SQL_QUERY_BUDGET_STRICT = os.environ.get('SQL_QUERY_BUDGET_STRICT', 'false').lower() in ['true', 'on', '1']
+    
     # Business settings
     TAX_RATE = 0.05  # 5% tax
+    ORDER_NUMBER_BLOCK_SIZE = 50  # order numbers reserved per worker at a time
     DEFAULT_DELIVERY_TIME = 45  # minutes
-    MAX_DELIVERY_DISTANCE = 10  # km
+    MAX_DELIVERY_DISTANCE = 10  # km, also the courier pickup search radius
+    # Restaurant rating_score: ratings are averaged with RATING_PRIOR_WEIGHT
+    # virtual ratings of RATING_PRIOR_MEAN (reconcile after changing these)
+    RATING_PRIOR_MEAN = 3.5
+    RATING_PRIOR_WEIGHT = 5
+
+    # Dispatch: GEOCODER is a callable(address) -> (lat, lng) or None; unset disables geocoding
+    GEOCODER = None
+    GEOCODER_CACHE_SIZE = 4096
+    DISPATCH_GRID_CELL_KM = 2.0
+    DISPATCH_REFRESH_SECONDS = 5  # min seconds between reloads after new pickups
+    DISPATCH_INDEX_MAX_AGE = 30  # seconds before the pickup index is always reloaded
+    DISPATCH_BATCH_LIMIT = 200  # max orders and couriers per batch assignment
+    DISPATCH_WAIT_WEIGHT = 0.05  # km of extra pickup distance worth one minute of order wait
+    DISPATCH_LOCATION_MAX_AGE = 600  # seconds a courier location counts as current
     
     # Role permissions
     ROLE_PERMISSIONS = {
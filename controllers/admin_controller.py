@@ -4,12 +4,15 @@ from dao.user_dao import UserDAO
 from dao.restaurant_dao import RestaurantDAO
 from dao.order_dao import OrderDAO
 from models.user import User
+from utils.cache import TTLCache
+from utils.timeseries import GRANULARITIES
 from datetime import datetime, timedelta
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 user_dao = UserDAO()
 restaurant_dao = RestaurantDAO()
 order_dao = OrderDAO()
+analytics_cache = TTLCache(ttl=300)
 
 @admin_bp.route('/dashboard')
 @login_required
@@ -29,15 +32,15 @@ def dashboard():
     recent_orders = order_dao.get_recent_orders(limit=10)
     
     # Get daily statistics for the last 7 days
-    daily_stats = []
-    for i in range(7):
-        date = datetime.now().date() - timedelta(days=i)
-        day_stats = order_dao.get_daily_statistics(date)
-        daily_stats.append({
-            'date': date.strftime('%Y-%m-%d'),
+    today = datetime.now().date()
+    daily_stats = [
+        {
+            'date': day_stats['date'].strftime('%Y-%m-%d'),
             'orders': day_stats['orders'],
             'revenue': day_stats['revenue']
-        })
+        }
+        for day_stats in reversed(order_dao.get_daily_rollup(today - timedelta(days=6), today))
+    ]
     
     stats = {
         'total_users': total_users,
@@ -65,7 +68,8 @@ def users():
     role_filter = request.args.get('role', '')
     search = request.args.get('search', '')
     
-    users = user_dao.get_all_users(page=page, per_page=20, role_filter=role_filter, search=search)
+    users = user_dao.get_all_users(page=page, per_page=20, role_filter=role_filter, search=search,
+                                   cursor=_cursor_param())
     
     return render_template('admin/users.html', 
                          users=users, 
@@ -104,7 +108,8 @@ def restaurants():
         page=page, 
         per_page=20, 
         search=search, 
-        status_filter=status_filter
+        status_filter=status_filter,
+        cursor=_cursor_param()
     )
     
     return render_template('admin/restaurants.html',
@@ -136,22 +141,94 @@ def orders():
     page = request.args.get('page', 1, type=int)
     status_filter = request.args.get('status', '')
     
-    orders = order_dao.get_all_orders(page=page, per_page=20, status_filter=status_filter)
+    orders = order_dao.get_all_orders(page=page, per_page=20, status_filter=status_filter, cursor=_cursor_param())
     
     return render_template('admin/orders.html', orders=orders, status_filter=status_filter)
 
+def _cursor_param():
+    """Admin listings page by cursor unless ?page=N asks for numbered pages"""
+    if 'page' in request.args and 'cursor' not in request.args:
+        return None
+    return request.args.get('cursor', '')
+
+def _total_param():
+    """?total=exact or ?total=approx adds a row count to keyset pages"""
+    total = request.args.get('total', '')
+    return total if total in ('exact', 'approx') else False
+
+def _page_json(pagination, serialize):
+    """JSON body for either a keyset or a numbered page"""
+    if hasattr(pagination, 'next_cursor'):
+        return pagination.to_dict(serialize)
+    return {
+        'items': [serialize(item) for item in pagination.items],
+        'per_page': pagination.per_page,
+        'page': pagination.page,
+        'pages': pagination.pages,
+        'total': pagination.total
+    }
+
+@admin_bp.route('/api/orders')
+@login_required
+@admin_required
+def orders_api():
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+    orders = order_dao.get_all_orders(
+        page=request.args.get('page', 1, type=int), per_page=per_page,
+        status_filter=request.args.get('status', ''), cursor=_cursor_param(),
+        total=_total_param(), profile='order_list'
+    )
+    return jsonify(_page_json(orders, lambda order: order.to_dict()))
+
+@admin_bp.route('/api/users')
+@login_required
+@admin_required
+def users_api():
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+    users = user_dao.get_all_users(
+        page=request.args.get('page', 1, type=int), per_page=per_page,
+        role_filter=request.args.get('role', ''), search=request.args.get('search', ''),
+        cursor=_cursor_param(), total=_total_param()
+    )
+    return jsonify(_page_json(users, lambda user: user.to_dict()))
+
+def _analytics_params():
+    days = min(max(request.args.get('days', 30, type=int), 1), 365)
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        granularity = 'day'
+    return days, granularity
+
+def _build_time_series(days, granularity):
+    """One grouped query per series, cached so repeated chart loads skip the database"""
+    def build():
+        return {
+            'days': days,
+            'granularity': granularity,
+            'user_growth': user_dao.get_user_growth_data(days=days, granularity=granularity),
+            'order_trends': order_dao.get_order_trends(days=days, granularity=granularity),
+            'revenue_analytics': order_dao.get_revenue_analytics(days=days, granularity=granularity),
+            'delivery_performance': order_dao.get_delivery_performance_metrics(days=days, granularity=granularity),
+            'stage_durations': order_dao.get_stage_durations(days=days)
+        }
+    return analytics_cache.get_or_set(('time_series', days, granularity), build)
+
 @admin_bp.route('/analytics')
 @login_required
 @admin_required
 def analytics():
+    days, granularity = _analytics_params()
+    
     # Get comprehensive analytics data
-    analytics_data = {
-        'user_growth': user_dao.get_user_growth_data(),
-        'order_trends': order_dao.get_order_trends(),
-        'revenue_analytics': order_dao.get_revenue_analytics(),
-        'popular_cuisines': restaurant_dao.get_cuisine_popularity(),
-        'top_restaurants': restaurant_dao.get_top_restaurants_by_revenue(),
-        'delivery_performance': order_dao.get_delivery_performance_metrics()
-    }
+    analytics_data = dict(_build_time_series(days, granularity))
+    analytics_data['popular_cuisines'] = restaurant_dao.get_cuisine_popularity()
+    analytics_data['top_restaurants'] = restaurant_dao.get_top_restaurants_by_revenue()
     
-    return render_template('admin/analytics.html', analytics_data=analytics_data)
\ No newline at end of file
+    return render_template('admin/analytics.html', analytics_data=analytics_data)
+
+@admin_bp.route('/api/analytics')
+@login_required
+@admin_required
+def analytics_api():
+    days, granularity = _analytics_params()
+    return jsonify(_build_time_series(days, granularity))
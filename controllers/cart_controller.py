@@ -1,9 +1,45 @@
 from flask import Blueprint, request, jsonify, current_app
 from db import db
-from models.cart import Cart
+from models.cart import Cart, InvalidCartItem, CartItemNotFound
 from flask_login import current_user, login_required
+from dao.cart_dao import CartDAO
+from dao.cart_summary import cart_summary
 
 cart_bp = Blueprint("cart", __name__)
+cart_dao = CartDAO()
+
+
+def _limited(items, name):
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise InvalidCartItem(f"{name} must be a list of objects")
+    limit = current_app.config.get("CART_BATCH_MAX_ITEMS", 50)
+    if len(items) > limit:
+        raise InvalidCartItem(f"At most {limit} {name} per request")
+    return items
+
+
+def _items(data):
+    """The request's line list: data["items"] for a batch, otherwise data itself as one line"""
+    return _limited(data.get("items") if "items" in data else [data], "items")
+
+
+def _operation(item):
+    """Request operation object to the tuple CartDAO.apply_operations takes"""
+    op = item.get("op")
+    if op == "add":
+        if not item.get("menu_id"):
+            raise InvalidCartItem("menu_id is required")
+        return ("add", item["menu_id"], item.get("quantity", 1), item.get("customization"))
+    if op in ("update", "remove") and "cart_id" not in item:
+        raise InvalidCartItem("cart_id is required")
+    if op == "update":
+        return ("update", item["cart_id"], item.get("quantity"), item.get("customization"))
+    if op == "remove":
+        return ("remove", item["cart_id"])
+    if op == "clear":
+        return ("clear",)
+    raise InvalidCartItem(f"Unknown cart operation: {op}")
+
 
 # ----------------------------
 # Count items in cart
@@ -12,63 +48,89 @@ cart_bp = Blueprint("cart", __name__)
 @login_required
 def cart_count():
     try:
-        count = Cart.query.filter_by(user_id=current_user.id).count()
-        return jsonify({"count": count})
+        summary = cart_summary.get(current_user.id)
+        return jsonify({"count": summary["item_count"], "quantity": summary["quantity"], "total": summary["total"]})
     except Exception as e:
         current_app.logger.error(f"Cart Count Error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
 # ----------------------------
-# Add item to cart
+# Add one item ({menu_id, quantity, customization}) or many ({items: [...]})
 # ----------------------------
 @cart_bp.route('/add', methods=['POST'])
 @login_required
 def add_to_cart():
-    try:
-        data = request.get_json()
-        current_app.logger.debug(f"Cart Add Payload: {data}")
+    data = request.get_json(silent=True) or {}
+    current_app.logger.debug(f"Cart Add Payload: {data}")
 
-        menu_id = data.get('menu_id')
-        quantity = data.get('quantity', 1)
-
-        if not menu_id:
+    try:
+        items = _items(data)
+        if any(not item.get("menu_id") for item in items):
             return jsonify({"error": "menu_id is required"}), 400
+        lines = cart_dao.add_items(current_user.id, [
+            (item["menu_id"], item.get("quantity", 1), item.get("customization")) for item in items
+        ])
+    except InvalidCartItem as e:
+        return jsonify({"error": str(e)}), 400
+    if lines is None:
+        return jsonify({"error": "Failed to add to cart"}), 500
 
-        cart_item = Cart(user_id=current_user.id, menu_id=menu_id, quantity=quantity)
-        db.session.add(cart_item)
-        db.session.commit()
-
-        return jsonify({"message": "Item added to cart successfully!"}), 201
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Cart Add Error: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+    return jsonify({
+        "message": "Item added to cart successfully!",
+        "cart_ids": sorted(lines.values()),
+        "cart": cart_summary.get(current_user.id)
+    }), 201
 
 
 # ----------------------------
-# Update item quantity/customization
+# Update quantity/customization of one item ({cart_id, ...}) or many ({items: [...]})
 # ----------------------------
 @cart_bp.route("/update", methods=["POST"])
 @login_required
 def update_cart():
-    data = request.get_json()
-    if not data or "cart_id" not in data:
-        return jsonify({"error": "cart_id is required"}), 400
+    data = request.get_json(silent=True) or {}
 
-    cart_item = Cart.query.filter_by(id=data["cart_id"], user_id=current_user.id).first()
-    if not cart_item:
-        return jsonify({"error": "Cart item not found"}), 404
+    try:
+        items = _items(data)
+        if any("cart_id" not in item for item in items):
+            return jsonify({"error": "cart_id is required"}), 400
+        lines = cart_dao.update_items(current_user.id, [
+            (item["cart_id"], item.get("quantity"), item.get("customization")) for item in items
+        ])
+    except CartItemNotFound as e:
+        return jsonify({"error": str(e)}), 404
+    except InvalidCartItem as e:
+        return jsonify({"error": str(e)}), 400
+    if lines is None:
+        return jsonify({"error": "Failed to update cart"}), 500
+
+    return jsonify({
+        "message": "Cart updated",
+        "quantities": {str(cart_id): quantity for cart_id, quantity in lines.items()},
+        "cart": cart_summary.get(current_user.id)
+    }), 200
+
+
+# ----------------------------
+# Apply an ordered list of add/update/remove/clear operations atomically
+# ----------------------------
+@cart_bp.route("/batch", methods=["POST"])
+@login_required
+def batch():
+    data = request.get_json(silent=True) or {}
 
     try:
-        cart_item.quantity = data.get("quantity", cart_item.quantity)
-        cart_item.customization = data.get("customization", getattr(cart_item, "customization", None))
-        db.session.commit()
-        return jsonify({"message": "Cart updated"}), 200
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Cart Update Error: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        operations = [_operation(item) for item in _limited(data.get("operations"), "operations")]
+        applied = cart_dao.apply_operations(current_user.id, operations)
+    except CartItemNotFound as e:
+        return jsonify({"error": str(e)}), 404
+    except InvalidCartItem as e:
+        return jsonify({"error": str(e)}), 400
+    if applied is None:
+        return jsonify({"error": "Failed to update cart"}), 500
+
+    return jsonify({"message": "Cart updated", "cart": cart_summary.get(current_user.id)}), 200
 
 
 # ----------------------------
@@ -88,6 +150,7 @@ def remove_cart():
     try:
         db.session.delete(cart_item)
         db.session.commit()
+        cart_summary.line_removed(current_user.id, cart_item.id)
         return jsonify({"message": "Cart item removed"}), 200
     except Exception as e:
         db.session.rollback()
@@ -104,6 +167,7 @@ def clear_cart():
     try:
         Cart.query.filter_by(user_id=current_user.id).delete()
         db.session.commit()
+        cart_summary.cleared(current_user.id)
         return jsonify({"message": "Cart cleared"}), 200
     except Exception as e:
         db.session.rollback()
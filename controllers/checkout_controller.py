@@ -1,10 +1,9 @@
-from flask import Blueprint, request, render_template, redirect, url_for, session, flash
+from flask import Blueprint, request, render_template, redirect, url_for, session, flash, current_app
 from utils.auth import login_required, customer_required, get_current_user
-from models.order import Order, OrderItem
 from dao.cart_dao import CartDAO
 from dao.order_dao import OrderDAO
-from datetime import datetime, timedelta
-from db import db
+from utils.geo import geocoder
+from datetime import datetime
 
 checkout_bp = Blueprint('checkout', __name__, url_prefix='/checkout')
 cart_dao = CartDAO()
@@ -39,7 +38,7 @@ def checkout():
     
     # Calculate totals
     delivery_fee = 0  # Free delivery for demo
-    tax_amount = total * 0.05  # 5% tax
+    tax_amount = total * current_app.config.get('TAX_RATE', 0.05)
     grand_total = total + delivery_fee + tax_amount
     
     return render_template('customer/checkout.html',
@@ -82,87 +81,33 @@ def place_order():
         except ValueError:
             delivery_date = datetime.now().date()
     
-    # Get cart items
-    cart_items = cart_dao.get_cart_items(user.id)
+    # Cached; None when no geocoder is configured or the address is unknown
+    coords = geocoder.geocode(delivery_address, delivery_city, delivery_pincode) or (None, None)
+
+    # Price the cart, create one order per restaurant and clear the cart in one transaction
+    placed_orders = order_dao.place_orders_from_cart(user.id, {
+        'booking_name': booking_name,
+        'booking_email': booking_email,
+        'phone': phone,
+        'delivery_address': delivery_address,
+        'delivery_city': delivery_city,
+        'delivery_pincode': delivery_pincode,
+        'delivery_latitude': coords[0],
+        'delivery_longitude': coords[1],
+        'delivery_date': delivery_date,
+        'delivery_time': delivery_time,
+        'payment_method': payment_method,
+        'special_instructions': special_instructions
+    }, tax_rate=current_app.config.get('TAX_RATE', 0.05),
+        eta_minutes=current_app.config.get('DEFAULT_DELIVERY_TIME', 45))
     
-    if not cart_items:
+    if placed_orders is None:
+        flash('Failed to place order. Please try again.', 'error')
+        return redirect(url_for('checkout.checkout'))
+    
+    if not placed_orders:
         flash('Your cart is empty', 'error')
         return redirect(url_for('customer.cart'))
     
-    # Group items by restaurant
-    restaurants_orders = {}
-    for item in cart_items:
-        restaurant_id = item.menu.restaurant_id
-        if restaurant_id not in restaurants_orders:
-            restaurants_orders[restaurant_id] = []
-        restaurants_orders[restaurant_id].append(item)
-    
-    order_ids = []
-    
-    # Create separate orders for each restaurant
-    for restaurant_id, items in restaurants_orders.items():
-        subtotal = sum(item.get_total_price() for item in items)
-        delivery_fee = 0  # Free delivery
-        tax_amount = subtotal * 0.05  # 5% tax
-        total_amount = subtotal + delivery_fee + tax_amount
-        
-        # Calculate estimated delivery time
-        estimated_delivery = datetime.now() + timedelta(minutes=45)
-        
-        # Create order
-        order = Order(
-            customer_id=user.id,
-            restaurant_id=restaurant_id,
-            total_amount=total_amount,
-            delivery_fee=delivery_fee,
-            tax_amount=tax_amount,
-            booking_name=booking_name,
-            booking_email=booking_email,
-            phone=phone,
-            delivery_address=delivery_address,
-            delivery_city=delivery_city,
-            delivery_pincode=delivery_pincode,
-            delivery_date=delivery_date,
-            delivery_time=delivery_time,
-            payment_method=payment_method,
-            special_instructions=special_instructions,
-            estimated_delivery_time=estimated_delivery
-        )
-        
-        try:
-            db.session.add(order)
-            db.session.flush()  # Get order ID
-            order_id = order.id
-            
-            # Create order items
-            for item in items:
-                order_item = OrderItem(
-                    order_id=order_id,
-                    menu_id=item.menu_id,
-                    quantity=item.quantity,
-                    price=item.menu.get_effective_price(),
-                    customization=item.customization
-                )
-                db.session.add(order_item)
-            
-            order_ids.append(order_id)
-            
-        except Exception as e:
-            print(f"Error creating order: {e}")
-            db.session.rollback()
-            flash('Failed to place order. Please try again.', 'error')
-            return redirect(url_for('checkout.checkout'))
-    
-    # Commit all orders
-    try:
-        db.session.commit()
-        cart_dao.clear_cart(user.id)
-        
-        flash(f'Order placed successfully! Order numbers: {", ".join([f"ORD{oid}" for oid in order_ids])}', 'success')
-        return redirect(url_for('customer.orders'))
-        
-    except Exception as e:
-        print(f"Error committing orders: {e}")
-        db.session.rollback()
-        flash('Failed to place order. Please try again.', 'error')
-        return redirect(url_for('checkout.checkout'))
\ No newline at end of file
+    flash(f'Order placed successfully! Order numbers: {", ".join(order["order_number"] for order in placed_orders)}', 'success')
+    return redirect(url_for('customer.orders'))
@@ -42,26 +42,30 @@ def restaurants():
     search = request.args.get('search', '')
     cuisine = request.args.get('cuisine', '')
     type_filter = request.args.get('type', '')
+    city = request.args.get('city', '')
     sort_by = request.args.get('sort', 'rating')
+    open_now = request.args.get('open') == '1'
     
-    restaurants = restaurant_dao.get_restaurants(
+    restaurants, facets = restaurant_dao.browse_restaurants(
         page=page,
         per_page=12,
         search=search,
         cuisine=cuisine,
         type_filter=type_filter,
-        sort_by=sort_by
+        city=city,
+        sort_by=sort_by,
+        open_now=open_now
     )
     
-    cuisines = restaurant_dao.get_all_cuisines()
-    
     return render_template('customer/restaurants.html',
                          restaurants=restaurants,
-                         cuisines=cuisines,
+                         facets=facets,
                          search=search,
                          selected_cuisine=cuisine,
                          selected_type=type_filter,
-                         sort_by=sort_by)
+                         selected_city=city,
+                         sort_by=sort_by,
+                         open_now=open_now)
 
 @customer_bp.route('/cart')
 @login_required
@@ -129,7 +133,9 @@ def orders():
     page = request.args.get('page', 1, type=int)
     status_filter = request.args.get('status', '')
     
-    orders = order_dao.get_orders_by_user(user.id, page=page, per_page=10, status_filter=status_filter)
+    cursor = request.args.get('cursor')
+    
+    orders = order_dao.get_orders_by_user(user.id, page=page, per_page=10, status_filter=status_filter, cursor=cursor)
     
     return render_template('customer/orders.html', orders=orders, status_filter=status_filter)
 
@@ -138,7 +144,7 @@ def orders():
 @customer_required
 def order_detail(order_id):
     user = get_current_user()
-    order = order_dao.get_order_by_id(order_id)
+    order = order_dao.get_order_by_id(order_id, profile='order_detail')
     
     if not order or order.customer_id != user.id:
         flash('Order not found', 'error')
@@ -146,6 +152,31 @@ def order_detail(order_id):
     
     return render_template('customer/order_detail.html', order=order)
 
+@customer_bp.route('/order/<int:order_id>/rate', methods=['POST'])
+@login_required
+@customer_required
+def rate_order(order_id):
+    user = get_current_user()
+    order = order_dao.get_order_by_id(order_id)
+
+    if not order or order.customer_id != user.id:
+        return jsonify({'error': 'Order not found'}), 404
+    if not order.can_be_rated():
+        return jsonify({'error': 'This order cannot be rated'}), 409
+
+    data = request.get_json(silent=True) or request.form
+    try:
+        rating = int(data.get('rating'))
+    except (TypeError, ValueError):
+        rating = 0
+    if not 1 <= rating <= 5:
+        return jsonify({'error': 'Rating must be between 1 and 5'}), 400
+    review = (data.get('review') or '').strip()[:2000] or None
+
+    if not order_dao.rate_order(order.id, user.id, rating, review):
+        return jsonify({'error': 'This order cannot be rated'}), 409
+    return jsonify({'message': 'Thanks for rating your order!'})
+
 @customer_bp.route('/favorites')
 @login_required
 @customer_required
@@ -1,10 +1,26 @@
 from flask import Blueprint, request, render_template, redirect, url_for, session, flash, jsonify
 from utils.auth import login_required, delivery_person_required, get_current_user
 from dao.order_dao import OrderDAO
+from dao.user_dao import UserDAO
+from dao.dispatch import dispatch_engine
+from models.order import InvalidStatusTransition
 from datetime import datetime
 
 delivery_bp = Blueprint('delivery', __name__, url_prefix='/delivery')
 order_dao = OrderDAO()
+user_dao = UserDAO()
+
+# Longest ranked list shown to a courier
+DISPATCH_RANK_LIMIT = 200
+
+def _available_orders_for(user, page=1, per_page=15):
+    """Open pickups for a courier: nearest first when their location is known"""
+    if user.latitude is None or user.longitude is None:
+        return order_dao.get_available_orders_for_delivery(page=page, per_page=per_page)
+    ranked = dispatch_engine.rank(user.latitude, user.longitude, limit=DISPATCH_RANK_LIMIT)
+    return order_dao.get_available_orders_for_delivery(
+        page=page, per_page=per_page, order_ids=[item['order_id'] for item in ranked]
+    )
 
 @delivery_bp.route('/dashboard')
 @login_required
@@ -19,7 +35,7 @@ def dashboard():
     assigned_orders = order_dao.get_orders_by_delivery_person(user.id, status_filter='assigned')
     
     # ✅ FIX: Fetch available orders (missing earlier)
-    available_orders = order_dao.get_available_orders_for_delivery()   # UPDATED
+    available_orders = _available_orders_for(user)   # UPDATED
     
     # Get recent deliveries
     recent_deliveries = order_dao.get_orders_by_delivery_person(user.id, page=1, per_page=10)
@@ -42,7 +58,7 @@ def orders():
     status_filter = request.args.get('status', '')
     
     orders = order_dao.get_orders_by_delivery_person(
-        user.id, page=page, per_page=15, status_filter=status_filter
+        user.id, page=page, per_page=15, status_filter=status_filter, cursor=request.args.get('cursor')
     )
     
     return render_template('delivery/orders.html', orders=orders, status_filter=status_filter)
@@ -55,7 +71,7 @@ def available_orders():
     page = request.args.get('page', 1, type=int)
     
     # Get orders ready for pickup that don't have a delivery person assigned
-    available_orders = order_dao.get_available_orders_for_delivery(page=page, per_page=15)
+    available_orders = _available_orders_for(user, page=page, per_page=15)
     
     return render_template('delivery/available_orders.html', orders=available_orders)
 
@@ -64,30 +80,56 @@ def available_orders():
 @delivery_person_required
 def accept_order(order_id):
     user = get_current_user()
-    order = order_dao.get_order_by_id(order_id)
-    
-    if not order:
-        flash("Order not found", "danger")   # ✅ Show flash message
-        return redirect(url_for('delivery.dashboard'))   # ✅ Redirect instead of JSON
-    
-    if order.status != 'ready_for_pickup' or order.delivery_person_id:
-        flash("Order not available for pickup", "warning")   # ✅ Flash message
-        return redirect(url_for('delivery.dashboard'))   # ✅ Redirect
-    
-    # Assign delivery person
-    order.delivery_person_id = user.id
-    order.status = 'out_for_delivery'
-    order.pickup_at = datetime.utcnow()
-    
-    if order_dao.update_order(order):
+
+    # Claimed with a single conditional UPDATE, so two couriers can't both win
+    if order_dao.claim_order(order_id, user.id):
         flash("Order accepted successfully", "success")   # ✅ Flash message
     else:
-        flash("Failed to accept order", "danger")   # ✅ Flash message
+        flash("Order not available for pickup", "warning")   # ✅ Flash message
     
     # ✅ Always redirect back to delivery dashboard
     return redirect(url_for('delivery.dashboard'))
 
 
+@delivery_bp.route('/orders/claim', methods=['POST'])
+@login_required
+@delivery_person_required
+def claim_orders():
+    """Claim the next open orders for the current courier in one request"""
+    user = get_current_user()
+    data = request.get_json(silent=True) or {}
+    try:
+        count = min(max(int(data.get('count', 1)), 1), 10)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'count must be a number'}), 400
+
+    if user.latitude is not None and user.longitude is not None:
+        claimed = dispatch_engine.claim_nearest(user, limit=count)
+    else:
+        claimed = order_dao.claim_next_orders(user.id, limit=count, city=user.city)
+    return jsonify({'claimed': claimed, 'requested': count})
+
+@delivery_bp.route('/location', methods=['POST'])
+@login_required
+@delivery_person_required
+def update_location():
+    """Record the courier's current position for nearest-order dispatch"""
+    user = get_current_user()
+    data = request.get_json(silent=True) or {}
+    try:
+        latitude = float(data['latitude'])
+        longitude = float(data['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'latitude and longitude are required'}), 400
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return jsonify({'error': 'Invalid coordinates'}), 400
+
+    user.latitude = latitude
+    user.longitude = longitude
+    user.location_updated_at = datetime.utcnow()
+    if user_dao.update_user(user):
+        return jsonify({'message': 'Location updated'})
+    return jsonify({'error': 'Failed to update location'}), 500
 
 @delivery_bp.route('/order/<int:order_id>/update_status', methods=['POST'])
 @login_required
@@ -101,12 +143,13 @@ def update_delivery_status(order_id):
     
     new_status = request.json.get('status')
     
-    if new_status == 'delivered':
-        order.status = 'delivered'
-        order.delivered_at = datetime.utcnow()
-        order.actual_delivery_time = datetime.utcnow()
-    else:
+    if new_status != 'delivered':
         return jsonify({'error': 'Invalid status'}), 400
+
+    try:
+        order.transition_to('delivered')
+    except InvalidStatusTransition as e:
+        return jsonify({'error': str(e)}), 409
     
     if order_dao.update_order(order):
         return jsonify({'message': 'Delivery status updated successfully'})
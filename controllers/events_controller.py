@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from flask import Blueprint, Response, current_app, stream_with_context
+from utils.auth import login_required, get_current_identity
+from utils.event_bus import event_bus
+from dao.order_dao import OrderDAO
+from dao.restaurant_dao import RestaurantDAO
+from db import db
+
+events_bp = Blueprint('events', __name__, url_prefix='/events')
+order_dao = OrderDAO()
+restaurant_dao = RestaurantDAO()
+
+# Streams currently open in this process (see EVENT_STREAM_MAX_CLIENTS)
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
+
+def _acquire_stream_slot(limit):
+    global _open_streams
+    with _open_streams_lock:
+        if limit and _open_streams >= limit:
+            return False
+        _open_streams += 1
+        return True
+
+
+def _release_stream_slot():
+    global _open_streams
+    with _open_streams_lock:
+        _open_streams -= 1
+
+
+def _order_channels(identity):
+    """Channels a user may listen to: only their own orders, restaurants or pickups"""
+    role = identity['role']
+    if role == 'admin':
+        return ['orders']
+    if role == 'restaurant_owner':
+        restaurants = restaurant_dao.get_restaurants_by_owner(identity['id'], page=None)
+        return [f'restaurant:{restaurant.id}' for restaurant in restaurants]
+    if role == 'delivery_person':
+        # Couriers already on a delivery can't claim, so skip the busy pickup pool;
+        # they pick it up again when the stream is recycled (EVENT_STREAM_MAX_AGE)
+        if order_dao.has_active_delivery(identity['id']):
+            return [f"courier:{identity['id']}"]
+        return [f"courier:{identity['id']}", 'pickup_pool']
+    return [f"customer:{identity['id']}"]
+
+
+@events_bp.route('/orders')
+@login_required
+def order_stream():
+    """Server-sent events for order status changes visible to the current user.
+
+    Each open stream occupies one worker thread for up to
+    EVENT_STREAM_MAX_AGE seconds, after which the browser reconnects. With
+    sync workers that is a whole worker per open page, so at most
+    EVENT_STREAM_MAX_CLIENTS streams run per process; beyond that the
+    request gets a 503 and the page stays static until it is reloaded.
+    """
+    if not _acquire_stream_slot(current_app.config.get('EVENT_STREAM_MAX_CLIENTS', 0)):
+        return Response('Too many open event streams', status=503, headers={'Retry-After': '60'})
+
+    try:
+        channels = _order_channels(get_current_identity())
+    except Exception:
+        _release_stream_slot()
+        raise
+    heartbeat = current_app.config.get('EVENT_STREAM_HEARTBEAT', 15)
+    max_age = current_app.config.get('EVENT_STREAM_MAX_AGE', 300)
+
+    # Don't hold a pooled connection for the lifetime of the stream
+    db.session.remove()
+
+    subscription = event_bus.subscribe(channels)
+
+    def stream():
+        # Ask the browser to reconnect quickly when the stream is recycled
+        yield 'retry: 3000\n\n'
+        deadline = time.monotonic() + max_age
+        while time.monotonic() < deadline:
+            event = subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    def close():
+        subscription.close()
+        _release_stream_slot()
+
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs even if the client disconnects before the generator starts
+    response.call_on_close(close)
+    return response
@@ -1,28 +1,24 @@
 from flask import Blueprint, render_template, request
-from models.restaurant import Restaurant
-from models.menu import Menu
+from dao.restaurant_dao import RestaurantDAO
+from dao.catalog_cache import catalog_cache
 from db import db
 
 # Blueprint for all public-facing routes
 public_bp = Blueprint('public', __name__, url_prefix='/')
+restaurant_dao = RestaurantDAO()
 
 
 @public_bp.route('/')
 def index():
     """Home page showing featured restaurants"""
-    restaurants = (
-        Restaurant.query.filter_by(is_verified=True)
-        .order_by(Restaurant.id.desc())
-        .limit(6)
-        .all()
-    )
+    restaurants = catalog_cache.get_featured_cards()
     return render_template('public/index.html', restaurants=restaurants)
 
 
 @public_bp.route('/restaurant/<int:restaurant_id>')
 def restaurant_detail(restaurant_id):
     """Restaurant detail page with menu"""
-    restaurant = Restaurant.query.get(restaurant_id)
+    restaurant = catalog_cache.get_restaurant(restaurant_id)
 
     if not restaurant:
         return render_template(
@@ -30,12 +26,18 @@ def restaurant_detail(restaurant_id):
             error="Restaurant not found"
         ), 404
 
-    menus = Menu.query.filter_by(restaurant_id=restaurant_id).all()
+    category = request.args.get('category', '')
+    type_filter = request.args.get('type', '')
+    snapshot = catalog_cache.get_menu_snapshot(restaurant_id)
 
     return render_template(
         'public/restaurant_detail.html',
         restaurant=restaurant,
-        menus=menus
+        menu_groups=snapshot.groups(category=category, type_filter=type_filter),
+        has_menu=len(snapshot) > 0,
+        categories=snapshot.categories,
+        selected_category=category,
+        selected_type=type_filter
     )
 
 
@@ -65,11 +67,7 @@ def contact():
 @public_bp.route('/restaurants')
 def restaurants():
     """List all verified restaurants"""
-    restaurants = (
-        Restaurant.query.filter_by(is_verified=True)
-        .order_by(Restaurant.name.asc())
-        .all()
-    )
+    restaurants = catalog_cache.get_restaurant_cards()
     return render_template('public/restaurants.html', restaurants=restaurants)
 
 
@@ -79,31 +77,18 @@ def search():
     query = request.args.get('q', '').strip()
     city = request.args.get('city', '').strip()
     cuisine = request.args.get('cuisine', '').strip()
+    page = request.args.get('page', 1, type=int)
+    open_now = request.args.get('open') == '1'
 
-    restaurants_query = Restaurant.query.filter_by(is_verified=True)
-
-    if query:
-        restaurants_query = restaurants_query.filter(
-            (Restaurant.name.ilike(f"%{query}%")) |
-            (Restaurant.description.ilike(f"%{query}%"))
-        )
-
-    if city:
-        restaurants_query = restaurants_query.filter(
-            Restaurant.city.ilike(city)
-        )
-
-    if cuisine:
-        restaurants_query = restaurants_query.filter(
-            Restaurant.cuisine.ilike(cuisine)
-        )
-
-    restaurants = restaurants_query.all()
+    results = restaurant_dao.search_restaurants(query, page=page, per_page=12, city=city, cuisine=cuisine,
+                                                open_now=open_now)
 
     return render_template(
         'public/search_results.html',
-        restaurants=restaurants,
+        restaurants=results.items,
+        pagination=results,
         query=query,
         city=city,
-        cuisine=cuisine
+        cuisine=cuisine,
+        open_now=open_now
     )
@@ -5,7 +5,8 @@ from dao.menu_dao import MenuDAO
 from dao.order_dao import OrderDAO
 from models.restaurant import Restaurant
 from models.menu import Menu
-from datetime import datetime
+from models.order import InvalidStatusTransition
+from utils.opening_hours import schedule_intervals
 
 restaurant_owner_bp = Blueprint('restaurant_owner', __name__, url_prefix='/restaurant-owner')
 restaurant_dao = RestaurantDAO()
@@ -27,35 +28,29 @@ def dashboard():
         restaurants = restaurants_pagination
         total_restaurants = len(restaurants)
 
-    total_orders = 0
-    total_revenue = 0
-    pending_orders = 0
-
-    for restaurant in restaurants:
-        stats = order_dao.get_restaurant_statistics(restaurant.id)
-        total_orders += stats['total_orders']
-        total_revenue += stats['total_revenue']
-        pending_orders += stats['pending_orders']
-
-    recent_orders = []
-    for restaurant in restaurants[:3]:
-        restaurant_orders = order_dao.get_orders_by_restaurant(restaurant.id, page=1, per_page=5)
-        recent_orders.extend(getattr(restaurant_orders, 'items', restaurant_orders))
-
-    recent_orders = sorted(recent_orders, key=lambda x: x.created_at, reverse=True)[:10]
+    restaurant_stats = order_dao.get_restaurants_statistics([r.id for r in restaurants], recent_limit=10)
+    totals = restaurant_stats['totals']
+    recent_orders = restaurant_stats['recent_orders']
 
     return render_template('restaurant_owner/dashboard.html',
                            user=user,
                            restaurants=restaurants,
                            stats={
                                'total_restaurants': total_restaurants,
-                               'total_orders': total_orders,
-                               'total_revenue': total_revenue,
-                               'pending_orders': pending_orders
+                               'total_orders': totals['total_orders'],
+                               'total_revenue': totals['total_revenue'],
+                               'pending_orders': totals['pending_orders']
                            },
                            recent_orders=recent_orders)
 
 # -------------------- Restaurant CRUD --------------------
+def _valid_hours(opening_hours):
+    try:
+        schedule_intervals(opening_hours=opening_hours or None)
+    except ValueError:
+        return False
+    return True
+
 @restaurant_owner_bp.route('/restaurants')
 @login_required
 @restaurant_owner_required
@@ -82,6 +77,11 @@ def add_restaurant():
             flash('Please fill in all required fields', 'error')
             return render_template('restaurant_owner/add_restaurant.html')
 
+        opening_hours = request.form.get('opening_hours', '').strip()
+        if not _valid_hours(opening_hours):
+            flash('Opening hours must look like 11:00-15:00, 18:00-23:00', 'error')
+            return render_template('restaurant_owner/add_restaurant.html')
+
         restaurant = Restaurant(
             name=name,
             description=request.form.get('description', '').strip(),
@@ -93,6 +93,7 @@ def add_restaurant():
             type=request.form.get('type', 'both'),
             opening_time=request.form.get('opening_time', ''),
             closing_time=request.form.get('closing_time', ''),
+            opening_hours=opening_hours or None,
             delivery_fee=request.form.get('delivery_fee', 0, type=float),
             minimum_order=request.form.get('minimum_order', 0, type=float),
             owner_id=user.id,
@@ -118,6 +119,11 @@ def edit_restaurant(restaurant_id):
         return redirect(url_for('restaurant_owner.restaurants'))
 
     if request.method == 'POST':
+        opening_hours = request.form.get('opening_hours', restaurant.opening_hours or '').strip()
+        if not _valid_hours(opening_hours):
+            flash('Opening hours must look like 11:00-15:00, 18:00-23:00', 'error')
+            return render_template('restaurant_owner/edit_restaurant.html', restaurant=restaurant)
+
         restaurant.name = request.form.get('name', restaurant.name).strip()
         restaurant.description = request.form.get('description', restaurant.description)
         restaurant.cuisine = request.form.get('cuisine', restaurant.cuisine)
@@ -128,6 +134,7 @@ def edit_restaurant(restaurant_id):
         restaurant.type = request.form.get('type', restaurant.type)
         restaurant.opening_time = request.form.get('opening_time', restaurant.opening_time)
         restaurant.closing_time = request.form.get('closing_time', restaurant.closing_time)
+        restaurant.opening_hours = opening_hours or None
         restaurant.delivery_fee = request.form.get('delivery_fee', restaurant.delivery_fee, type=float)
         restaurant.minimum_order = request.form.get('minimum_order', restaurant.minimum_order, type=float)
 
@@ -280,7 +287,8 @@ def orders():
         restaurant_ids if not restaurant_id else [restaurant_id],
         page=page,
         per_page=15,
-        status_filter=status_filter
+        status_filter=status_filter,
+        cursor=request.args.get('cursor')
     )
 
     return render_template('restaurant_owner/orders.html',
@@ -309,13 +317,10 @@ def update_order_status(order_id):
     if new_status not in valid_statuses:
         return jsonify({'error': 'Invalid status'}), 400
 
-    order.status = new_status
-    if new_status == 'confirmed':
-        order.confirmed_at = datetime.utcnow()
-    elif new_status == 'preparing':
-        order.prepared_at = datetime.utcnow()
-    elif new_status == 'ready_for_pickup':
-        order.pickup_at = datetime.utcnow()
+    try:
+        order.transition_to(new_status)
+    except InvalidStatusTransition as e:
+        return jsonify({'error': str(e)}), 409
 
     if order_dao.update_order(order):
         return jsonify({'message': 'Order status updated successfully'})
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from db import db
+from models.order import Order
+from models.restaurant import Restaurant
+from models.user import User
+from dao.order_dao import OrderDAO
+from utils.assignment import plan_assignments
+
+
+class BatchAssigner:
+    """Periodically matches every open pickup to an idle courier at once.
+
+    Idle couriers are active delivery users with a recent location and no
+    order out for delivery. The oldest DISPATCH_BATCH_LIMIT open orders
+    with restaurant coordinates are matched by minimum total cost and
+    written through OrderDAO.assign_orders in one transaction.
+    """
+
+    def __init__(self):
+        self.order_dao = OrderDAO()
+
+    def idle_couriers(self, location_max_age, limit):
+        busy = db.session.query(Order.id).filter(
+            Order.delivery_person_id == User.id,
+            Order.status == 'out_for_delivery'
+        ).exists()
+        return db.session.query(User.id, User.latitude, User.longitude).filter(
+            User.role == 'delivery_person',
+            User.is_active.is_(True),
+            User.latitude.isnot(None),
+            User.longitude.isnot(None),
+            User.location_updated_at >= datetime.utcnow() - timedelta(seconds=location_max_age),
+            ~busy
+        ).order_by(User.location_updated_at.desc()).limit(limit).all()
+
+    def open_orders(self, limit):
+        return db.session.query(
+            Order.id, Restaurant.latitude, Restaurant.longitude,
+            func.coalesce(Order.prepared_at, Order.created_at)
+        ).join(Restaurant, Restaurant.id == Order.restaurant_id).filter(
+            Order.status == 'ready_for_pickup',
+            Order.delivery_person_id.is_(None),
+            Restaurant.latitude.isnot(None),
+            Restaurant.longitude.isnot(None)
+        ).order_by(Order.created_at, Order.id).limit(limit).all()
+
+    def run(self):
+        """Assign one batch; returns a summary dict"""
+        config = current_app.config
+        limit = config.get('DISPATCH_BATCH_LIMIT', 200)
+        couriers = [tuple(row) for row in self.idle_couriers(config.get('DISPATCH_LOCATION_MAX_AGE', 600), limit)]
+        orders = [tuple(row) for row in self.open_orders(limit)]
+        plan = plan_assignments(
+            couriers, orders,
+            max_distance_km=config.get('MAX_DELIVERY_DISTANCE', 10),
+            wait_weight=config.get('DISPATCH_WAIT_WEIGHT', 0.05)
+        )
+        applied = self.order_dao.assign_orders([(order_id, courier_id) for order_id, courier_id, _ in plan])
+        distances = {order_id: distance for order_id, _, distance in plan}
+        return {
+            'couriers': len(couriers),
+            'orders': len(orders),
+            'assigned': len(applied),
+            'avg_pickup_km': round(sum(distances[order_id] for order_id, _ in applied) / len(applied), 2) if applied else 0
+        }
@@ -1,73 +1,253 @@
 from db import db
-from models.cart import Cart
+from models.cart import Cart, InvalidCartItem, CartItemNotFound
 from models.menu import Menu
-from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime
+from itertools import groupby
+from dao.loader_profiles import with_profile
+from dao.cart_summary import cart_summary
+
+
+def _upsert_insert():
+    """INSERT construct with ON CONFLICT support for the bound database"""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql.insert(Cart)
+    return sqlite.insert(Cart)
+
+
+def _operation_kind(operation):
+    """Batch grouping key: adds upsert together, updates and removes share one pass"""
+    kinds = {'add': 'add', 'update': 'set', 'remove': 'set', 'clear': 'clear'}
+    if operation[0] not in kinds:
+        raise InvalidCartItem(f"Unknown cart operation: {operation[0]}")
+    return kinds[operation[0]]
+
+
+def _as_int(value, field):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidCartItem(f"{field} must be an integer")
+
 
 class CartDAO:
-    def add_to_cart(self, user_id, menu_id, quantity=1, customization=''):
+    # -------------------- Writes --------------------
+    def _upsert(self, user_id, items):
+        """Merge (menu_id, quantity, customization) lines into the cart without committing.
+
+        Lines for the same item and customization are summed first, then
+        written in one INSERT ... ON CONFLICT (user_id, menu_id,
+        customization) DO UPDATE that adds to any existing line. Returns
+        the written (id, menu_id, customization, quantity) rows.
+        """
+        merged = {}
+        for menu_id, quantity, customization in items:
+            menu_id = _as_int(menu_id, 'menu_id')
+            quantity = _as_int(quantity, 'quantity')
+            if quantity < 1:
+                raise InvalidCartItem("quantity must be at least 1")
+            key = (menu_id, customization or '')
+            merged[key] = merged.get(key, 0) + quantity
+        if not merged:
+            return []
+
+        menu_ids = {menu_id for menu_id, _ in merged}
+        available = {menu_id for (menu_id,) in db.session.query(Menu.id).filter(
+            Menu.id.in_(menu_ids), Menu.is_available.is_(True)
+        )}
+        if menu_ids - available:
+            raise InvalidCartItem(f"Menu items not available: {sorted(menu_ids - available)}")
+
+        now = datetime.utcnow()
+        stmt = _upsert_insert().values([{
+            'user_id': user_id,
+            'menu_id': menu_id,
+            'customization': customization,
+            'quantity': quantity,
+            'created_at': now,
+            'updated_at': now
+        } for (menu_id, customization), quantity in merged.items()])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Cart.user_id, Cart.menu_id, Cart.customization],
+            set_={'quantity': Cart.quantity + stmt.excluded.quantity, 'updated_at': now}
+        ).returning(Cart.id, Cart.menu_id, Cart.customization, Cart.quantity)
+        return db.session.execute(stmt).all()
+
+    def _set_quantities(self, user_id, changes):
+        """Apply (cart_id, quantity, customization) changes without committing.
+
+        A quantity of 0 removes the line. quantity or customization None
+        leaves it as is; moving a line onto another line's customization
+        merges the two. Returns (saved (id, menu_id, quantity) rows,
+        removed ids).
+        """
+        changes = [(_as_int(cart_id, 'cart_id'), None if quantity is None else _as_int(quantity, 'quantity'), customization)
+                   for cart_id, quantity, customization in changes]
+        if any(quantity is not None and quantity < 0 for _, quantity, _ in changes):
+            raise InvalidCartItem("quantity cannot be negative")
+        ids = {cart_id for cart_id, _, _ in changes}
+        # populate_existing: an upsert earlier in the transaction bypassed the identity map
+        lines = {line.id: line for line in Cart.query.filter(
+            Cart.user_id == user_id, Cart.id.in_(ids)
+        ).populate_existing()}
+
+        saved, removed = {}, []
+        for cart_id, quantity, customization in changes:
+            line = lines.get(cart_id)
+            if line is None:
+                raise CartItemNotFound(f"Cart item {cart_id} not found")
+            if quantity is None:
+                quantity = line.quantity
+            if quantity == 0:
+                db.session.delete(line)
+                del lines[cart_id]
+                saved.pop(cart_id, None)
+                removed.append(cart_id)
+                continue
+            line.quantity = quantity
+            if customization is not None and customization != line.customization:
+                target = Cart.query.filter_by(
+                    user_id=user_id, menu_id=line.menu_id, customization=customization
+                ).populate_existing().first()
+                if target is not None:
+                    target.quantity += quantity
+                    db.session.delete(line)
+                    del lines[cart_id]
+                    saved.pop(cart_id, None)
+                    removed.append(cart_id)
+                    lines[target.id] = line = target
+                else:
+                    line.customization = customization
+            saved[line.id] = line
+        db.session.flush()
+        return [(line.id, line.menu_id, line.quantity) for line in saved.values()], removed
+
+    def _refresh_summary(self, user_id, saved, removed):
+        for cart_id in removed:
+            cart_summary.line_removed(user_id, cart_id)
+        for cart_id, menu_id, quantity in saved:
+            cart_summary.line_saved(user_id, cart_id, menu_id, quantity)
+
+    def add_items(self, user_id, items):
+        """Upsert (menu_id, quantity, customization) lines in one statement.
+
+        Returns {(menu_id, customization): cart_id}; raises InvalidCartItem
+        for bad input and returns None if the write fails.
+        """
         try:
-            # Check if item already exists in cart
-            existing_cart = Cart.query.filter(
-                and_(
-                    Cart.user_id == user_id,
-                    Cart.menu_id == menu_id,
-                    Cart.customization == customization
-                )
-            ).first()
-            
-            if existing_cart:
-                existing_cart.quantity += quantity
-                db.session.commit()
-                return existing_cart
-            else:
-                cart = Cart(
-                    user_id=user_id,
-                    menu_id=menu_id,
-                    quantity=quantity,
-                    customization=customization
-                )
-                db.session.add(cart)
-                db.session.commit()
-                return cart
+            rows = self._upsert(user_id, items)
+            db.session.commit()
+        except InvalidCartItem:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
             print(f"Error adding to cart: {e}")
             return None
-    
-    def get_cart_items(self, user_id):
-        return Cart.query.filter_by(user_id=user_id).join(Menu).order_by(Cart.created_at).all()
-    
-    def update_cart_quantity(self, user_id, cart_id, quantity):
+        self._refresh_summary(user_id, [(cart_id, menu_id, quantity) for cart_id, menu_id, _, quantity in rows], [])
+        return {(menu_id, customization): cart_id for cart_id, menu_id, customization, _ in rows}
+
+    def update_items(self, user_id, changes):
+        """Apply (cart_id, quantity, customization) changes in one transaction.
+
+        Returns {cart_id: quantity}, with 0 for removed or merged lines;
+        raises InvalidCartItem for bad input and returns None if the write fails.
+        """
         try:
-            cart = Cart.query.filter(
-                and_(
-                    Cart.id == cart_id,
-                    Cart.user_id == user_id
-                )
-            ).first()
-            
-            if cart:
-                cart.quantity = quantity
-                db.session.commit()
-                return cart
+            saved, removed = self._set_quantities(user_id, changes)
+            db.session.commit()
+        except InvalidCartItem:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error updating cart: {e}")
             return None
+        self._refresh_summary(user_id, saved, removed)
+        result = {cart_id: 0 for cart_id in removed}
+        result.update((cart_id, quantity) for cart_id, _, quantity in saved)
+        return result
+
+    def apply_operations(self, user_id, operations):
+        """Apply an ordered list of cart operations in one transaction.
+
+        Each operation is ('add', menu_id, quantity, customization),
+        ('update', cart_id, quantity, customization), ('remove', cart_id)
+        or ('clear',). Runs of adds go out as one upsert and runs of
+        updates/removes as one pass over the touched lines. Nothing is
+        written unless every operation applies; raises InvalidCartItem for
+        bad input and returns None if the write fails, else True.
+        """
+        changes = []
+        try:
+            for kind, group in groupby(operations, key=_operation_kind):
+                group = list(group)
+                if kind == 'add':
+                    rows = self._upsert(user_id, [operation[1:4] for operation in group])
+                    changes += [('saved', cart_id, menu_id, quantity) for cart_id, menu_id, _, quantity in rows]
+                elif kind == 'set':
+                    saved, removed = self._set_quantities(user_id, [
+                        operation[1:4] if operation[0] == 'update' else (operation[1], 0, None) for operation in group
+                    ])
+                    changes += [('removed', cart_id) for cart_id in removed]
+                    changes += [('saved',) + row for row in saved]
+                else:
+                    Cart.query.filter_by(user_id=user_id).delete()
+                    changes.append(('cleared',))
+            db.session.commit()
+        except InvalidCartItem:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
+            print(f"Error applying cart operations: {e}")
+            return None
+
+        # Replay in order so a clear followed by adds leaves the adds
+        for change in changes:
+            if change[0] == 'saved':
+                cart_summary.line_saved(user_id, *change[1:])
+            elif change[0] == 'removed':
+                cart_summary.line_removed(user_id, change[1])
+            else:
+                cart_summary.cleared(user_id)
+        return True
+
+    def add_to_cart(self, user_id, menu_id, quantity=1, customization=''):
+        try:
+            lines = self.add_items(user_id, [(menu_id, quantity, customization)])
+        except InvalidCartItem as e:
+            print(f"Error adding to cart: {e}")
+            return None
+        if not lines:
+            return None
+        return db.session.get(Cart, next(iter(lines.values())))
+    
+    def get_cart_items(self, user_id, profile='cart'):
+        query = Cart.query.filter_by(user_id=user_id).join(Menu)
+        return with_profile(query, profile).order_by(Cart.created_at).all()
+    
+    def update_cart_quantity(self, user_id, cart_id, quantity):
+        try:
+            result = self.update_items(user_id, [(cart_id, quantity, None)])
+        except InvalidCartItem as e:
             print(f"Error updating cart quantity: {e}")
             return None
+        if not result or not result.get(cart_id):
+            return None
+        return db.session.get(Cart, cart_id)
     
     def remove_from_cart(self, user_id, cart_id):
         try:
             cart = Cart.query.filter(
-                and_(
-                    Cart.id == cart_id,
-                    Cart.user_id == user_id
-                )
+                Cart.id == cart_id,
+                Cart.user_id == user_id
             ).first()
             
             if cart:
                 db.session.delete(cart)
                 db.session.commit()
+                cart_summary.line_removed(user_id, cart_id)
                 return True
             return False
         except Exception as e:
@@ -79,18 +259,23 @@ class CartDAO:
         try:
             Cart.query.filter_by(user_id=user_id).delete()
             db.session.commit()
+            cart_summary.cleared(user_id)
             return True
         except Exception as e:
             db.session.rollback()
             print(f"Error clearing cart: {e}")
             return False
     
+    # -------------------- Reads --------------------
     def get_cart_total(self, user_id):
-        cart_items = self.get_cart_items(user_id)
-        return sum(item.get_total_price() for item in cart_items)
+        return cart_summary.get(user_id)['total']
     
     def get_cart_count(self, user_id):
-        return Cart.query.filter_by(user_id=user_id).count()
+        return cart_summary.count(user_id)
+
+    def get_cart_summary(self, user_id):
+        """Line count, quantity and subtotal per restaurant from the summary cache"""
+        return cart_summary.get(user_id)
     
     def get_cart_by_restaurant(self, user_id):
         """Group cart items by restaurant"""
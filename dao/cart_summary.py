@@ -0,0 +1,174 @@
+import json
+import threading
+from sqlalchemy import and_, case
+from db import db
+from models.cart import Cart
+from models.menu import Menu
+from utils.cache import LRUCache
+
+
+def effective_price():
+    """SQL twin of Menu.get_effective_price"""
+    return case(
+        (and_(Menu.discounted_price.isnot(None), Menu.discounted_price != 0), Menu.discounted_price),
+        else_=Menu.price
+    )
+
+
+class CartSummaryCache:
+    """Per-user cart line count, quantity and subtotal per restaurant.
+
+    A summary is built from one carts/menus query on first read and then
+    kept current by CartDAO and the cart routes after each commit, so the
+    navbar badge and cart totals never re-read the cart. Each entry keeps
+    its lines as (restaurant_id, unit_price, quantity) so changes apply
+    without touching menus again. Menu price or availability edits bump a
+    generation that retires every summary. With a shared backend (redis-py
+    get/set/incr API) summaries and the generation live only there, so all
+    workers see the same cart; cart writes then delete the entry instead of
+    patching it, since a read-modify-write from two workers could lose one
+    change. Without a shared backend, other workers only notice a menu
+    change when their entries expire after ttl seconds.
+    """
+
+    PREFIX = 'cart_summary:'
+
+    def __init__(self, maxsize=10000, ttl=30, shared=None):
+        self._lock = threading.Lock()
+        self.configure(maxsize=maxsize, ttl=ttl, shared=shared)
+
+    def configure(self, maxsize=10000, ttl=30, shared=None):
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared = shared
+        self._local_generation = 0
+
+    # -------------------- Storage --------------------
+    def _generation(self):
+        if self.shared is None:
+            return self._local_generation
+        return int(self.shared.get(self.PREFIX + 'generation') or 0)
+
+    def _load(self, user_id):
+        generation = self._generation()
+        if self.shared is None:
+            entry = self.local.get(user_id)
+        else:
+            raw = self.shared.get(self.PREFIX + str(user_id))
+            entry = json.loads(raw) if raw is not None else None
+        if entry is not None and entry['generation'] == generation:
+            return entry
+        return None
+
+    def _store(self, user_id, entry):
+        if self.shared is None:
+            self.local.set(user_id, entry)
+        else:
+            self.shared.set(self.PREFIX + str(user_id), json.dumps(entry), ex=self.ttl)
+        return entry
+
+    def _build(self, user_id, lines):
+        # Aggregates are recomputed from the lines so repeated edits cannot drift
+        subtotals = {}
+        quantity = 0
+        for restaurant_id, unit_price, line_quantity in lines.values():
+            key = str(restaurant_id)
+            subtotals[key] = subtotals.get(key, 0) + unit_price * line_quantity
+            quantity += line_quantity
+        return {
+            'generation': self._generation(),
+            'lines': lines,
+            'item_count': len(lines),
+            'quantity': quantity,
+            'subtotals': {key: round(amount, 2) for key, amount in subtotals.items()},
+            'total': round(sum(subtotals.values()), 2)
+        }
+
+    def _rebuild(self, user_id):
+        rows = db.session.query(
+            Cart.id, Menu.restaurant_id, effective_price(), Cart.quantity
+        ).join(Menu, Cart.menu_id == Menu.id).filter(Cart.user_id == user_id).all()
+        lines = {str(cart_id): [restaurant_id, float(price or 0), quantity]
+                 for cart_id, restaurant_id, price, quantity in rows}
+        return self._store(user_id, self._build(user_id, lines))
+
+    def _update(self, user_id, change):
+        """Apply change(lines) to a cached summary; uncached users are rebuilt on next read"""
+        if self.shared is not None:
+            # Not atomic across workers; rebuild from the database on the next read
+            self.invalidate(user_id)
+            return
+        with self._lock:
+            entry = self._load(user_id)
+            if entry is None:
+                return
+            lines = dict(entry['lines'])
+            if change(lines) is False:
+                self.invalidate(user_id)
+                return
+            self._store(user_id, self._build(user_id, lines))
+
+    # -------------------- Reads --------------------
+    def get(self, user_id):
+        """{'item_count', 'quantity', 'subtotals': {restaurant_id: amount}, 'total'}"""
+        entry = self._load(user_id) or self._rebuild(user_id)
+        return {
+            'item_count': entry['item_count'],
+            'quantity': entry['quantity'],
+            'subtotals': {int(key): amount for key, amount in entry['subtotals'].items()},
+            'total': entry['total']
+        }
+
+    def count(self, user_id):
+        entry = self._load(user_id) or self._rebuild(user_id)
+        return entry['item_count']
+
+    # -------------------- Writes (call after commit) --------------------
+    def line_saved(self, user_id, cart_id, menu_id, quantity):
+        """A cart line was added or its quantity changed"""
+        def change(lines):
+            line = lines.get(str(cart_id))
+            if line is None:
+                row = db.session.query(Menu.restaurant_id, effective_price()).filter(Menu.id == menu_id).first()
+                if row is None:
+                    return False
+                line = [row[0], float(row[1] or 0), quantity]
+            lines[str(cart_id)] = [line[0], line[1], quantity]
+        self._update(user_id, change)
+
+    def line_removed(self, user_id, cart_id):
+        def change(lines):
+            lines.pop(str(cart_id), None)
+        self._update(user_id, change)
+
+    def cleared(self, user_id):
+        if self.shared is not None:
+            self.invalidate(user_id)
+            return
+        with self._lock:
+            self._store(user_id, self._build(user_id, {}))
+
+    def invalidate(self, user_id):
+        if self.shared is None:
+            self.local.delete(user_id)
+        else:
+            self.shared.delete(self.PREFIX + str(user_id))
+
+    def invalidate_menus(self):
+        """Retire every summary after menu prices or availability change"""
+        if self.shared is None:
+            self._local_generation += 1
+            self.local.clear()
+        else:
+            self.shared.incr(self.PREFIX + 'generation')
+
+
+cart_summary = CartSummaryCache()
+
+
+def init_cart_summary(app):
+    cart_summary.configure(
+        maxsize=app.config.get('CART_SUMMARY_CACHE_SIZE', 10000),
+        ttl=app.config.get('CART_SUMMARY_CACHE_TTL', 30),
+        shared=app.config.get('CART_SUMMARY_CACHE_BACKEND')
+    )
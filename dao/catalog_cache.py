@@ -0,0 +1,120 @@
+import json
+from db import db
+from models.restaurant import Restaurant
+from models.menu import Menu
+from utils.cache import LRUCache
+from dao.menu_snapshot import MenuSnapshot
+
+
+class CatalogCache:
+    """Serialized restaurant cards and menus for the anonymous public pages.
+
+    Entries live in an in-process LRU with a TTL. When a shared backend
+    (anything with the redis-py get/set/delete/incr API) is configured,
+    entries are also stored there as JSON and a generation counter in the
+    backend lets one process's invalidation evict every other process's
+    local copies. DAO writes call the invalidate_* methods after commit.
+    """
+
+    PREFIX = 'catalog:'
+    FEATURED_LIMIT = 6
+
+    def __init__(self, maxsize=2048, ttl=300, shared=None):
+        self.configure(maxsize=maxsize, ttl=ttl, shared=shared)
+
+    def configure(self, maxsize=2048, ttl=300, shared=None):
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared = shared
+
+    def _generation(self):
+        if self.shared is None:
+            return 0
+        return int(self.shared.get(self.PREFIX + 'generation') or 0)
+
+    def _get(self, key, loader):
+        generation = self._generation()
+        entry = self.local.get(key)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+
+        value = None
+        if self.shared is not None:
+            raw = self.shared.get(self.PREFIX + key)
+            if raw is not None:
+                value = json.loads(raw)
+        if value is None:
+            value = loader()
+            if value is None:
+                return None
+            if self.shared is not None:
+                self.shared.set(self.PREFIX + key, json.dumps(value), ex=self.ttl)
+
+        self.local.set(key, (generation, value))
+        return value
+
+    def _invalidate(self, keys):
+        for key in keys:
+            self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(*(self.PREFIX + key for key in keys))
+            self.shared.incr(self.PREFIX + 'generation')
+
+    # -------------------- Reads --------------------
+    def get_featured_cards(self):
+        """Newest verified restaurants for the home page"""
+        return self._get('cards:featured', lambda: [
+            restaurant.to_dict() for restaurant in Restaurant.query.filter_by(is_verified=True)
+            .order_by(Restaurant.id.desc()).limit(self.FEATURED_LIMIT).all()
+        ])
+
+    def get_restaurant_cards(self):
+        """All verified restaurants sorted by name"""
+        return self._get('cards:all', lambda: [
+            restaurant.to_dict() for restaurant in Restaurant.query.filter_by(is_verified=True)
+            .order_by(Restaurant.name.asc()).all()
+        ])
+
+    def get_restaurant(self, restaurant_id):
+        def load():
+            restaurant = db.session.get(Restaurant, restaurant_id)
+            return restaurant.to_dict() if restaurant else None
+        return self._get(f'restaurant:{restaurant_id}', load)
+
+    def get_menu(self, restaurant_id):
+        """Available menu items in display order"""
+        return self._get(f'menu:{restaurant_id}', lambda: [
+            menu.to_dict() for menu in Menu.query.filter_by(restaurant_id=restaurant_id, is_available=True)
+            .order_by(Menu.sort_order, Menu.category, Menu.name).all()
+        ])
+
+    def get_menu_snapshot(self, restaurant_id):
+        """Compiled MenuSnapshot; process-local, rebuilt from get_menu() after invalidation"""
+        key = f'snapshot:{restaurant_id}'
+        generation = self._generation()
+        entry = self.local.get(key)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+
+        snapshot = MenuSnapshot(restaurant_id, self.get_menu(restaurant_id))
+        self.local.set(key, (generation, snapshot))
+        return snapshot
+
+    # -------------------- Invalidation --------------------
+    def invalidate_restaurant(self, restaurant_id):
+        self._invalidate(['cards:featured', 'cards:all', f'restaurant:{restaurant_id}', f'menu:{restaurant_id}',
+                          f'snapshot:{restaurant_id}'])
+
+    def invalidate_menu(self, restaurant_id):
+        self._invalidate([f'menu:{restaurant_id}', f'snapshot:{restaurant_id}'])
+
+
+catalog_cache = CatalogCache()
+
+
+def init_catalog_cache(app):
+    catalog_cache.configure(
+        maxsize=app.config.get('CATALOG_CACHE_SIZE', 2048),
+        ttl=app.config.get('CATALOG_CACHE_TTL', 300),
+        shared=app.config.get('CATALOG_CACHE_BACKEND')
+    )
@@ -0,0 +1,218 @@
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict
+from flask import current_app
+from db import db
+from models.order import Order
+from models.restaurant import Restaurant
+from dao.order_dao import OrderDAO
+from utils.event_bus import event_bus
+from utils.geo import haversine_km, KM_PER_DEGREE_LAT
+
+order_dao = OrderDAO()
+
+
+class GridIndex:
+    """Points bucketed into a uniform latitude/longitude grid.
+
+    Cells are cell_km tall; a radius query visits only the cells that can
+    hold points in range (more columns away from the equator, where a
+    degree of longitude is shorter) and then checks exact distances.
+    """
+
+    def __init__(self, cell_km=2.0):
+        self.cell_deg = cell_km / KM_PER_DEGREE_LAT
+        self._cells = defaultdict(dict)
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lng / self.cell_deg))
+
+    def insert(self, key, lat, lng, payload=None):
+        self.remove(key)
+        cell = self._cell(lat, lng)
+        self._cells[cell][key] = (lat, lng, payload)
+        self._points[key] = cell
+
+    def remove(self, key):
+        cell = self._points.pop(key, None)
+        if cell is not None:
+            bucket = self._cells[cell]
+            bucket.pop(key, None)
+            if not bucket:
+                del self._cells[cell]
+
+    def items(self):
+        """(key, lat, lng, payload) for every point"""
+        for bucket in self._cells.values():
+            for key, (lat, lng, payload) in bucket.items():
+                yield key, lat, lng, payload
+
+    def nearby(self, lat, lng, radius_km, limit=None):
+        """(distance_km, key, payload) for points within radius_km, nearest first"""
+        row, col = self._cell(lat, lng)
+        rows = int(math.ceil(radius_km / KM_PER_DEGREE_LAT / self.cell_deg))
+        lng_km = KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01)
+        cols = int(math.ceil(radius_km / lng_km / self.cell_deg))
+
+        if (2 * rows + 1) * (2 * cols + 1) > len(self._cells):
+            # Sparse grid: walking the occupied cells is cheaper than the window
+            buckets = [bucket for (r, c), bucket in self._cells.items()
+                       if abs(r - row) <= rows and abs(c - col) <= cols]
+        else:
+            buckets = [self._cells[(r, c)]
+                       for r in range(row - rows, row + rows + 1)
+                       for c in range(col - cols, col + cols + 1)
+                       if (r, c) in self._cells]
+
+        # Cheap bounding-box test before the exact distance
+        lat_deg = radius_km / KM_PER_DEGREE_LAT
+        lng_deg = radius_km / lng_km
+        found = []
+        for bucket in buckets:
+            for key, (plat, plng, payload) in bucket.items():
+                if abs(plat - lat) > lat_deg or abs(plng - lng) > lng_deg:
+                    continue
+                distance = haversine_km(lat, lng, plat, plng)
+                if distance <= radius_km:
+                    found.append((distance, key, payload))
+        if limit:
+            return heapq.nsmallest(limit, found, key=lambda item: (item[0], item[1]))
+        return sorted(found, key=lambda item: (item[0], item[1]))
+
+
+class DispatchEngine:
+    """In-memory spatial index of open pickups, keyed by restaurant location.
+
+    The pool (ready_for_pickup orders with no courier) is loaded from the
+    database on first use, again within refresh_seconds of an order
+    entering it, and at least every max_age seconds to pick up changes
+    made by other workers. Orders leaving the pool are dropped as soon as
+    the pickup_pool event arrives. Open orders whose restaurant has no
+    coordinates are kept in an oldest-first list and offered after the
+    nearby ones, so they are never stranded.
+    """
+
+    def __init__(self, cell_km=2.0, refresh_seconds=5, max_age=30):
+        self._lock = threading.Lock()
+        self._listener = None
+        self.configure(cell_km, refresh_seconds, max_age)
+
+    def configure(self, cell_km=2.0, refresh_seconds=5, max_age=30):
+        with self._lock:
+            self.cell_km = cell_km
+            self.refresh_seconds = refresh_seconds
+            self.max_age = max_age
+            self._index = GridIndex(cell_km)
+            self._unlocated = {}
+            self._loaded_at = None
+            self._stale = True
+
+    def start(self):
+        """Follow pickup_pool events from OrderDAO"""
+        if self._listener is None:
+            self._listener = event_bus.listen(['pickup_pool'], self._on_pickup_event)
+
+    def _on_pickup_event(self, event):
+        with self._lock:
+            if event['status'] == 'ready_for_pickup':
+                self._stale = True
+            else:
+                self._index.remove(event['order_id'])
+                self._unlocated.pop(event['order_id'], None)
+
+    def load(self):
+        """Rebuild the index from the open pickup pool; returns the number of open orders"""
+        rows = db.session.query(
+            Order.id, Order.created_at, Restaurant.latitude, Restaurant.longitude
+        ).join(Restaurant, Restaurant.id == Order.restaurant_id).filter(
+            Order.status == 'ready_for_pickup',
+            Order.delivery_person_id.is_(None)
+        ).order_by(Order.created_at, Order.id).all()
+
+        index = GridIndex(self.cell_km)
+        unlocated = {}
+        for order_id, created_at, latitude, longitude in rows:
+            if latitude is None or longitude is None:
+                unlocated[order_id] = created_at
+            else:
+                index.insert(order_id, latitude, longitude, created_at)
+
+        with self._lock:
+            self._index = index
+            self._unlocated = unlocated
+            self._loaded_at = time.monotonic()
+            self._stale = False
+        return len(rows)
+
+    def _ensure_loaded(self):
+        if self._loaded_at is not None:
+            age = time.monotonic() - self._loaded_at
+            if age < self.max_age and not (self._stale and age >= self.refresh_seconds):
+                return
+        self.load()
+
+    def rank(self, latitude=None, longitude=None, limit=20, max_distance_km=None):
+        """Open orders for a courier as [{'order_id', 'distance_km'}], nearest pickup first.
+
+        Pickups farther than max_distance_km (Config.MAX_DELIVERY_DISTANCE
+        by default) are left out. Orders without restaurant coordinates
+        follow with distance_km None; a courier without a location gets
+        the whole pool oldest first.
+        """
+        self._ensure_loaded()
+        if max_distance_km is None:
+            max_distance_km = current_app.config.get('MAX_DELIVERY_DISTANCE', 10)
+
+        with self._lock:
+            if latitude is None or longitude is None:
+                pool = [(created_at, key) for key, _, _, created_at in self._index.items()]
+                pool += [(created_at, key) for key, created_at in self._unlocated.items()]
+                pool.sort(key=lambda item: (item[0] is None, item[0] or 0, item[1]))
+                return [{'order_id': key, 'distance_km': None} for _, key in pool[:limit]]
+
+            ranked = [
+                {'order_id': key, 'distance_km': round(distance, 2)}
+                for distance, key, _ in self._index.nearby(latitude, longitude, max_distance_km, limit)
+            ]
+            for key in self._unlocated:
+                if len(ranked) >= limit:
+                    break
+                ranked.append({'order_id': key, 'distance_km': None})
+            return ranked
+
+    def claim_nearest(self, courier, limit=1):
+        """Claim up to `limit` of the nearest open orders for a courier.
+
+        Walks the ranking in windows through OrderDAO.claim_orders, so
+        orders another courier took in the meantime are skipped, not
+        double-assigned. Returns the claimed order ids.
+        """
+        ranked = [item['order_id'] for item in self.rank(courier.latitude, courier.longitude, limit=limit * 5)]
+        claimed = []
+        position = 0
+        while len(claimed) < limit and position < len(ranked):
+            window = ranked[position:position + limit - len(claimed)]
+            position += len(window)
+            claimed += order_dao.claim_orders(window, courier.id)
+        return claimed
+
+
+dispatch_engine = DispatchEngine()
+
+
+def init_dispatch(app):
+    dispatch_engine.configure(
+        cell_km=app.config.get('DISPATCH_GRID_CELL_KM', 2.0),
+        refresh_seconds=app.config.get('DISPATCH_REFRESH_SECONDS', 5),
+        max_age=app.config.get('DISPATCH_INDEX_MAX_AGE', 30)
+    )
+    dispatch_engine.start()
@@ -0,0 +1,44 @@
+from sqlalchemy.orm import joinedload, selectinload, contains_eager
+from models.order import Order, OrderItem
+from models.cart import Cart
+from models.menu import Menu
+
+# Named eager-loading option sets for DAO list/detail queries. Each profile
+# loads exactly what the matching templates walk, so rendering a page of N
+# rows costs a fixed number of SELECTs instead of one lazy load per row.
+LOADER_PROFILES = {
+    # Order tables on dashboards: restaurant name and customer contact
+    'order_summary': (
+        joinedload(Order.restaurant),
+        joinedload(Order.customer),
+    ),
+    # Order lists that also show each line item
+    'order_list': (
+        joinedload(Order.restaurant),
+        joinedload(Order.customer),
+        selectinload(Order.order_items).joinedload(OrderItem.menu),
+    ),
+    # Single order page / Order.to_dict
+    'order_detail': (
+        joinedload(Order.restaurant),
+        joinedload(Order.customer),
+        joinedload(Order.delivery_person),
+        selectinload(Order.order_items).joinedload(OrderItem.menu),
+    ),
+    # Cart rows grouped by restaurant; expects the query to already join Menu
+    'cart': (
+        contains_eager(Cart.menu).joinedload(Menu.restaurant),
+    ),
+}
+
+
+def with_profile(query, profile):
+    """Apply a named loader profile to a query; None leaves it untouched"""
+    if not profile:
+        return query
+    return query.options(*LOADER_PROFILES[profile])
+
+
+def profile_options(profile):
+    """Loader options for a profile, e.g. for Session.get(..., options=...)"""
+    return list(LOADER_PROFILES[profile]) if profile else []
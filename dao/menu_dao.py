@@ -1,15 +1,21 @@
 from db import db
 from models.menu import Menu
 from models.restaurant import Restaurant
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, inspect
 from datetime import datetime
+from dao.search_index import get_search_index
+from dao.catalog_cache import catalog_cache
+from dao.cart_summary import cart_summary
 
 
 class MenuDAO:
     def create_menu(self, menu):
         try:
             db.session.add(menu)
+            db.session.flush()
+            get_search_index().index_menu(menu)
             db.session.commit()
+            catalog_cache.invalidate_menu(menu.restaurant_id)
             return menu
         except Exception as e:
             db.session.rollback()
@@ -41,18 +47,20 @@ class MenuDAO:
             return query.all()
     
     def get_categories_by_restaurant(self, restaurant_id):
-        categories = db.session.query(Menu.category).filter(
-            and_(
-                Menu.restaurant_id == restaurant_id,
-                Menu.is_available == True
-            )
-        ).distinct().all()
-        return [category[0] for category in categories if category[0]]
+        """Categories of available items in menu order, from the compiled snapshot"""
+        return list(catalog_cache.get_menu_snapshot(restaurant_id).categories)
     
     def update_menu(self, menu_item):
         try:
             menu_item.updated_at = datetime.utcnow()
+            state = inspect(menu_item)
+            affects_carts = any(state.attrs[name].history.has_changes()
+                                for name in ('price', 'discounted_price', 'is_available'))
+            get_search_index().index_menu(menu_item)
             db.session.commit()
+            catalog_cache.invalidate_menu(menu_item.restaurant_id)
+            if affects_carts:
+                cart_summary.invalidate_menus()
             return menu_item
         except Exception as e:
             db.session.rollback()
@@ -69,7 +77,10 @@ class MenuDAO:
 
           if menu:
             menu.is_available = False   # soft delete
+            get_search_index().index_menu(menu)
             db.session.commit()
+            catalog_cache.invalidate_menu(menu.restaurant_id)
+            cart_summary.invalidate_menus()
             return True
           return False
         except Exception as e:
@@ -83,14 +94,10 @@ class MenuDAO:
             and_(
                 Menu.is_available == True,
                 Restaurant.is_active == True,
-                Restaurant.is_verified == True,
-                or_(
-                    Menu.name.ilike(f'%{search_term}%'),
-                    Menu.description.ilike(f'%{search_term}%'),
-                    Menu.ingredients.ilike(f'%{search_term}%')
-                )
+                Restaurant.is_verified == True
             )
         )
+        query = get_search_index().menu_search(query, search_term)
         return query.paginate(page=page, per_page=per_page, error_out=False)
     
     def get_featured_menu_items(self, limit=12):
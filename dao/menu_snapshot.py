@@ -0,0 +1,69 @@
+class MenuEntry:
+    """One available menu item as the restaurant page renders it"""
+
+    __slots__ = ('id', 'name', 'description', 'price', 'discounted_price', 'effective_price',
+                 'discount_percentage', 'category', 'type', 'image', 'is_featured')
+
+    def __init__(self, item):
+        for name in self.__slots__:
+            setattr(self, name, item.get(name))
+
+    def __repr__(self):
+        return f'<MenuEntry {self.name}>'
+
+
+class MenuSnapshot:
+    """Compiled menu of one restaurant: available items in display order.
+
+    Item i is bit i of the category and type bitmaps, so a category/type
+    filter is two integer ANDs and never goes back to SQL. Built from
+    Menu.to_dict() rows; the catalog cache rebuilds it when the
+    restaurant's menu is invalidated.
+    """
+
+    __slots__ = ('restaurant_id', 'items', 'categories', 'category_masks', 'type_masks', 'all_mask')
+
+    def __init__(self, restaurant_id, menu_dicts):
+        self.restaurant_id = restaurant_id
+        self.items = tuple(MenuEntry(item) for item in menu_dicts if item.get('is_available') is not False)
+        self.all_mask = (1 << len(self.items)) - 1
+
+        self.category_masks = {}
+        self.type_masks = {}
+        for index, entry in enumerate(self.items):
+            bit = 1 << index
+            category = entry.category or ''
+            self.category_masks[category] = self.category_masks.get(category, 0) | bit
+            self.type_masks[entry.type] = self.type_masks.get(entry.type, 0) | bit
+        # Dict insertion order is first appearance, i.e. display order
+        self.categories = tuple(category for category in self.category_masks if category)
+
+    def mask(self, category='', type_filter=''):
+        mask = self.all_mask
+        if category:
+            mask &= self.category_masks.get(category, 0)
+        if type_filter:
+            mask &= self.type_masks.get(type_filter, 0)
+        return mask
+
+    def select(self, category='', type_filter=''):
+        """Items matching the filters, in display order"""
+        mask = self.mask(category, type_filter)
+        if mask == self.all_mask:
+            return list(self.items)
+        selected = []
+        while mask:
+            low = mask & -mask
+            selected.append(self.items[low.bit_length() - 1])
+            mask ^= low
+        return selected
+
+    def groups(self, category='', type_filter=''):
+        """Matching items grouped by category as (category, items) pairs"""
+        grouped = {}
+        for entry in self.select(category, type_filter):
+            grouped.setdefault(entry.category or '', []).append(entry)
+        return [(name, grouped[name]) for name in self.category_masks if name in grouped]
+
+    def __len__(self):
+        return len(self.items)
@@ -1,26 +1,51 @@
 from db import db
-from models.order import Order, OrderItem
+from models.order import Order, OrderItem, OrderDailyRollup, OrderStatusEvent, InvalidStatusTransition
 from models.restaurant import Restaurant
 from models.user import User
-from sqlalchemy import and_, func, desc
+from models.cart import Cart
+from models.menu import Menu
+from flask import current_app
+from sqlalchemy import and_, or_, func, desc, case, inspect, insert, update, delete, select, false, literal, union_all
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects import postgresql, sqlite
 from datetime import datetime, timedelta
+from dao.loader_profiles import with_profile, profile_options
+from utils.timeseries import bucket_range, bucket_expression, minutes_between, fill_buckets
+from utils.event_bus import event_bus
+from utils.pagination import keyset_paginate, ListPagination
+from dao.cart_summary import cart_summary, effective_price
+from dao.catalog_cache import catalog_cache
+
+
+def _rollup_insert():
+    """INSERT into order_daily_rollup with ON CONFLICT support for the bound database"""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql.insert(OrderDailyRollup)
+    return sqlite.insert(OrderDailyRollup)
+
 
 class OrderDAO:
     def create_order(self, order):
         """Create a new order"""
         try:
             db.session.add(order)
+            counters = self.restaurant_counter_delta(order)
+            transition = self.record_rollup(order)
+            self._bump_restaurant(order.restaurant_id, *counters)
+            self._log_transition(order, transition)
             db.session.commit()
+            if transition:
+                self.publish_status_change(order, *transition)
             return order.id
         except Exception as e:
             db.session.rollback()
             print(f"Error creating order: {e}")
             return None
 
-    def get_order_by_id(self, order_id):
+    def get_order_by_id(self, order_id, profile=None):
         """Fetch order by ID"""
         try:
-            return db.session.get(Order, order_id)  # ✅ SQLAlchemy 2.0 compatible
+            return db.session.get(Order, order_id, options=profile_options(profile))  # ✅ SQLAlchemy 2.0 compatible
         except Exception as e:
             print(f"Error fetching order by id {order_id}: {e}")
             return None
@@ -28,23 +53,527 @@ class OrderDAO:
     def update_order(self, order):
         """Update an existing order"""
         try:
+            counters = self.restaurant_counter_delta(order)
+            transition = self.record_rollup(order)
+            if transition and not Order.can_transition(*transition):
+                raise InvalidStatusTransition(f"Cannot move order from {transition[0]} to {transition[1]}")
+            self._bump_restaurant(order.restaurant_id, *counters)
+            self._log_transition(order, transition)
             db.session.commit()
+            if transition:
+                self.publish_status_change(order, *transition)
             return order
         except Exception as e:
             db.session.rollback()
             print(f"Error updating order: {e}")
             return None
 
-    def get_orders_by_user(self, user_id, page=1, per_page=10, status_filter=""):
+    # -------------------- Checkout --------------------
+    def place_orders_from_cart(self, customer_id, details, tax_rate=0.05, delivery_fee=0, eta_minutes=45):
+        """Turn a customer's cart into one order per restaurant in a single transaction.
+
+        The cart is priced in one query, orders are inserted in one
+        INSERT ... RETURNING, items in one executemany, and the cart is
+        cleared before the single commit. Returns a list of
+        {'id', 'order_number', 'restaurant_id', 'total_amount'} dicts,
+        [] for an empty cart, or None if placement failed.
+        """
+        try:
+            cart_rows = db.session.query(
+                Cart.menu_id, Cart.quantity, Cart.customization, Menu.restaurant_id, effective_price()
+            ).join(Menu, Cart.menu_id == Menu.id).filter(Cart.user_id == customer_id).order_by(Cart.created_at).all()
+            if not cart_rows:
+                return []
+
+            # Group priced lines by restaurant, preserving cart order
+            restaurants = {}
+            for menu_id, quantity, customization, restaurant_id, price in cart_rows:
+                restaurants.setdefault(restaurant_id, []).append({
+                    "menu_id": menu_id,
+                    "quantity": quantity,
+                    "price": price,
+                    "customization": customization
+                })
+
+            now = datetime.utcnow()
+            estimated_delivery = datetime.now() + timedelta(minutes=eta_minutes)
+            order_rows = []
+            for restaurant_id, lines in restaurants.items():
+                subtotal = sum(line["price"] * line["quantity"] for line in lines)
+                tax_amount = subtotal * tax_rate
+                order_rows.append(dict(
+                    details,
+                    customer_id=customer_id,
+                    restaurant_id=restaurant_id,
+                    order_number=Order.generate_order_number(),
+                    total_amount=subtotal + delivery_fee + tax_amount,
+                    delivery_fee=delivery_fee,
+                    tax_amount=tax_amount,
+                    status="pending",
+                    estimated_delivery_time=estimated_delivery,
+                    created_at=now
+                ))
+
+            # order_number is unique, so RETURNING rows can be matched without ordering guarantees
+            order_ids = dict((number, order_id) for order_id, number in db.session.execute(
+                insert(Order).returning(Order.id, Order.order_number), order_rows
+            ))
+
+            item_rows = []
+            placed = []
+            for row in order_rows:
+                order_id = order_ids[row["order_number"]]
+                for line in restaurants[row["restaurant_id"]]:
+                    item_rows.append(dict(line, order_id=order_id))
+                placed.append({
+                    "id": order_id,
+                    "order_number": row["order_number"],
+                    "restaurant_id": row["restaurant_id"],
+                    "total_amount": row["total_amount"]
+                })
+                self._bump_rollup(now.date(), row["restaurant_id"], "pending", 1, row["total_amount"])
+                self._bump_restaurant(row["restaurant_id"], orders=1)
+
+            db.session.execute(insert(OrderItem), item_rows)
+            db.session.execute(insert(OrderStatusEvent), [{
+                "order_id": order["id"],
+                "restaurant_id": order["restaurant_id"],
+                "from_status": None,
+                "to_status": "pending",
+                "created_at": now
+            } for order in placed])
+            db.session.execute(
+                delete(Cart).where(Cart.user_id == customer_id).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            cart_summary.cleared(customer_id)
+            for row in order_rows:
+                self._publish({
+                    "id": order_ids[row["order_number"]],
+                    "order_number": row["order_number"],
+                    "customer_id": customer_id,
+                    "restaurant_id": row["restaurant_id"],
+                    "delivery_person_id": None
+                }, None, "pending")
+            return placed
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error placing orders: {e}")
+            return None
+
+    # -------------------- Status events --------------------
+    def _log_transition(self, order, transition):
+        """Queue an order_status_events row for a transition returned by record_rollup"""
+        if transition:
+            db.session.add(OrderStatusEvent(
+                order=order,
+                restaurant_id=order.restaurant_id,
+                from_status=transition[0],
+                to_status=transition[1],
+                created_at=datetime.utcnow()
+            ))
+
+    def _publish(self, order, previous_status, status):
+        channels = ['orders', f"customer:{order['customer_id']}", f"restaurant:{order['restaurant_id']}"]
+        if order['delivery_person_id']:
+            channels.append(f"courier:{order['delivery_person_id']}")
+        if 'ready_for_pickup' in (previous_status, status):
+            channels.append('pickup_pool')
+        event_bus.publish(channels, {
+            'type': 'order_status',
+            'order_id': order['id'],
+            'order_number': order['order_number'],
+            'restaurant_id': order['restaurant_id'],
+            'previous_status': previous_status,
+            'status': status,
+            'at': datetime.utcnow().isoformat()
+        })
+
+    def publish_status_change(self, order, previous_status, status):
+        """Notify subscribers of the order's customer, restaurant and courier.
+
+        Channels are 'customer:<id>', 'restaurant:<id>', 'courier:<id>',
+        'pickup_pool' (orders entering or leaving ready_for_pickup) and
+        'orders' (everything). Call only after the change is committed.
+        """
+        self._publish({
+            'id': order.id,
+            'order_number': order.order_number,
+            'customer_id': order.customer_id,
+            'restaurant_id': order.restaurant_id,
+            'delivery_person_id': order.delivery_person_id
+        }, previous_status, status)
+
+    # -------------------- Daily rollup --------------------
+    def _bump_rollup(self, day, restaurant_id, status, count, revenue):
+        """Add count/revenue to one (date, restaurant, status) rollup bucket.
+
+        A single upsert, so two transactions opening the same bucket
+        cannot both insert it.
+        """
+        stmt = _rollup_insert().values(
+            date=day, restaurant_id=restaurant_id, status=status,
+            order_count=count, revenue=revenue
+        )
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[OrderDailyRollup.date, OrderDailyRollup.restaurant_id, OrderDailyRollup.status],
+            set_={
+                'order_count': OrderDailyRollup.order_count + stmt.excluded.order_count,
+                'revenue': OrderDailyRollup.revenue + stmt.excluded.revenue
+            }
+        ))
+
+    def record_rollup(self, order):
+        """Apply a new order or a pending status change to order_daily_rollup.
+
+        Must be called before the session is flushed, while the status
+        change is still visible in the attribute history. Returns the
+        (previous_status, status) transition, or None if status is unchanged.
+        """
+        state = inspect(order)
+        if state.transient or state.pending:
+            old_status = None
+        else:
+            history = state.attrs.status.history
+            if not history.has_changes():
+                return None
+            if history.deleted:
+                old_status = history.deleted[0]
+            else:
+                # Attribute was expired when it was set; read the stored value
+                with db.session.no_autoflush:
+                    old_status = db.session.query(Order.status).filter(Order.id == order.id).scalar()
+
+        if order.created_at is None:
+            order.created_at = datetime.utcnow()
+        if order.status is None:
+            order.status = 'pending'
+
+        day = order.created_at.date()
+        amount = order.total_amount or 0
+        if old_status == order.status:
+            return None
+        if old_status is not None:
+            self._bump_rollup(day, order.restaurant_id, old_status, -1, -amount)
+        self._bump_rollup(day, order.restaurant_id, order.status, 1, amount)
+        return old_status, order.status
+
+    def rebuild_daily_rollup(self):
+        """Recompute order_daily_rollup from the orders table"""
+        try:
+            day = func.date(Order.created_at)
+            db.session.execute(delete(OrderDailyRollup))
+            db.session.execute(
+                insert(OrderDailyRollup).from_select(
+                    ['date', 'restaurant_id', 'status', 'order_count', 'revenue'],
+                    select(
+                        day,
+                        Order.restaurant_id,
+                        Order.status,
+                        func.count(Order.id),
+                        func.coalesce(func.sum(Order.total_amount), 0)
+                    ).where(Order.created_at.isnot(None)).group_by(day, Order.restaurant_id, Order.status)
+                )
+            )
+            db.session.commit()
+            return OrderDailyRollup.query.count()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding order rollup: {e}")
+            return None
+
+    # -------------------- Restaurant counters --------------------
+    @staticmethod
+    def _counter_contribution(status, amount, rating):
+        """(revenue, rating_sum, rating_count) one order adds to its restaurant"""
+        if status != 'delivered':
+            return 0, 0, 0
+        return amount or 0, rating or 0, 1 if rating else 0
+
+    def _stored_value(self, state, name):
+        """Value of an order attribute as last flushed"""
+        history = state.attrs[name].history
+        if not history.has_changes():
+            return getattr(state.object, name)
+        if history.deleted:
+            return history.deleted[0]
+        # Attribute was expired when it was set; read the stored value
+        return db.session.query(getattr(Order, name)).filter(Order.id == state.object.id).scalar()
+
+    def restaurant_counter_delta(self, order):
+        """(orders, revenue, rating_sum, rating_count) to add to the order's restaurant.
+
+        Like record_rollup, call before the session is flushed and apply the
+        result with _bump_restaurant in the same transaction.
+        """
+        state = inspect(order)
+        with db.session.no_autoflush:
+            new = self._counter_contribution(order.status, order.total_amount, order.rating)
+            if state.transient or state.pending:
+                return (1,) + new
+            old = self._counter_contribution(
+                *(self._stored_value(state, name) for name in ('status', 'total_amount', 'rating'))
+            )
+        return (0,) + tuple(after - before for after, before in zip(new, old))
+
+    def _rating_prior(self):
+        config = current_app.config
+        return config.get('RATING_PRIOR_MEAN', 3.5), config.get('RATING_PRIOR_WEIGHT', 5)
+
+    def _rating_values(self, rating_sum, rating_count):
+        """SET clauses for restaurants.rating (mean) and rating_score from the new counter values.
+
+        A listed rating is blended in as seed_rating_count pseudo-ratings,
+        so the first order ratings move it gradually instead of replacing
+        it. rating_score is the Bayesian average: the prior mean counted as
+        RATING_PRIOR_WEIGHT extra ratings, so a few reviews can't outrank a
+        long record. Unrated restaurants keep their listed rating.
+        """
+        prior_mean, prior_weight = self._rating_prior()
+        total = rating_sum + Restaurant.seed_rating_sum
+        count = rating_count + Restaurant.seed_rating_count
+        return {
+            'rating': case((count > 0, total * 1.0 / count), else_=Restaurant.rating),
+            'rating_score': (total + prior_mean * prior_weight) / (count + prior_weight)
+        }
+
+    def _bump_restaurant(self, restaurant_id, orders=0, revenue=0, rating_sum=0, rating_count=0):
+        """Add to a restaurant's denormalised counters with one relative UPDATE"""
+        if not (orders or revenue or rating_sum or rating_count):
+            return
+        values = {
+            'order_count': Restaurant.order_count + orders,
+            'revenue': Restaurant.revenue + revenue,
+            'rating_sum': Restaurant.rating_sum + rating_sum,
+            'rating_count': Restaurant.rating_count + rating_count
+        }
+        if rating_sum or rating_count:
+            values.update(self._rating_values(values['rating_sum'], values['rating_count']))
+        db.session.execute(
+            update(Restaurant).where(Restaurant.id == restaurant_id).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    def rate_order(self, order_id, customer_id, rating, review=None):
+        """Record a customer's rating of their delivered order.
+
+        The UPDATE only matches an unrated delivered order, so a double
+        submit counts once; the restaurant's rating counters, mean and
+        score move in the same transaction without reading past ratings.
+        Returns True if the rating was recorded.
+        """
+        try:
+            row = db.session.execute(
+                update(Order).where(
+                    Order.id == order_id,
+                    Order.customer_id == customer_id,
+                    Order.status == 'delivered',
+                    or_(Order.rating.is_(None), Order.rating == 0)
+                ).values(rating=rating, review=review)
+                .returning(Order.restaurant_id)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if row is None:
+                db.session.rollback()
+                return False
+            self._bump_restaurant(row.restaurant_id, rating_sum=rating, rating_count=1)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rating order {order_id}: {e}")
+            return False
+        catalog_cache.invalidate_restaurant(row.restaurant_id)
+        return True
+
+    def reconcile_restaurant_counters(self):
+        """Recompute restaurant counters and rating score from orders and fix any that drifted.
+
+        Each fix is conditional on the counters still holding the values
+        read, so a concurrent order write is never overwritten; that
+        restaurant is simply left for the next run. Returns the number of
+        restaurants corrected, or None on failure.
+        """
+        delivered = Order.status == "delivered"
+        rated = and_(delivered, Order.rating.isnot(None), Order.rating != 0)
+        try:
+            expected = {row[0]: tuple(row[1:]) for row in db.session.query(
+                Order.restaurant_id,
+                func.count(Order.id),
+                self._revenue_where(delivered),
+                func.coalesce(func.sum(case((rated, Order.rating), else_=0)), 0),
+                self._count_where(rated)
+            ).group_by(Order.restaurant_id)}
+
+            prior_mean, prior_weight = self._rating_prior()
+            corrected = 0
+            counters = (Restaurant.order_count, Restaurant.revenue, Restaurant.rating_sum, Restaurant.rating_count)
+            for restaurant_id, score, seed_sum, seed_count, *current in db.session.query(
+                Restaurant.id, Restaurant.rating_score, Restaurant.seed_rating_sum, Restaurant.seed_rating_count, *counters
+            ).all():
+                orders, revenue, rating_sum, rating_count = expected.get(restaurant_id, (0, 0, 0, 0))
+                expected_score = (rating_sum + seed_sum + prior_mean * prior_weight) / \
+                    (rating_count + seed_count + prior_weight)
+                if (current[0], current[2], current[3]) == (orders, rating_sum, rating_count) \
+                        and abs((current[1] or 0) - revenue) < 0.005 and abs((score or 0) - expected_score) < 1e-6:
+                    continue
+                result = db.session.execute(
+                    update(Restaurant).where(
+                        Restaurant.id == restaurant_id,
+                        *(column == value for column, value in zip(counters, current))
+                    ).values(
+                        order_count=orders, revenue=revenue, rating_sum=rating_sum, rating_count=rating_count,
+                        **self._rating_values(literal(rating_sum), literal(rating_count))
+                    ).execution_options(synchronize_session=False)
+                )
+                corrected += result.rowcount
+            db.session.commit()
+            return corrected
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error reconciling restaurant counters: {e}")
+            return None
+
+    def get_daily_rollup(self, start_date, end_date, restaurant_ids=None):
+        """Orders & delivered revenue per day between two dates (inclusive) from the rollup"""
+        query = db.session.query(
+            OrderDailyRollup.date,
+            func.coalesce(func.sum(OrderDailyRollup.order_count), 0),
+            func.coalesce(func.sum(case(
+                (OrderDailyRollup.status == "delivered", OrderDailyRollup.revenue), else_=0
+            )), 0)
+        ).filter(and_(OrderDailyRollup.date >= start_date, OrderDailyRollup.date <= end_date))
+        if restaurant_ids is not None:
+            query = query.filter(OrderDailyRollup.restaurant_id.in_(restaurant_ids))
+        rows = query.group_by(OrderDailyRollup.date).all()
+
+        by_date = {day: {"orders": orders, "revenue": revenue} for day, orders, revenue in rows}
+        daily = []
+        current_date = start_date
+        while current_date <= end_date:
+            stats = by_date.get(current_date, {"orders": 0, "revenue": 0})
+            daily.append({"date": current_date, "orders": stats["orders"], "revenue": stats["revenue"]})
+            current_date += timedelta(days=1)
+        return daily
+
+    # -------------------- Analytics --------------------
+    def _analytics_window(self, days, granularity):
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
+        return start_date, end_date, bucket_range(start_date, end_date, granularity)
+
+    def get_order_trends(self, days=30, granularity='day'):
+        """Orders placed per bucket, with delivered and cancelled counts"""
+        start_date, end_date, buckets = self._analytics_window(days, granularity)
+        bucket = bucket_expression(OrderDailyRollup.date, granularity)
+        rows = db.session.query(
+            bucket,
+            func.sum(OrderDailyRollup.order_count),
+            func.sum(case((OrderDailyRollup.status == "delivered", OrderDailyRollup.order_count), else_=0)),
+            func.sum(case((OrderDailyRollup.status == "cancelled", OrderDailyRollup.order_count), else_=0)),
+        ).filter(
+            and_(OrderDailyRollup.date >= buckets[0], OrderDailyRollup.date <= end_date)
+        ).group_by(bucket).all()
+        return fill_buckets(rows, buckets, ["orders", "delivered", "cancelled"])
+
+    def get_revenue_analytics(self, days=30, granularity='day'):
+        """Delivered revenue and average order value per bucket"""
+        start_date, end_date, buckets = self._analytics_window(days, granularity)
+        bucket = bucket_expression(OrderDailyRollup.date, granularity)
+        rows = db.session.query(
+            bucket,
+            func.sum(OrderDailyRollup.revenue),
+            func.sum(OrderDailyRollup.order_count),
+        ).filter(
+            and_(
+                OrderDailyRollup.status == "delivered",
+                OrderDailyRollup.date >= buckets[0],
+                OrderDailyRollup.date <= end_date
+            )
+        ).group_by(bucket).all()
+        series = fill_buckets(rows, buckets, ["revenue", "orders"])
+        for point in series:
+            point["average_order_value"] = point["revenue"] / point["orders"] if point["orders"] else 0
+        return series
+
+    # (name, from status, to status) pairs timed by get_stage_durations
+    STAGES = (
+        ('acceptance', 'pending', 'confirmed'),
+        ('prep_time', 'confirmed', 'ready_for_pickup'),
+        ('wait_for_courier', 'ready_for_pickup', 'out_for_delivery'),
+        ('delivery_time', 'out_for_delivery', 'delivered'),
+        ('total', 'pending', 'delivered'),
+    )
+
+    def get_stage_durations(self, days=7, restaurant_ids=None):
+        """Count, average and max minutes per order stage from order_status_events.
+
+        A stage is measured for orders that reached its end status within
+        the last `days` days. Each stage is one join of end events (read by
+        status and time) to start events (read by order id), so no order
+        rows are scanned.
+        """
+        since = datetime.utcnow() - timedelta(days=days)
+        durations = {}
+        for name, start_status, end_status in self.STAGES:
+            start = aliased(OrderStatusEvent)
+            end = aliased(OrderStatusEvent)
+            minutes = minutes_between(start.created_at, end.created_at)
+            query = db.session.query(func.count(), func.avg(minutes), func.max(minutes)).select_from(end).join(
+                start, and_(start.order_id == end.order_id, start.to_status == start_status)
+            ).filter(end.to_status == end_status, end.created_at >= since)
+            if restaurant_ids is not None:
+                query = query.filter(end.restaurant_id.in_(restaurant_ids))
+            count, avg_minutes, max_minutes = query.one()
+            durations[name] = {
+                'count': count,
+                'avg_minutes': round(avg_minutes or 0, 1),
+                'max_minutes': round(max_minutes or 0, 1)
+            }
+        return durations
+
+    def get_status_events(self, order_id):
+        """Status history of one order, oldest first"""
+        return OrderStatusEvent.query.filter_by(order_id=order_id).order_by(OrderStatusEvent.created_at, OrderStatusEvent.id).all()
+
+    def get_delivery_performance_metrics(self, days=30, granularity='day'):
+        """Deliveries completed per bucket with average delivery time and on-time rate"""
+        start_date, end_date, buckets = self._analytics_window(days, granularity)
+        bucket = bucket_expression(Order.delivered_at, granularity)
+        on_time = and_(
+            Order.estimated_delivery_time.isnot(None),
+            Order.actual_delivery_time <= Order.estimated_delivery_time
+        )
+        rows = db.session.query(
+            bucket,
+            func.count(Order.id),
+            func.avg(minutes_between(Order.created_at, Order.delivered_at)),
+            self._count_where(on_time),
+        ).filter(
+            and_(
+                Order.status == "delivered",
+                Order.delivered_at >= datetime.combine(buckets[0], datetime.min.time()),
+                Order.delivered_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+            )
+        ).group_by(bucket).all()
+        series = fill_buckets(rows, buckets, ["deliveries", "average_delivery_minutes", "on_time"])
+        for point in series:
+            point["on_time_rate"] = (point["on_time"] / point["deliveries"] * 100) if point["deliveries"] else 0
+        return series
+
+    def _paginate_newest(self, query, page, per_page, cursor=None, total=False):
+        """Newest-first page: keyset on (created_at, id) when a cursor is given ('' = first page), else offset"""
+        if cursor is not None:
+            return keyset_paginate(query, Order.created_at, Order.id, cursor=cursor, per_page=per_page, total=total)
+        return query.order_by(desc(Order.created_at)).paginate(page=page, per_page=per_page, error_out=False)
+
+    def get_orders_by_user(self, user_id, page=1, per_page=10, status_filter="", profile="order_list", cursor=None):
         """Get all orders placed by a user"""
-        query = Order.query.filter_by(customer_id=user_id)
+        query = with_profile(Order.query, profile).filter_by(customer_id=user_id)
         if status_filter:
             query = query.filter_by(status=status_filter)
 
-        query = query.order_by(desc(Order.created_at))
-
         try:
-            return query.paginate(page=page, per_page=per_page, error_out=False)
+            return self._paginate_newest(query, page, per_page, cursor)
         except Exception as e:
             print(f"Error fetching orders: {e}")
 
@@ -65,106 +594,333 @@ class OrderDAO:
 
             return EmptyPagination()
 
-    def get_orders_by_restaurant(self, restaurant_id, page=1, per_page=10, status_filter=""):
+    def get_orders_by_restaurant(self, restaurant_id, page=1, per_page=10, status_filter="", profile="order_list",
+                                 cursor=None):
         """Get all orders for a single restaurant"""
-        query = Order.query.filter_by(restaurant_id=restaurant_id)
+        query = with_profile(Order.query, profile).filter_by(restaurant_id=restaurant_id)
         if status_filter:
             query = query.filter_by(status=status_filter)
-        return query.order_by(desc(Order.created_at)).paginate(page=page, per_page=per_page, error_out=False)
+        return self._paginate_newest(query, page, per_page, cursor)
 
-    def get_orders_by_restaurants(self, restaurant_ids, page=1, per_page=15, status_filter=""):
+    def get_orders_by_restaurants(self, restaurant_ids, page=1, per_page=15, status_filter="", profile="order_list",
+                                  cursor=None):
         """Get orders for multiple restaurants"""
-        query = Order.query.filter(Order.restaurant_id.in_(restaurant_ids))
+        restaurant_ids = list(dict.fromkeys(restaurant_ids))
+        if cursor is None and 1 < len(restaurant_ids) <= self.MERGE_MAX_RESTAURANTS:
+            return self._merged_newest(restaurant_ids, page, per_page, status_filter, profile)
+        query = with_profile(Order.query, profile).filter(Order.restaurant_id.in_(restaurant_ids))
         if status_filter:
             query = query.filter_by(status=status_filter)
-        return query.order_by(desc(Order.created_at)).paginate(page=page, per_page=per_page, error_out=False)
+        return self._paginate_newest(query, page, per_page, cursor)
+
+    # An IN over restaurant_id can't be read in created_at order, so beyond
+    # one restaurant the page is merged from per-restaurant index scans
+    MERGE_MAX_RESTAURANTS = 50
 
-    def get_orders_by_delivery_person(self, delivery_person_id, page=1, per_page=10, status_filter=""):
+    def _merged_newest(self, restaurant_ids, page, per_page, status_filter, profile):
+        """Newest-first offset page over several restaurants without sorting all their orders.
+
+        Each restaurant is one UNION ALL branch read in ix_orders_restaurant_id_created_at
+        order; the database merges the branches and stops at the page.
+        """
+        def branch(restaurant_id):
+            stmt = select(Order.id, Order.created_at).where(Order.restaurant_id == restaurant_id)
+            if status_filter:
+                stmt = stmt.where(Order.status == status_filter)
+            return stmt
+
+        def load_items(offset, limit):
+            page_ids = db.session.execute(
+                union_all(*map(branch, restaurant_ids))
+                .order_by(desc('created_at'), desc('id')).limit(limit).offset(offset)
+            ).scalars().all()
+            if not page_ids:
+                return []
+            orders = {order.id: order for order in
+                      with_profile(Order.query, profile).filter(Order.id.in_(page_ids))}
+            return [orders[order_id] for order_id in page_ids]
+
+        def count():
+            query = Order.query.filter(Order.restaurant_id.in_(restaurant_ids))
+            if status_filter:
+                query = query.filter_by(status=status_filter)
+            return query.count()
+
+        return ListPagination(page=page, per_page=per_page, error_out=False, load_items=load_items, load_count=count)
+
+    def get_orders_by_delivery_person(self, delivery_person_id, page=1, per_page=10, status_filter="",
+                                      profile="order_summary", cursor=None):
         """Get all orders assigned to a delivery person"""
-        query = Order.query.filter_by(delivery_person_id=delivery_person_id)
+        query = with_profile(Order.query, profile).filter_by(delivery_person_id=delivery_person_id)
 
         if status_filter == "assigned":
             query = query.filter(Order.status.in_(["out_for_delivery"]))
         elif status_filter:
             query = query.filter_by(status=status_filter)
 
-        return query.order_by(desc(Order.created_at)).paginate(page=page, per_page=per_page, error_out=False)
+        return self._paginate_newest(query, page, per_page, cursor)
 
-    def get_available_orders_for_delivery(self, page=1, per_page=15):
-        query = Order.query.filter(
+    def has_active_delivery(self, delivery_person_id):
+        """True while the delivery person has an order out for delivery"""
+        return db.session.query(Order.query.filter_by(
+            delivery_person_id=delivery_person_id, status="out_for_delivery"
+        ).exists()).scalar()
+
+    def get_available_orders_for_delivery(self, page=1, per_page=15, profile="order_summary", order_ids=None):
+        """Open pickups, oldest first, or restricted to and ordered like order_ids (a dispatch ranking)"""
+        query = with_profile(Order.query, profile).filter(
         and_(
-            func.lower(Order.status) == 'ready_for_pickup',
+            Order.status == 'ready_for_pickup',
             Order.delivery_person_id.is_(None)
         )
     )
+        if order_ids is not None:
+            if not order_ids:
+                query = query.filter(false())
+            else:
+                positions = {order_id: position for position, order_id in enumerate(order_ids)}
+                query = query.filter(Order.id.in_(order_ids)).order_by(
+                    case(positions, value=Order.id, else_=len(positions))
+                )
         return query.order_by(Order.created_at).paginate(
         page=page, per_page=per_page, error_out=False
     )
-    def get_all_orders(self, page=1, per_page=20, status_filter=""):
-        """Get all orders in the system"""
-        query = Order.query
+
+    # -------------------- Delivery claims --------------------
+    def _claim_where(self, condition, delivery_person_id, idle_only=False):
+        """Hand every open order matching condition to a courier in one UPDATE.
+
+        The open-pool predicate is repeated in the UPDATE itself, so an order
+        another courier claimed first simply doesn't match; nothing is read
+        and then written back. idle_only also requires that the courier has
+        no order out for delivery at the time of the UPDATE. Returns the
+        claimed rows; publish them with _publish_claims after commit.
+        """
+        now = datetime.utcnow()
+        guards = [condition, Order.status == 'ready_for_pickup', Order.delivery_person_id.is_(None)]
+        if idle_only:
+            active = aliased(Order)
+            guards.append(~select(active.id).where(
+                active.delivery_person_id == delivery_person_id,
+                active.status == 'out_for_delivery'
+            ).exists())
+        claimed = db.session.execute(
+            update(Order).where(*guards).values(
+                delivery_person_id=delivery_person_id,
+                status='out_for_delivery',
+                pickup_at=now
+            ).returning(Order.id, Order.order_number, Order.customer_id, Order.restaurant_id,
+                        Order.delivery_person_id, Order.created_at, Order.total_amount)
+            .execution_options(synchronize_session=False)
+        ).all()
+        for row in claimed:
+            day = row.created_at.date()
+            amount = row.total_amount or 0
+            self._bump_rollup(day, row.restaurant_id, 'ready_for_pickup', -1, -amount)
+            self._bump_rollup(day, row.restaurant_id, 'out_for_delivery', 1, amount)
+        if claimed:
+            db.session.execute(insert(OrderStatusEvent), [{
+                'order_id': row.id,
+                'restaurant_id': row.restaurant_id,
+                'from_status': 'ready_for_pickup',
+                'to_status': 'out_for_delivery',
+                'created_at': now
+            } for row in claimed])
+        return claimed
+
+    def _publish_claims(self, claimed):
+        for row in claimed:
+            self._publish(row._asdict(), 'ready_for_pickup', 'out_for_delivery')
+        return [row.id for row in claimed]
+
+    def claim_order(self, order_id, delivery_person_id):
+        """Atomically assign an open order to a courier.
+
+        Returns True if this courier got the order, False if it was no
+        longer available (already claimed, not ready, or missing).
+        """
+        try:
+            claimed = self._claim_where(Order.id == order_id, delivery_person_id)
+            db.session.commit()
+            return bool(self._publish_claims(claimed))
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error claiming order {order_id}: {e}")
+            return False
+
+    def claim_orders(self, order_ids, delivery_person_id):
+        """Atomically claim whichever of order_ids are still open; returns the claimed ids"""
+        if not order_ids:
+            return []
+        try:
+            claimed = self._claim_where(Order.id.in_(order_ids), delivery_person_id)
+            db.session.commit()
+            return self._publish_claims(claimed)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error claiming orders {order_ids}: {e}")
+            return []
+
+    def assign_orders(self, assignments):
+        """Apply (order_id, delivery_person_id) pairs in one transaction.
+
+        Each pair goes through the same conditional UPDATE as claim_order,
+        so orders claimed in the meantime are skipped, and so are couriers
+        who picked up a delivery of their own since the plan was made.
+        Returns the (order_id, delivery_person_id) pairs that were applied.
+        """
+        try:
+            claimed = []
+            applied = []
+            for order_id, delivery_person_id in assignments:
+                rows = self._claim_where(Order.id == order_id, delivery_person_id, idle_only=True)
+                if rows:
+                    claimed += rows
+                    applied.append((order_id, delivery_person_id))
+            db.session.commit()
+            self._publish_claims(claimed)
+            return applied
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error assigning orders: {e}")
+            return []
+
+    def claim_next_orders(self, delivery_person_id, limit=1, city=None):
+        """Atomically claim up to `limit` open orders for a courier.
+
+        Orders from restaurants in `city` (the courier's city) come first,
+        then the longest waiting. Returns the list of claimed order ids,
+        which may be shorter than `limit` when other couriers win the race.
+        """
+        try:
+            candidates = select(Order.id).where(
+                Order.status == 'ready_for_pickup',
+                Order.delivery_person_id.is_(None)
+            )
+            if city:
+                candidates = candidates.join(Restaurant, Restaurant.id == Order.restaurant_id).order_by(
+                    case((func.lower(Restaurant.city) == city.lower(), 0), else_=1)
+                )
+            candidates = candidates.order_by(Order.created_at, Order.id).limit(limit) \
+                .with_for_update(skip_locked=True, of=Order)
+            claimed = self._claim_where(Order.id.in_(candidates.scalar_subquery()), delivery_person_id)
+            db.session.commit()
+            return self._publish_claims(claimed)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error claiming orders for delivery person {delivery_person_id}: {e}")
+            return []
+
+    def get_all_orders(self, page=1, per_page=20, status_filter="", profile="order_summary", cursor=None, total=False):
+        """Get all orders in the system; pass a cursor for O(page size) deep paging"""
+        query = with_profile(Order.query, profile)
         if status_filter:
             query = query.filter_by(status=status_filter)
-        return query.order_by(desc(Order.created_at)).paginate(page=page, per_page=per_page, error_out=False)
+        return self._paginate_newest(query, page, per_page, cursor, total)
+
+    def _count_where(self, condition):
+        """COUNT of rows matching condition, evaluated inside the aggregate query"""
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    def _revenue_where(self, condition):
+        """SUM(total_amount) of rows matching condition, 0 when nothing matches"""
+        return func.coalesce(func.sum(case((condition, Order.total_amount), else_=0)), 0)
 
     def get_user_statistics(self, user_id):
         """Get stats for a customer"""
-        orders = Order.query.filter_by(customer_id=user_id).all()
-        total_orders = len(orders)
-        total_spent = sum(order.total_amount for order in orders if order.status == "delivered")
-        favorite_cuisine = None
+        total_orders, total_spent = db.session.query(
+            func.count(Order.id),
+            self._revenue_where(Order.status == "delivered"),
+        ).filter(Order.customer_id == user_id).one()
 
-        if orders:
-            cuisine_counts = {}
-            for order in orders:
-                cuisine = order.restaurant.cuisine
-                cuisine_counts[cuisine] = cuisine_counts.get(cuisine, 0) + 1
-            if cuisine_counts:
-                favorite_cuisine = max(cuisine_counts, key=cuisine_counts.get)
+        favorite_cuisine = None
+        if total_orders:
+            favorite_cuisine = db.session.query(Restaurant.cuisine).join(
+                Order, Order.restaurant_id == Restaurant.id
+            ).filter(Order.customer_id == user_id).group_by(Restaurant.cuisine).order_by(
+                desc(func.count(Order.id))
+            ).limit(1).scalar()
 
         return {"total_orders": total_orders, "total_spent": total_spent, "favorite_cuisine": favorite_cuisine}
 
     def get_restaurant_statistics(self, restaurant_id):
         """Get stats for a restaurant"""
-        orders = Order.query.filter_by(restaurant_id=restaurant_id).all()
-        total_orders = len(orders)
-        total_revenue = sum(order.total_amount for order in orders if order.status == "delivered")
-        pending_orders = len([o for o in orders if o.status in ["pending", "confirmed", "preparing"]])
+        total_orders, total_revenue, pending_orders = db.session.query(
+            func.count(Order.id),
+            self._revenue_where(Order.status == "delivered"),
+            self._count_where(Order.status.in_(["pending", "confirmed", "preparing"])),
+        ).filter(Order.restaurant_id == restaurant_id).one()
         return {"total_orders": total_orders, "total_revenue": total_revenue, "pending_orders": pending_orders}
 
+    def get_restaurants_statistics(self, restaurant_ids, recent_limit=10):
+        """Get per-restaurant and combined stats plus the latest orders for many restaurants"""
+        empty = {"total_orders": 0, "total_revenue": 0, "pending_orders": 0}
+        by_restaurant = {restaurant_id: dict(empty) for restaurant_id in restaurant_ids}
+        totals = dict(empty)
+        if not restaurant_ids:
+            return {"by_restaurant": by_restaurant, "totals": totals, "recent_orders": []}
+
+        rows = db.session.query(
+            Order.restaurant_id,
+            func.count(Order.id),
+            self._revenue_where(Order.status == "delivered"),
+            self._count_where(Order.status.in_(["pending", "confirmed", "preparing"])),
+        ).filter(Order.restaurant_id.in_(restaurant_ids)).group_by(Order.restaurant_id).all()
+
+        for restaurant_id, total_orders, total_revenue, pending_orders in rows:
+            by_restaurant[restaurant_id] = {
+                "total_orders": total_orders,
+                "total_revenue": total_revenue,
+                "pending_orders": pending_orders,
+            }
+            totals["total_orders"] += total_orders
+            totals["total_revenue"] += total_revenue
+            totals["pending_orders"] += pending_orders
+
+        recent_orders = with_profile(Order.query, "order_summary").filter(
+            Order.restaurant_id.in_(restaurant_ids)
+        ).order_by(desc(Order.created_at)).limit(recent_limit).all()
+
+        return {"by_restaurant": by_restaurant, "totals": totals, "recent_orders": recent_orders}
+
     def get_delivery_person_statistics(self, delivery_person_id):
         """Get stats for a delivery person"""
-        orders = Order.query.filter_by(delivery_person_id=delivery_person_id).all()
-        total_deliveries = len([o for o in orders if o.status == "delivered"])
-        pending_deliveries = len([o for o in orders if o.status == "out_for_delivery"])
+        total_orders, total_deliveries, pending_deliveries = db.session.query(
+            func.count(Order.id),
+            self._count_where(Order.status == "delivered"),
+            self._count_where(Order.status == "out_for_delivery"),
+        ).filter(Order.delivery_person_id == delivery_person_id).one()
         return {
             "total_deliveries": total_deliveries,
             "pending_deliveries": pending_deliveries,
-            "success_rate": (total_deliveries / len(orders) * 100) if orders else 0,
+            "success_rate": (total_deliveries / total_orders * 100) if total_orders else 0,
         }
 
     def get_total_order_count(self):
         """Get total number of orders"""
-        return Order.query.count()
+        result = db.session.query(func.sum(OrderDailyRollup.order_count)).scalar()
+        return result or 0
 
     def get_total_revenue(self):
         """Get total revenue from delivered orders"""
-        result = db.session.query(func.sum(Order.total_amount)).filter_by(status="delivered").scalar()
+        result = db.session.query(func.sum(OrderDailyRollup.revenue)).filter_by(status="delivered").scalar()
         return result or 0
 
-    def get_recent_orders(self, limit=10):
+    def get_recent_orders(self, limit=10, profile="order_summary"):
         """Get most recent orders"""
-        return Order.query.order_by(desc(Order.created_at)).limit(limit).all()
+        return with_profile(Order.query, profile).order_by(desc(Order.created_at)).limit(limit).all()
 
     def get_daily_statistics(self, date):
         """Get orders & revenue for a specific day"""
         start_date = datetime.combine(date, datetime.min.time())
         end_date = start_date + timedelta(days=1)
 
-        orders = Order.query.filter(and_(Order.created_at >= start_date, Order.created_at < end_date)).all()
-        revenue = sum(order.total_amount for order in orders if order.status == "delivered")
+        orders, revenue = db.session.query(
+            func.count(Order.id),
+            self._revenue_where(Order.status == "delivered"),
+        ).filter(and_(Order.created_at >= start_date, Order.created_at < end_date)).one()
 
-        return {"orders": len(orders), "revenue": revenue}
+        return {"orders": orders, "revenue": revenue}
 
     def get_delivery_earnings(self, delivery_person_id):
         """Get earnings for a delivery person"""
@@ -1,14 +1,62 @@
 from db import db
-from models.restaurant import Restaurant
+from models.restaurant import Restaurant, RestaurantHours
 from models.order import Order
-from sqlalchemy import or_, and_, func, desc
+from sqlalchemy import or_, and_, func, desc, inspect, select
 from datetime import datetime, timedelta
+from dao.search_index import get_search_index
+from dao.catalog_cache import catalog_cache
+from utils.geo import geocoder
+from utils.pagination import keyset_paginate
+from utils.opening_hours import minute_of_day
 
 class RestaurantDAO:
+    # Listing type filter -> Restaurant.type values it matches; any other
+    # value (including 'both') leaves the listing unfiltered
+    TYPE_FILTERS = {
+        'veg': ('veg', 'both'),
+        'non-veg': ('non-veg', 'both'),
+    }
+
+    def _locate(self, restaurant):
+        """Geocode the restaurant when it has no coordinates or its address changed"""
+        state = inspect(restaurant)
+        moved = state.attrs.address.history.has_changes() or state.attrs.city.history.has_changes()
+        if restaurant.latitude is None or (moved and not state.attrs.latitude.history.has_changes()):
+            coords = geocoder.geocode(restaurant.address, restaurant.city)
+            if coords:
+                restaurant.latitude, restaurant.longitude = coords
+
+    def _schedule(self, restaurant):
+        """Rebuild restaurant_hours when the opening hours changed (raises ValueError if unparsable)"""
+        state = inspect(restaurant)
+        changed = any(state.attrs[name].history.has_changes()
+                      for name in ('opening_time', 'closing_time', 'opening_hours'))
+        if changed or not restaurant.hours:
+            restaurant.refresh_hours()
+
+    def open_now(self, query, at=None):
+        """Restrict a Restaurant query to restaurants open at `at` (local time, default now).
+
+        One range probe on ix_restaurant_hours_open_close; no hours are
+        parsed in Python.
+        """
+        minute = minute_of_day(at or datetime.now())
+        return query.filter(Restaurant.id.in_(
+            select(RestaurantHours.restaurant_id).where(
+                RestaurantHours.open_minute <= minute,
+                RestaurantHours.close_minute > minute
+            )
+        ))
+
     def create_restaurant(self, restaurant):
         try:
+            self._locate(restaurant)
+            self._schedule(restaurant)
             db.session.add(restaurant)
+            db.session.flush()
+            get_search_index().index_restaurant(restaurant)
             db.session.commit()
+            catalog_cache.invalidate_restaurant(restaurant.id)
             return restaurant
         except Exception as e:
             db.session.rollback()
@@ -18,33 +66,38 @@ class RestaurantDAO:
     def get_restaurant_by_id(self, restaurant_id):
         return Restaurant.query.get(restaurant_id)
     
-    def get_restaurants(self, page=1, per_page=10, search='', cuisine='', type_filter='', sort_by='rating', verified_only=False):
+    def _browse_query(self, search='', verified_only=False, open_now=False):
+        """Active restaurants narrowed by every listing filter except the facets"""
         query = Restaurant.query.filter_by(is_active=True)
         
         if verified_only:
             query = query.filter_by(is_verified=True)
         
         if search:
-            query = query.filter(
-                or_(
-                    Restaurant.name.ilike(f'%{search}%'),
-                    Restaurant.cuisine.ilike(f'%{search}%'),
-                    Restaurant.description.ilike(f'%{search}%')
-                )
-            )
+            query = get_search_index().restaurant_search(query, search, ranked=False)
+        
+        if open_now:
+            query = self.open_now(query)
+        
+        return query
+    
+    def get_restaurants(self, page=1, per_page=10, search='', cuisine='', type_filter='', sort_by='rating', verified_only=False,
+                        open_now=False, city='', total=None):
+        """A page of listing results; pass `total` when already known to skip the COUNT query"""
+        query = self._browse_query(search=search, verified_only=verified_only, open_now=open_now)
         
         if cuisine:
             query = query.filter_by(cuisine=cuisine)
         
-        if type_filter:
-            if type_filter == 'veg':
-                query = query.filter(Restaurant.type.in_(['veg', 'both']))
-            elif type_filter == 'non-veg':
-                query = query.filter(Restaurant.type.in_(['non-veg', 'both']))
+        if type_filter in self.TYPE_FILTERS:
+            query = query.filter(Restaurant.type.in_(self.TYPE_FILTERS[type_filter]))
+        
+        if city:
+            query = query.filter_by(city=city)
         
         # Apply sorting
         if sort_by == 'rating':
-            query = query.order_by(desc(Restaurant.rating))
+            query = query.order_by(desc(Restaurant.rating_score), desc(Restaurant.rating))
         elif sort_by == 'delivery_time':
             query = query.order_by(Restaurant.delivery_time)
         elif sort_by == 'name':
@@ -52,7 +105,58 @@ class RestaurantDAO:
         elif sort_by == 'newest':
             query = query.order_by(desc(Restaurant.created_at))
         
-        return query.paginate(page=page, per_page=per_page, error_out=False)
+        restaurants = query.paginate(page=page, per_page=per_page, error_out=False, count=total is None)
+        if total is not None:
+            restaurants.total = total
+        return restaurants
+    
+    def get_facets(self, search='', cuisine='', type_filter='', city='', verified_only=False, open_now=False):
+        """Restaurant counts per cuisine, type and city for the current filters.
+
+        One GROUP BY over (cuisine, type, city) under the non-facet filters;
+        each facet is then counted with the other facets' selections
+        applied but not its own, so a sidebar can offer the alternatives.
+        'total' is the number of restaurants matching every filter.
+        """
+        rows = self._browse_query(search=search, verified_only=verified_only, open_now=open_now).with_entities(
+            Restaurant.cuisine, Restaurant.type, Restaurant.city, func.count(Restaurant.id)
+        ).group_by(Restaurant.cuisine, Restaurant.type, Restaurant.city).all()
+        
+        type_values = self.TYPE_FILTERS.get(type_filter)
+        cuisines, types, cities = {}, dict.fromkeys(self.TYPE_FILTERS, 0), {}
+        total = 0
+        for row_cuisine, row_type, row_city, count in rows:
+            cuisine_ok = not cuisine or row_cuisine == cuisine
+            type_ok = not type_values or row_type in type_values
+            city_ok = not city or row_city == city
+            
+            if row_cuisine and type_ok and city_ok:
+                cuisines[row_cuisine] = cuisines.get(row_cuisine, 0) + count
+            if cuisine_ok and city_ok:
+                for name, values in self.TYPE_FILTERS.items():
+                    if row_type in values:
+                        types[name] += count
+            if row_city and cuisine_ok and type_ok:
+                cities[row_city] = cities.get(row_city, 0) + count
+            if cuisine_ok and type_ok and city_ok:
+                total += count
+        
+        return {
+            'cuisine': sorted(cuisines.items()),
+            'type': list(types.items()),
+            'city': sorted(cities.items()),
+            'total': total
+        }
+    
+    def browse_restaurants(self, page=1, per_page=12, search='', cuisine='', type_filter='', city='', sort_by='rating',
+                           verified_only=False, open_now=False):
+        """A results page plus facet counts; the facet query also supplies the page total"""
+        facets = self.get_facets(search=search, cuisine=cuisine, type_filter=type_filter, city=city,
+                                 verified_only=verified_only, open_now=open_now)
+        restaurants = self.get_restaurants(page=page, per_page=per_page, search=search, cuisine=cuisine,
+                                           type_filter=type_filter, sort_by=sort_by, verified_only=verified_only,
+                                           open_now=open_now, city=city, total=facets['total'])
+        return restaurants, facets
     
     def get_restaurants_by_owner(self, owner_id, page=1, per_page=10):
         if page:
@@ -69,7 +173,11 @@ class RestaurantDAO:
     def update_restaurant(self, restaurant):
         try:
             restaurant.updated_at = datetime.utcnow()
+            self._locate(restaurant)
+            self._schedule(restaurant)
+            get_search_index().index_restaurant(restaurant)
             db.session.commit()
+            catalog_cache.invalidate_restaurant(restaurant.id)
             return restaurant
         except Exception as e:
             db.session.rollback()
@@ -81,7 +189,9 @@ class RestaurantDAO:
             restaurant = Restaurant.query.get(restaurant_id)
             if restaurant:
                 restaurant.is_active = False
+                get_search_index().index_restaurant(restaurant)
                 db.session.commit()
+                catalog_cache.invalidate_restaurant(restaurant_id)
                 return True
             return False
         except Exception as e:
@@ -90,7 +200,9 @@ class RestaurantDAO:
             return False
     
     def get_featured_restaurants(self, limit=6):
-        return Restaurant.query.filter_by(is_active=True, is_verified=True).order_by(desc(Restaurant.rating)).limit(limit).all()
+        return Restaurant.query.filter_by(is_active=True, is_verified=True).order_by(
+            desc(Restaurant.rating_score), desc(Restaurant.rating)
+        ).limit(limit).all()
     
     def get_restaurant_count(self):
         return Restaurant.query.filter_by(is_active=True).count()
@@ -98,7 +210,7 @@ class RestaurantDAO:
     def get_recent_restaurants(self, limit=10):
         return Restaurant.query.order_by(desc(Restaurant.created_at)).limit(limit).all()
     
-    def get_all_restaurants_admin(self, page=1, per_page=20, search='', status_filter=''):
+    def get_all_restaurants_admin(self, page=1, per_page=20, search='', status_filter='', cursor=None, total=False):
         query = Restaurant.query
         
         if search:
@@ -119,22 +231,34 @@ class RestaurantDAO:
         elif status_filter == 'unverified':
             query = query.filter_by(is_verified=False)
         
+        if cursor is not None:
+            return keyset_paginate(query, Restaurant.created_at, Restaurant.id, cursor=cursor, per_page=per_page, total=total)
         return query.order_by(desc(Restaurant.created_at)).paginate(
             page=page, per_page=per_page, error_out=False
         )
     
-    def search_restaurants(self, search_term, page=1, per_page=12):
+    def search_restaurants(self, search_term, page=1, per_page=12, city='', cuisine='', open_now=False):
         query = Restaurant.query.filter(
             and_(
                 Restaurant.is_active == True,
-                Restaurant.is_verified == True,
-                or_(
-                    Restaurant.name.ilike(f'%{search_term}%'),
-                    Restaurant.cuisine.ilike(f'%{search_term}%'),
-                    Restaurant.description.ilike(f'%{search_term}%')
-                )
+                Restaurant.is_verified == True
             )
         )
+        
+        if city:
+            query = query.filter(Restaurant.city.ilike(city))
+        
+        if cuisine:
+            query = query.filter(Restaurant.cuisine.ilike(cuisine))
+        
+        if open_now:
+            query = self.open_now(query)
+        
+        if search_term:
+            query = get_search_index().restaurant_search(query, search_term)
+        else:
+            query = query.order_by(Restaurant.name)
+        
         return query.paginate(page=page, per_page=per_page, error_out=False)
     
     def get_cuisine_popularity(self):
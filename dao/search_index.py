@@ -0,0 +1,153 @@
+import re
+from db import db
+from models.restaurant import Restaurant
+from models.menu import Menu
+from sqlalchemy import or_, false, text, table, column, inspect
+
+
+class LikeSearchIndex:
+    """Fallback search that matches with ILIKE; nothing to keep in sync"""
+
+    def restaurant_search(self, query, term, ranked=True):
+        return query.filter(
+            or_(
+                Restaurant.name.ilike(f'%{term}%'),
+                Restaurant.cuisine.ilike(f'%{term}%'),
+                Restaurant.description.ilike(f'%{term}%')
+            )
+        )
+
+    def menu_search(self, query, term, ranked=True):
+        return query.filter(
+            or_(
+                Menu.name.ilike(f'%{term}%'),
+                Menu.description.ilike(f'%{term}%'),
+                Menu.ingredients.ilike(f'%{term}%')
+            )
+        )
+
+    def index_restaurant(self, restaurant):
+        pass
+
+    def index_menu(self, menu):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class Fts5SearchIndex:
+    """SQLite FTS5 index over restaurants and menus.
+
+    Rows are keyed by the restaurant/menu id. Inactive restaurants and
+    unavailable menu items are kept out of the index.
+    """
+
+    TABLES = {
+        'restaurant_search': ('name', 'cuisine', 'description', 'city'),
+        'menu_search': ('name', 'description', 'ingredients', 'category'),
+    }
+
+    def match_expression(self, term):
+        """Turn free text into an FTS5 query: every word must match as a prefix"""
+        words = re.findall(r'\w+', term or '')
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def _search(self, query, term, table_name, key_column, ranked):
+        match = self.match_expression(term)
+        if not match:
+            return query.filter(false())
+        fts = table(table_name, column('rowid'), column('rank'))
+        query = query.join(fts, fts.c.rowid == key_column).filter(
+            text(f'{table_name} MATCH :{table_name}_match').bindparams(**{f'{table_name}_match': match})
+        )
+        if ranked:
+            query = query.order_by(fts.c.rank)
+        return query
+
+    def restaurant_search(self, query, term, ranked=True):
+        return self._search(query, term, 'restaurant_search', Restaurant.id, ranked)
+
+    def menu_search(self, query, term, ranked=True):
+        return self._search(query, term, 'menu_search', Menu.id, ranked)
+
+    def _replace(self, table_name, row_id, values):
+        db.session.execute(text(f'DELETE FROM {table_name} WHERE rowid = :id'), {'id': row_id})
+        if values is not None:
+            columns = self.TABLES[table_name]
+            db.session.execute(
+                text(f"INSERT INTO {table_name} (rowid, {', '.join(columns)}) "
+                     f"VALUES (:id, {', '.join(':' + c for c in columns)})"),
+                dict(values, id=row_id)
+            )
+
+    def index_restaurant(self, restaurant):
+        values = None
+        if restaurant.is_active is not False:
+            values = {
+                'name': restaurant.name,
+                'cuisine': restaurant.cuisine,
+                'description': restaurant.description or '',
+                'city': restaurant.city or ''
+            }
+        self._replace('restaurant_search', restaurant.id, values)
+
+    def index_menu(self, menu):
+        values = None
+        if menu.is_available is not False:
+            values = {
+                'name': menu.name,
+                'description': menu.description or '',
+                'ingredients': menu.ingredients or '',
+                'category': menu.category or ''
+            }
+        self._replace('menu_search', menu.id, values)
+
+    def create_tables(self):
+        for table_name, columns in self.TABLES.items():
+            db.session.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table_name} "
+                f"USING fts5({', '.join(columns)}, prefix='2 3')"
+            ))
+
+    def rebuild(self):
+        """Recreate both indexes from the restaurants and menus tables"""
+        self.create_tables()
+        db.session.execute(text('DELETE FROM restaurant_search'))
+        db.session.execute(text('DELETE FROM menu_search'))
+        db.session.execute(text(
+            "INSERT INTO restaurant_search (rowid, name, cuisine, description, city) "
+            "SELECT id, name, cuisine, COALESCE(description, ''), COALESCE(city, '') "
+            "FROM restaurants WHERE is_active IS NOT 0"
+        ))
+        db.session.execute(text(
+            "INSERT INTO menu_search (rowid, name, description, ingredients, category) "
+            "SELECT id, name, COALESCE(description, ''), COALESCE(ingredients, ''), COALESCE(category, '') "
+            "FROM menus WHERE is_available IS NOT 0"
+        ))
+        db.session.commit()
+        return db.session.execute(text('SELECT COUNT(*) FROM restaurant_search')).scalar() + \
+            db.session.execute(text('SELECT COUNT(*) FROM menu_search')).scalar()
+
+
+_indexes = {}
+
+
+def get_search_index():
+    """Pick the search backend for the current database.
+
+    SQLite databases that have the FTS5 tables (created by migration or
+    'flask rebuild-search-index') use them; anything else falls back to ILIKE.
+    """
+    engine = db.engine
+    if engine.url not in _indexes:
+        index = LikeSearchIndex()
+        if engine.dialect.name == 'sqlite' and inspect(engine).has_table('restaurant_search'):
+            index = Fts5SearchIndex()
+        _indexes[engine.url] = index
+    return _indexes[engine.url]
+
+
+def reset_search_index():
+    """Forget the chosen backend, e.g. after the FTS tables were created"""
+    _indexes.clear()
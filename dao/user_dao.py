@@ -2,6 +2,8 @@ from db import db
 from models.user import User
 from sqlalchemy import or_, and_, func
 from datetime import datetime, timedelta
+from utils.timeseries import bucket_range, bucket_expression, fill_buckets
+from utils.pagination import keyset_paginate
 
 class UserDAO:
     def create_user(self, user):
@@ -45,7 +47,7 @@ class UserDAO:
             print(f"Error deleting user: {e}")
             return False
     
-    def get_all_users(self, page=1, per_page=10, role_filter='', search=''):
+    def get_all_users(self, page=1, per_page=10, role_filter='', search='', cursor=None, total=False):
         query = User.query
         
         if role_filter:
@@ -61,6 +63,8 @@ class UserDAO:
                 )
             )
         
+        if cursor is not None:
+            return keyset_paginate(query, User.created_at, User.id, cursor=cursor, per_page=per_page, total=total)
         return query.order_by(User.created_at.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
@@ -74,28 +78,20 @@ class UserDAO:
     def get_recent_users(self, limit=10):
         return User.query.order_by(User.created_at.desc()).limit(limit).all()
     
-    def get_user_growth_data(self, days=30):
+    def get_user_growth_data(self, days=30, granularity='day'):
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days)
+        buckets = bucket_range(start_date, end_date, granularity)
         
-        growth_data = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            count = User.query.filter(
-                and_(
-                    User.created_at >= current_date,
-                    User.created_at < current_date + timedelta(days=1)
-                )
-            ).count()
-            
-            growth_data.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'count': count
-            })
-            current_date += timedelta(days=1)
+        bucket = bucket_expression(User.created_at, granularity)
+        rows = db.session.query(bucket, func.count(User.id)).filter(
+            and_(
+                User.created_at >= datetime.combine(buckets[0], datetime.min.time()),
+                User.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+            )
+        ).group_by(bucket).all()
         
-        return growth_data
+        return fill_buckets(rows, buckets, ['count'])
     
     def search_users(self, search_term, page=1, per_page=10):
         query = User.query.filter(
@@ -45,6 +45,19 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# FTS5 virtual tables (migration c2d85b7e1a04) and the shadow tables SQLite
+# creates for them are managed by hand, not by the models
+FTS5_SHADOW_SUFFIXES = ('', '_data', '_idx', '_content', '_docsize', '_config')
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and reflected and compare_to is None:
+        from dao.search_index import Fts5SearchIndex
+        fts_tables = {table + suffix for table in Fts5SearchIndex.TABLES for suffix in FTS5_SHADOW_SUFFIXES}
+        return name not in fts_tables
+    return True
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +78,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +107,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
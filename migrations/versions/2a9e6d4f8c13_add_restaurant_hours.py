@@ -0,0 +1,71 @@
+"""add restaurant hours
+
+Revision ID: 2a9e6d4f8c13
+Revises: 8f2c5e07a9d1
+Create Date: 2025-10-10 16:27:41.550392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a9e6d4f8c13'
+down_revision = '8f2c5e07a9d1'
+branch_labels = None
+depends_on = None
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute(value):
+    hours, minutes = value.strip().split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def _intervals(opening_time, closing_time):
+    """Same rules as utils.opening_hours, frozen for the backfill"""
+    try:
+        start, end = _minute(opening_time), _minute(closing_time)
+    except (AttributeError, ValueError):
+        return [(0, MINUTES_PER_DAY)]
+    if start == end or (start, end) == (0, MINUTES_PER_DAY):
+        return [(0, MINUTES_PER_DAY)]
+    if start < end:
+        return [(start, end)]
+    return ([(0, end)] if end else []) + [(start, MINUTES_PER_DAY)]
+
+
+def upgrade():
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('opening_hours', sa.String(length=200), nullable=True))
+
+    hours = op.create_table('restaurant_hours',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('restaurant_id', sa.Integer(), nullable=False),
+        sa.Column('open_minute', sa.Integer(), nullable=False),
+        sa.Column('close_minute', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('restaurant_hours', schema=None) as batch_op:
+        batch_op.create_index('ix_restaurant_hours_open_close', ['open_minute', 'close_minute', 'restaurant_id'], unique=False)
+        batch_op.create_index('ix_restaurant_hours_restaurant_id', ['restaurant_id'], unique=False)
+
+    rows = op.get_bind().execute(sa.text('SELECT id, opening_time, closing_time FROM restaurants')).fetchall()
+    op.bulk_insert(hours, [
+        {'restaurant_id': row.id, 'open_minute': start, 'close_minute': end}
+        for row in rows
+        for start, end in _intervals(row.opening_time, row.closing_time)
+    ])
+
+
+def downgrade():
+    with op.batch_alter_table('restaurant_hours', schema=None) as batch_op:
+        batch_op.drop_index('ix_restaurant_hours_restaurant_id')
+        batch_op.drop_index('ix_restaurant_hours_open_close')
+
+    op.drop_table('restaurant_hours')
+
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_column('opening_hours')
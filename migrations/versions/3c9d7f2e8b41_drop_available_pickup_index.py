@@ -0,0 +1,29 @@
+"""drop available pickup index
+
+Revision ID: 3c9d7f2e8b41
+Revises: 2a9e6d4f8c13
+Create Date: 2025-10-13 10:48:19.402271
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d7f2e8b41'
+down_revision = '2a9e6d4f8c13'
+branch_labels = None
+depends_on = None
+
+AVAILABLE_PICKUP = "status = 'ready_for_pickup' AND delivery_person_id IS NULL"
+
+
+def upgrade():
+    # Never chosen over ix_orders_status_created_at, which serves the same query
+    op.drop_index('ix_orders_available_pickup', table_name='orders')
+
+
+def downgrade():
+    op.create_index('ix_orders_available_pickup', 'orders', ['created_at'], unique=False,
+                    sqlite_where=sa.text(AVAILABLE_PICKUP),
+                    postgresql_where=sa.text(AVAILABLE_PICKUP))
@@ -0,0 +1,40 @@
+"""add order daily rollup
+
+Revision ID: 3f6a2c9d1b7e
+Revises: 8dbb1de4c715
+Create Date: 2025-09-20 11:02:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6a2c9d1b7e'
+down_revision = '8dbb1de4c715'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_daily_rollup',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('date', 'restaurant_id', 'status')
+    )
+
+    # Backfill from existing orders
+    op.execute(
+        "INSERT INTO order_daily_rollup (date, restaurant_id, status, order_count, revenue) "
+        "SELECT DATE(created_at), restaurant_id, status, COUNT(id), COALESCE(SUM(total_amount), 0) "
+        "FROM orders WHERE created_at IS NOT NULL "
+        "GROUP BY DATE(created_at), restaurant_id, status"
+    )
+
+
+def downgrade():
+    op.drop_table('order_daily_rollup')
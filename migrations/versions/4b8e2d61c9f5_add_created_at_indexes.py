@@ -0,0 +1,26 @@
+"""add created_at indexes
+
+Revision ID: 4b8e2d61c9f5
+Revises: e7b3c58d9a16
+Create Date: 2025-10-06 10:22:47.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e2d61c9f5'
+down_revision = 'e7b3c58d9a16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False)
+    op.create_index('ix_restaurants_created_at', 'restaurants', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_restaurants_created_at', table_name='restaurants')
+    op.drop_index('ix_users_created_at', table_name='users')
@@ -0,0 +1,28 @@
+"""add order number sequences
+
+Revision ID: 5be90f3a7c21
+Revises: c2d85b7e1a04
+Create Date: 2025-10-02 14:27:08.661390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5be90f3a7c21'
+down_revision = 'c2d85b7e1a04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_number_sequences',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('next_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+
+def downgrade():
+    op.drop_table('order_number_sequences')
@@ -0,0 +1,46 @@
+"""unique cart lines
+
+Revision ID: 6c1f93a8e2d7
+Revises: 4b8e2d61c9f5
+Create Date: 2025-10-07 14:51:09.627340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1f93a8e2d7'
+down_revision = '4b8e2d61c9f5'
+branch_labels = None
+depends_on = None
+
+LINE_KEY = "user_id, menu_id, customization"
+
+
+def upgrade():
+    # Fold duplicate lines into the oldest one before the key becomes unique
+    op.execute("UPDATE carts SET customization = '' WHERE customization IS NULL")
+    op.execute(f"""
+        UPDATE carts SET quantity = (
+            SELECT SUM(dup.quantity) FROM carts AS dup
+            WHERE dup.user_id = carts.user_id
+              AND dup.menu_id = carts.menu_id
+              AND dup.customization = carts.customization
+        )
+        WHERE id IN (SELECT MIN(id) FROM carts GROUP BY {LINE_KEY} HAVING COUNT(*) > 1)
+    """)
+    op.execute(f"DELETE FROM carts WHERE id NOT IN (SELECT MIN(id) FROM carts GROUP BY {LINE_KEY})")
+
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.alter_column('customization', existing_type=sa.Text(), nullable=False, server_default='')
+        batch_op.drop_index('ix_carts_user_id_menu_id')
+        batch_op.create_index('uq_carts_user_id_menu_id_customization', ['user_id', 'menu_id', 'customization'], unique=True)
+
+
+def downgrade():
+    # Merged lines stay merged
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_index('uq_carts_user_id_menu_id_customization')
+        batch_op.create_index('ix_carts_user_id_menu_id', ['user_id', 'menu_id'], unique=False)
+        batch_op.alter_column('customization', existing_type=sa.Text(), nullable=True, server_default=None)
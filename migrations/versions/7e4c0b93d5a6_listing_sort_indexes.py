@@ -0,0 +1,45 @@
+"""listing sort indexes
+
+Revision ID: 7e4c0b93d5a6
+Revises: 3c9d7f2e8b41
+Create Date: 2025-10-13 11:02:36.184920
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7e4c0b93d5a6'
+down_revision = '3c9d7f2e8b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('menus', schema=None) as batch_op:
+        batch_op.drop_index('ix_menus_restaurant_id_is_available_sort_order')
+        batch_op.create_index('ix_menus_restaurant_id_is_available_sort_order_category_name',
+                              ['restaurant_id', 'is_available', 'sort_order', 'category', 'name'], unique=False)
+
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_index('ix_restaurants_is_active_is_verified_rating_score')
+        batch_op.create_index('ix_restaurants_is_active_rating_score_rating',
+                              ['is_active', 'rating_score', 'rating'], unique=False)
+        batch_op.create_index('ix_restaurants_is_active_delivery_time', ['is_active', 'delivery_time'], unique=False)
+        batch_op.create_index('ix_restaurants_is_active_name', ['is_active', 'name'], unique=False)
+        batch_op.create_index('ix_restaurants_is_active_created_at', ['is_active', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_index('ix_restaurants_is_active_created_at')
+        batch_op.drop_index('ix_restaurants_is_active_name')
+        batch_op.drop_index('ix_restaurants_is_active_delivery_time')
+        batch_op.drop_index('ix_restaurants_is_active_rating_score_rating')
+        batch_op.create_index('ix_restaurants_is_active_is_verified_rating_score',
+                              ['is_active', 'is_verified', 'rating_score'], unique=False)
+
+    with op.batch_alter_table('menus', schema=None) as batch_op:
+        batch_op.drop_index('ix_menus_restaurant_id_is_available_sort_order_category_name')
+        batch_op.create_index('ix_menus_restaurant_id_is_available_sort_order',
+                              ['restaurant_id', 'is_available', 'sort_order'], unique=False)
@@ -0,0 +1,42 @@
+"""add restaurant rating score
+
+Revision ID: 8f2c5e07a9d1
+Revises: d3a7f1c64b82
+Create Date: 2025-10-09 09:14:52.306718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2c5e07a9d1'
+down_revision = 'd3a7f1c64b82'
+branch_labels = None
+depends_on = None
+
+# Config.RATING_PRIOR_MEAN / RATING_PRIOR_WEIGHT at the time of writing
+PRIOR_MEAN = 3.5
+PRIOR_WEIGHT = 5
+
+
+def upgrade():
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_score', sa.Float(), nullable=False, server_default=str(PRIOR_MEAN)))
+        batch_op.drop_index('ix_restaurants_is_active_is_verified_rating')
+        batch_op.create_index('ix_restaurants_is_active_is_verified_rating_score',
+                              ['is_active', 'is_verified', 'rating_score'], unique=False)
+
+    op.execute(f"""
+        UPDATE restaurants SET
+            rating = CASE WHEN rating_count > 0 THEN rating_sum * 1.0 / rating_count ELSE rating END,
+            rating_score = (rating_sum + {PRIOR_MEAN * PRIOR_WEIGHT}) / (rating_count + {PRIOR_WEIGHT}.0)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_index('ix_restaurants_is_active_is_verified_rating_score')
+        batch_op.create_index('ix_restaurants_is_active_is_verified_rating',
+                              ['is_active', 'is_verified', 'rating'], unique=False)
+        batch_op.drop_column('rating_score')
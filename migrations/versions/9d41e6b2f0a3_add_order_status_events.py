@@ -0,0 +1,57 @@
+"""add order status events
+
+Revision ID: 9d41e6b2f0a3
+Revises: 5be90f3a7c21
+Create Date: 2025-10-03 10:42:19.508213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d41e6b2f0a3'
+down_revision = '5be90f3a7c21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_status_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('from_status', sa.String(length=50), nullable=True),
+    sa.Column('to_status', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_status_events', schema=None) as batch_op:
+        batch_op.create_index('ix_order_status_events_order_id_to_status', ['order_id', 'to_status'], unique=False)
+        batch_op.create_index('ix_order_status_events_to_status_created_at', ['to_status', 'created_at'], unique=False)
+        batch_op.create_index('ix_order_status_events_restaurant_status_created_at', ['restaurant_id', 'to_status', 'created_at'], unique=False)
+
+    # Backfill from the timestamps that unambiguously mark one status.
+    # prepared_at/pickup_at were written by several transitions before the
+    # state machine existed, so those stages start with new orders only.
+    for to_status, from_status, column in (
+        ('pending', None, 'created_at'),
+        ('confirmed', 'pending', 'confirmed_at'),
+        ('delivered', 'out_for_delivery', 'delivered_at'),
+        ('cancelled', None, 'cancelled_at'),
+    ):
+        op.execute(sa.text(
+            "INSERT INTO order_status_events (order_id, restaurant_id, from_status, to_status, created_at) "
+            f"SELECT id, restaurant_id, :from_status, :to_status, {column} FROM orders WHERE {column} IS NOT NULL"
+        ).bindparams(from_status=from_status, to_status=to_status))
+
+
+def downgrade():
+    with op.batch_alter_table('order_status_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_status_events_restaurant_status_created_at')
+        batch_op.drop_index('ix_order_status_events_to_status_created_at')
+        batch_op.drop_index('ix_order_status_events_order_id_to_status')
+
+    op.drop_table('order_status_events')
@@ -0,0 +1,63 @@
+"""add query indexes
+
+Revision ID: a71c4e05d2f8
+Revises: 3f6a2c9d1b7e
+Create Date: 2025-09-24 16:40:12.904518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a71c4e05d2f8'
+down_revision = '3f6a2c9d1b7e'
+branch_labels = None
+depends_on = None
+
+AVAILABLE_PICKUP = "status = 'ready_for_pickup' AND delivery_person_id IS NULL"
+
+
+def upgrade():
+    op.create_index('ix_orders_customer_id_created_at', 'orders', ['customer_id', 'created_at'], unique=False)
+    op.create_index('ix_orders_restaurant_id_created_at', 'orders', ['restaurant_id', 'created_at'], unique=False)
+    op.create_index('ix_orders_restaurant_id_status', 'orders', ['restaurant_id', 'status'], unique=False)
+    op.create_index('ix_orders_delivery_person_id_created_at', 'orders', ['delivery_person_id', 'created_at'], unique=False)
+    op.create_index('ix_orders_status_created_at', 'orders', ['status', 'created_at'], unique=False)
+    op.create_index('ix_orders_status_delivered_at', 'orders', ['status', 'delivered_at'], unique=False)
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+    op.create_index('ix_orders_available_pickup', 'orders', ['created_at'], unique=False,
+                    sqlite_where=sa.text(AVAILABLE_PICKUP),
+                    postgresql_where=sa.text(AVAILABLE_PICKUP))
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], unique=False)
+    op.create_index('ix_menus_restaurant_id_is_available_sort_order', 'menus',
+                    ['restaurant_id', 'is_available', 'sort_order'], unique=False)
+    op.create_index('ix_menus_is_featured_is_available_created_at', 'menus',
+                    ['is_featured', 'is_available', 'created_at'], unique=False)
+    op.create_index('ix_carts_user_id_created_at', 'carts', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_carts_user_id_menu_id', 'carts', ['user_id', 'menu_id'], unique=False)
+    op.create_index('ix_restaurants_is_active_is_verified_rating', 'restaurants',
+                    ['is_active', 'is_verified', 'rating'], unique=False)
+    op.create_index('ix_restaurants_is_verified_name', 'restaurants', ['is_verified', 'name'], unique=False)
+    op.create_index('ix_restaurants_owner_id_created_at', 'restaurants', ['owner_id', 'created_at'], unique=False)
+    op.create_index('ix_users_role_created_at', 'users', ['role', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_role_created_at', table_name='users')
+    op.drop_index('ix_restaurants_owner_id_created_at', table_name='restaurants')
+    op.drop_index('ix_restaurants_is_verified_name', table_name='restaurants')
+    op.drop_index('ix_restaurants_is_active_is_verified_rating', table_name='restaurants')
+    op.drop_index('ix_carts_user_id_menu_id', table_name='carts')
+    op.drop_index('ix_carts_user_id_created_at', table_name='carts')
+    op.drop_index('ix_menus_is_featured_is_available_created_at', table_name='menus')
+    op.drop_index('ix_menus_restaurant_id_is_available_sort_order', table_name='menus')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_orders_available_pickup', table_name='orders')
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_index('ix_orders_status_delivered_at', table_name='orders')
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
+    op.drop_index('ix_orders_delivery_person_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_restaurant_id_status', table_name='orders')
+    op.drop_index('ix_orders_restaurant_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_customer_id_created_at', table_name='orders')
@@ -0,0 +1,52 @@
+"""seed listed restaurant ratings
+
+Revision ID: b64f2d9e1c37
+Revises: 7e4c0b93d5a6
+Create Date: 2025-10-14 16:27:08.531442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b64f2d9e1c37'
+down_revision = '7e4c0b93d5a6'
+branch_labels = None
+depends_on = None
+
+# Config.RATING_PRIOR_MEAN / RATING_PRIOR_WEIGHT at the time of writing
+PRIOR_MEAN = 3.5
+PRIOR_WEIGHT = 5
+
+
+def _rescore(seed_sum, seed_count):
+    op.execute(f"""
+        UPDATE restaurants SET
+            rating = CASE WHEN rating_count + {seed_count} > 0
+                THEN (rating_sum + {seed_sum}) * 1.0 / (rating_count + {seed_count}) ELSE rating END,
+            rating_score = (rating_sum + {seed_sum} + {PRIOR_MEAN * PRIOR_WEIGHT})
+                / (rating_count + {seed_count} + {PRIOR_WEIGHT}.0)
+    """)
+
+
+def upgrade():
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seed_rating_sum', sa.Float(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('seed_rating_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Restaurants with order ratings already had their listed rating replaced by 8f2c5e07a9d1
+    op.execute(f"""
+        UPDATE restaurants SET
+            seed_rating_sum = rating * {PRIOR_WEIGHT},
+            seed_rating_count = {PRIOR_WEIGHT}
+        WHERE rating > 0 AND rating_count = 0
+    """)
+    _rescore('seed_rating_sum', 'seed_rating_count')
+
+
+def downgrade():
+    _rescore(0, 0)
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_column('seed_rating_count')
+        batch_op.drop_column('seed_rating_sum')
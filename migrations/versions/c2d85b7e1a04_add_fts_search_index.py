@@ -0,0 +1,49 @@
+"""add fts search index
+
+Revision ID: c2d85b7e1a04
+Revises: a71c4e05d2f8
+Create Date: 2025-09-29 09:14:55.270631
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d85b7e1a04'
+down_revision = 'a71c4e05d2f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 virtual tables only exist on SQLite; other backends keep ILIKE search
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE restaurant_search "
+        "USING fts5(name, cuisine, description, city, prefix='2 3')"
+    )
+    op.execute(
+        "CREATE VIRTUAL TABLE menu_search "
+        "USING fts5(name, description, ingredients, category, prefix='2 3')"
+    )
+    op.execute(
+        "INSERT INTO restaurant_search (rowid, name, cuisine, description, city) "
+        "SELECT id, name, cuisine, COALESCE(description, ''), COALESCE(city, '') "
+        "FROM restaurants WHERE is_active IS NOT 0"
+    )
+    op.execute(
+        "INSERT INTO menu_search (rowid, name, description, ingredients, category) "
+        "SELECT id, name, COALESCE(description, ''), COALESCE(ingredients, ''), COALESCE(category, '') "
+        "FROM menus WHERE is_available IS NOT 0"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TABLE menu_search")
+    op.execute("DROP TABLE restaurant_search")
@@ -0,0 +1,45 @@
+"""add restaurant counters
+
+Revision ID: d3a7f1c64b82
+Revises: 6c1f93a8e2d7
+Create Date: 2025-10-08 11:37:24.580913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a7f1c64b82'
+down_revision = '6c1f93a8e2d7'
+branch_labels = None
+depends_on = None
+
+RATED = "orders.status = 'delivered' AND orders.rating IS NOT NULL AND orders.rating != 0"
+
+
+def upgrade():
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('order_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('revenue', sa.Float(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.execute(f"""
+        UPDATE restaurants SET
+            order_count = (SELECT COUNT(*) FROM orders WHERE orders.restaurant_id = restaurants.id),
+            revenue = (SELECT COALESCE(SUM(orders.total_amount), 0) FROM orders
+                       WHERE orders.restaurant_id = restaurants.id AND orders.status = 'delivered'),
+            rating_sum = (SELECT COALESCE(SUM(orders.rating), 0) FROM orders
+                          WHERE orders.restaurant_id = restaurants.id AND {RATED}),
+            rating_count = (SELECT COUNT(*) FROM orders
+                            WHERE orders.restaurant_id = restaurants.id AND {RATED})
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
+        batch_op.drop_column('revenue')
+        batch_op.drop_column('order_count')
@@ -0,0 +1,46 @@
+"""add dispatch coordinates
+
+Revision ID: e7b3c58d9a16
+Revises: 9d41e6b2f0a3
+Create Date: 2025-10-04 16:08:51.337902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3c58d9a16'
+down_revision = '9d41e6b2f0a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('delivery_latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('delivery_longitude', sa.Float(), nullable=True))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('location_updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('location_updated_at')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('delivery_longitude')
+        batch_op.drop_column('delivery_latitude')
+
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
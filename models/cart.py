@@ -1,14 +1,28 @@
 from db import db
 from datetime import datetime
 
+
+class InvalidCartItem(ValueError):
+    """Raised when a cart write names a missing or unavailable menu item or a bad quantity"""
+
+
+class CartItemNotFound(InvalidCartItem):
+    """Raised when a cart write names a line that is not in the user's cart"""
+
+
 class Cart(db.Model):
     __tablename__ = 'carts'
+    __table_args__ = (
+        db.Index('ix_carts_user_id_created_at', 'user_id', 'created_at'),
+        # One line per item and customization; the upsert conflict target
+        db.Index('uq_carts_user_id_menu_id_customization', 'user_id', 'menu_id', 'customization', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     menu_id = db.Column(db.Integer, db.ForeignKey('menus.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
-    customization = db.Column(db.Text, nullable=True)
+    customization = db.Column(db.Text, nullable=False, default='', server_default='')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -3,6 +3,11 @@ from datetime import datetime
 
 class Menu(db.Model):
     __tablename__ = 'menus'
+    __table_args__ = (
+        db.Index('ix_menus_restaurant_id_is_available_sort_order_category_name',
+                 'restaurant_id', 'is_available', 'sort_order', 'category', 'name'),
+        db.Index('ix_menus_is_featured_is_available_created_at', 'is_featured', 'is_available', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurants.id'), nullable=False)
@@ -2,8 +2,21 @@ from db import db
 from datetime import datetime
 
 
+class InvalidStatusTransition(ValueError):
+    """Raised when an order is moved to a status its current status can't reach"""
+
+
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        db.Index('ix_orders_customer_id_created_at', 'customer_id', 'created_at'),
+        db.Index('ix_orders_restaurant_id_created_at', 'restaurant_id', 'created_at'),
+        db.Index('ix_orders_restaurant_id_status', 'restaurant_id', 'status'),
+        db.Index('ix_orders_delivery_person_id_created_at', 'delivery_person_id', 'created_at'),
+        db.Index('ix_orders_status_created_at', 'status', 'created_at'),
+        db.Index('ix_orders_status_delivered_at', 'status', 'delivered_at'),
+        db.Index('ix_orders_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
 
@@ -28,6 +41,8 @@ class Order(db.Model):
     delivery_address = db.Column(db.Text, nullable=False)
     delivery_city = db.Column(db.String(50), nullable=True)
     delivery_pincode = db.Column(db.String(10), nullable=True)
+    delivery_latitude = db.Column(db.Float, nullable=True)  # geocoded at checkout
+    delivery_longitude = db.Column(db.Float, nullable=True)
     
     # Timing
     delivery_date = db.Column(db.Date, nullable=True)
@@ -80,20 +95,58 @@ class Order(db.Model):
     # Link to Restaurant
     restaurant = db.relationship("Restaurant", back_populates="orders", lazy=True)
 
-    
+    # Status state machine: allowed next statuses for each status
+    STATUS_TRANSITIONS = {
+        'pending': ('confirmed', 'cancelled'),
+        'confirmed': ('preparing', 'cancelled'),
+        'preparing': ('ready_for_pickup',),
+        'ready_for_pickup': ('out_for_delivery',),
+        'out_for_delivery': ('delivered',),
+        'delivered': (),
+        'cancelled': (),
+    }
+
+    # Timestamp column stamped when an order enters a status
+    STATUS_TIMESTAMPS = {
+        'confirmed': 'confirmed_at',
+        'ready_for_pickup': 'prepared_at',
+        'out_for_delivery': 'pickup_at',
+        'delivered': 'delivered_at',
+        'cancelled': 'cancelled_at',
+    }
+
     def __init__(self, **kwargs):
         super(Order, self).__init__(**kwargs)
         if not self.order_number:
             self.order_number = self.generate_order_number()
     
-    def generate_order_number(self):
+    @staticmethod
+    def generate_order_number():
         """Generate unique order number"""
-        import random
-        import string
-        timestamp = datetime.now().strftime('%Y%m%d')
-        random_suffix = ''.join(random.choices(string.digits, k=4))
-        return f"ORD{timestamp}{random_suffix}"
+        from utils.order_numbers import order_numbers
+        return order_numbers.next_number()
     
+    @classmethod
+    def can_transition(cls, from_status, to_status):
+        """Check whether the state machine allows from_status -> to_status"""
+        return to_status in cls.STATUS_TRANSITIONS.get(from_status, ())
+
+    def transition_to(self, status, at=None):
+        """Move the order to a new status and stamp the matching timestamp.
+
+        Raises InvalidStatusTransition if the move isn't allowed. The
+        change is logged to order_status_events when saved via OrderDAO.
+        """
+        if not self.can_transition(self.status, status):
+            raise InvalidStatusTransition(f"Cannot move order from {self.status} to {status}")
+        at = at or datetime.utcnow()
+        self.status = status
+        column = self.STATUS_TIMESTAMPS.get(status)
+        if column:
+            setattr(self, column, at)
+        if status == 'delivered':
+            self.actual_delivery_time = at
+
     def get_status_display(self):
         """Get user-friendly status display"""
         status_map = {
@@ -158,6 +211,9 @@ class Order(db.Model):
 
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
+    __table_args__ = (
+        db.Index('ix_order_items_order_id', 'order_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
@@ -187,3 +243,67 @@ class OrderItem(db.Model):
     
     def __repr__(self):
         return f'<OrderItem {self.id}>'
+
+
+class OrderDailyRollup(db.Model):
+    __tablename__ = 'order_daily_rollup'
+
+    # Orders are bucketed by the day they were placed (Order.created_at)
+    date = db.Column(db.Date, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurants.id'), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)  # Sum of total_amount
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat() if self.date else None,
+            'restaurant_id': self.restaurant_id,
+            'status': self.status,
+            'order_count': self.order_count,
+            'revenue': self.revenue
+        }
+
+    def __repr__(self):
+        return f'<OrderDailyRollup {self.date} {self.restaurant_id} {self.status}>'
+
+
+class OrderNumberSequence(db.Model):
+    __tablename__ = 'order_number_sequences'
+
+    # Highest order number handed out for each day; workers reserve blocks from it
+    day = db.Column(db.Date, primary_key=True)
+    next_value = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<OrderNumberSequence {self.day} {self.next_value}>'
+
+
+class OrderStatusEvent(db.Model):
+    __tablename__ = 'order_status_events'
+    __table_args__ = (
+        db.Index('ix_order_status_events_order_id_to_status', 'order_id', 'to_status'),
+        db.Index('ix_order_status_events_to_status_created_at', 'to_status', 'created_at'),
+        db.Index('ix_order_status_events_restaurant_status_created_at', 'restaurant_id', 'to_status', 'created_at'),
+    )
+
+    # Append-only log of order status transitions, used for stage durations
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurants.id'), nullable=False)
+    from_status = db.Column(db.String(50), nullable=True)  # None for the event that created the order
+    to_status = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    order = db.relationship('Order')
+
+    def to_dict(self):
+        return {
+            'order_id': self.order_id,
+            'from_status': self.from_status,
+            'to_status': self.to_status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<OrderStatusEvent {self.order_id} {self.from_status}->{self.to_status}>'
@@ -1,28 +1,52 @@
 from db import db
 from datetime import datetime
+from utils.opening_hours import schedule_intervals, minute_of_day, is_open_at
 
 class Restaurant(db.Model):
     __tablename__ = 'restaurants'
+    __table_args__ = (
+        # Listing sorts (RestaurantDAO.get_restaurants), read in index order
+        db.Index('ix_restaurants_is_active_rating_score_rating', 'is_active', 'rating_score', 'rating'),
+        db.Index('ix_restaurants_is_active_delivery_time', 'is_active', 'delivery_time'),
+        db.Index('ix_restaurants_is_active_name', 'is_active', 'name'),
+        db.Index('ix_restaurants_is_active_created_at', 'is_active', 'created_at'),
+        db.Index('ix_restaurants_is_verified_name', 'is_verified', 'name'),
+        db.Index('ix_restaurants_owner_id_created_at', 'owner_id', 'created_at'),
+        db.Index('ix_restaurants_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     cuisine = db.Column(db.String(50), nullable=False)
-    rating = db.Column(db.Float, default=0.0)
+    rating = db.Column(db.Float, default=0.0)  # mean of customer ratings once there are any
+    rating_score = db.Column(db.Float, nullable=False, default=3.5, server_default='3.5')  # Bayesian average; sort key
     delivery_time = db.Column(db.String(20), nullable=True)
     image = db.Column(db.String(200), nullable=True)
     cover_image = db.Column(db.String(200), nullable=True)
     type = db.Column(db.String(20), nullable=False, default='both')  # veg, non-veg, both
     address = db.Column(db.Text, nullable=False)
     city = db.Column(db.String(50), nullable=False)
+    latitude = db.Column(db.Float, nullable=True)  # geocoded from address/city
+    longitude = db.Column(db.Float, nullable=True)
     phone = db.Column(db.String(20), nullable=False)
     email = db.Column(db.String(120), nullable=True)
     opening_time = db.Column(db.String(10), nullable=True)
     closing_time = db.Column(db.String(10), nullable=True)
+    opening_hours = db.Column(db.String(200), nullable=True)  # '11:00-15:00, 18:00-02:00'; overrides the pair above
     delivery_fee = db.Column(db.Float, default=0.0)
     minimum_order = db.Column(db.Float, default=0.0)
     is_active = db.Column(db.Boolean, default=True)
     is_verified = db.Column(db.Boolean, default=False)
+    # Counters kept by OrderDAO in the same transaction as the order change;
+    # `flask reconcile-restaurant-counters` recomputes them from orders
+    order_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # all orders
+    revenue = db.Column(db.Float, nullable=False, default=0.0, server_default='0')  # delivered orders
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # rated delivered orders
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Listed rating from before order ratings, counted as this many ratings of that value
+    seed_rating_sum = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    seed_rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -30,42 +54,38 @@ class Restaurant(db.Model):
     # Relationships
     menus = db.relationship('Menu', backref='restaurant', lazy=True, cascade='all, delete-orphan')
     orders = db.relationship("Order", back_populates="restaurant", lazy=True)
+    hours = db.relationship('RestaurantHours', backref='restaurant', lazy=True, cascade='all, delete-orphan')
 
     
+    def seed_rating(self, rating, weight):
+        """Keep a listed rating as weight pseudo-ratings; rating_score follows on the next reconcile"""
+        self.rating = rating
+        self.seed_rating_sum = rating * weight
+        self.seed_rating_count = weight
+
     def get_average_rating(self):
-        """Calculate average rating from orders"""
-        from models.order import Order
-        orders = Order.query.filter_by(restaurant_id=self.id, status='delivered').all()
-        if not orders:
-            return 0.0
-        ratings = [order.rating for order in orders if order.rating]
-        return sum(ratings) / len(ratings) if ratings else 0.0
+        """Average rating of delivered orders"""
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
     
     def get_total_orders(self):
         """Get total number of orders"""
-        from models.order import Order
-        return Order.query.filter_by(restaurant_id=self.id).count()
+        return self.order_count or 0
     
     def get_revenue(self):
-        """Calculate total revenue"""
-        from models.order import Order
-        orders = Order.query.filter_by(restaurant_id=self.id, status='delivered').all()
-        return sum(order.total_amount for order in orders)
+        """Total amount of delivered orders"""
+        return self.revenue or 0.0
     
-    def is_open(self):
-        """Check if restaurant is currently open"""
-        if not self.opening_time or not self.closing_time:
-            return True
-        
-        from datetime import datetime, time
-        now = datetime.now().time()
-        opening = datetime.strptime(self.opening_time, '%H:%M').time()
-        closing = datetime.strptime(self.closing_time, '%H:%M').time()
-        
-        if opening <= closing:
-            return opening <= now <= closing
-        else:  # Overnight hours
-            return now >= opening or now <= closing
+    def get_schedule(self):
+        """Daily opening intervals as (open_minute, close_minute) pairs"""
+        return schedule_intervals(self.opening_time or None, self.closing_time or None, self.opening_hours or None)
+
+    def refresh_hours(self):
+        """Rebuild the restaurant_hours rows behind the SQL open-now filter"""
+        self.hours = [RestaurantHours(open_minute=start, close_minute=end) for start, end in self.get_schedule()]
+
+    def is_open(self, at=None):
+        """Check if restaurant is open at `at` (local time, default now)"""
+        return is_open_at(self.get_schedule(), minute_of_day(at or datetime.now()))
     
     def to_dict(self):
         return {
@@ -74,6 +94,7 @@ class Restaurant(db.Model):
             'description': self.description,
             'cuisine': self.cuisine,
             'rating': self.rating,
+            'rating_score': self.rating_score,
             'delivery_time': self.delivery_time,
             'image': self.image,
             'cover_image': self.cover_image,
@@ -84,14 +105,39 @@ class Restaurant(db.Model):
             'email': self.email,
             'opening_time': self.opening_time,
             'closing_time': self.closing_time,
+            'opening_hours': self.opening_hours,
             'delivery_fee': self.delivery_fee,
             'minimum_order': self.minimum_order,
             'is_active': self.is_active,
             'is_verified': self.is_verified,
+            'order_count': self.order_count,
+            'rating_count': self.rating_count,
+            'average_rating': round(self.get_average_rating(), 2),
             'owner_id': self.owner_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
     def __repr__(self):
-        return f'<Restaurant {self.name}>'
\ No newline at end of file
+        return f'<Restaurant {self.name}>'
+
+
+class RestaurantHours(db.Model):
+    """One daily opening interval, [open_minute, close_minute) in minutes past midnight.
+
+    Overnight windows are stored split at midnight, so "open at minute m"
+    is a plain range test the index can answer.
+    """
+    __tablename__ = 'restaurant_hours'
+    __table_args__ = (
+        db.Index('ix_restaurant_hours_open_close', 'open_minute', 'close_minute', 'restaurant_id'),
+        db.Index('ix_restaurant_hours_restaurant_id', 'restaurant_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurants.id', ondelete='CASCADE'), nullable=False)
+    open_minute = db.Column(db.Integer, nullable=False)
+    close_minute = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<RestaurantHours {self.restaurant_id} {self.open_minute}-{self.close_minute}>'
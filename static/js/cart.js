@@ -1,34 +1,103 @@
+// Cart writes are queued and sent as one POST /cart/batch once clicks
+// pause for DEBOUNCE_MS, so a burst of "+" clicks costs one request.
+// Batches go out one at a time, in click order.
+window.cartBatch = (function () {
+    const DEBOUNCE_MS = 400;
+    let pending = [];
+    let waiters = [];
+    let timer = null;
+    let inFlight = Promise.resolve();
+
+    function sameLine(a, b) {
+        return a.menu_id == b.menu_id && (a.customization || "") === (b.customization || "");
+    }
+
+    function queue(operation) {
+        const last = pending[pending.length - 1];
+        if (last && last.op === "add" && operation.op === "add" && sameLine(last, operation)) {
+            last.quantity += operation.quantity;
+        } else if (last && last.op === "update" && operation.op === "update" && last.cart_id == operation.cart_id) {
+            Object.assign(last, operation);
+        } else {
+            pending.push(operation);
+        }
+
+        clearTimeout(timer);
+        timer = setTimeout(flush, DEBOUNCE_MS);
+        return new Promise((resolve, reject) => waiters.push({ resolve, reject }));
+    }
+
+    function updateBadge(cart) {
+        const badge = document.getElementById("cart-count");
+        if (badge) {
+            badge.textContent = cart.item_count || 0;
+            badge.classList.toggle("hidden", !cart.item_count);
+        }
+    }
+
+    function send(operations) {
+        return fetch("/cart/batch", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ operations: operations })
+        })
+        .then(response => response.json().then(body => {
+            if (!response.ok) {
+                throw new Error(body.error || "Failed to update cart");
+            }
+            updateBadge(body.cart);
+            document.dispatchEvent(new CustomEvent("cart:updated", { detail: body.cart }));
+            return body.cart;
+        }));
+    }
+
+    function flush() {
+        clearTimeout(timer);
+        timer = null;
+        if (!pending.length) {
+            return inFlight;
+        }
+        const operations = pending;
+        const batchWaiters = waiters;
+        pending = [];
+        waiters = [];
+        inFlight = inFlight.catch(() => null).then(() => send(operations)).then(
+            cart => { batchWaiters.forEach(waiter => waiter.resolve(cart)); return cart; },
+            error => { batchWaiters.forEach(waiter => waiter.reject(error)); }
+        );
+        return inFlight;
+    }
+
+    // Don't lose clicks made just before navigating away
+    window.addEventListener("pagehide", function () {
+        if (pending.length && navigator.sendBeacon) {
+            const body = new Blob([JSON.stringify({ operations: pending })], { type: "application/json" });
+            navigator.sendBeacon("/cart/batch", body);
+            pending = [];
+        }
+    });
+
+    return {
+        add: (menuId, quantity, customization) =>
+            queue({ op: "add", menu_id: menuId, quantity: quantity || 1, customization: customization || "" }),
+        update: (cartId, quantity, customization) => {
+            const operation = { op: "update", cart_id: cartId, quantity: quantity };
+            if (customization !== undefined) {
+                operation.customization = customization;
+            }
+            return queue(operation);
+        },
+        remove: cartId => queue({ op: "remove", cart_id: cartId }),
+        clear: () => queue({ op: "clear" }),
+        flush: flush
+    };
+})();
+
 document.addEventListener("DOMContentLoaded", function () {
     document.querySelectorAll(".add-to-cart-btn").forEach(button => {
         button.addEventListener("click", function () {
-            const menuId = this.dataset.menuId;
-            const restaurantId = this.dataset.restaurantId;
-            const quantity = 1; // default, can be updated later if you allow +/- in UI
-
-            fetch("/cart/add", {
-    method: "POST",
-    headers: {
-        "Content-Type": "application/json"
-    },
-    body: JSON.stringify({
-        menu_id: menuId,
-        restaurant_id: restaurantId,
-        quantity: quantity
-    })
-})
-.then(response => response.json().then(data => ({ status: response.status, body: data })))
-.then(result => {
-    if (result.status !== 200) {
-        alert("Error: " + (result.body.error || "Failed to add item"));
-    } else {
-        alert(result.body.message || "Item added to cart!");
-    }
-})
-.catch(error => {
-    console.error(error);
-    alert("Something went wrong: " + error);
-});
-
+            window.cartBatch.add(this.dataset.menuId, 1)
+                .catch(error => alert("Error: " + error.message));
         });
     });
 });
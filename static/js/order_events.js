@@ -0,0 +1,98 @@
+// Live order updates: listen on /events/orders instead of polling and
+// update the affected rows in place from the event payload.
+//
+// Markup hooks:
+//   [data-order-id]         a row or card for one order
+//   [data-order-status]     its status text; the value picks the label style
+//                           ("display", "title" or "raw")
+//   [data-pickup-order-id]  an open pickup, removed once it leaves the pool
+// Events for orders not on the page only show a refresh banner; the page
+// is never reloaded automatically. The including <script> tag passes the
+// stream URL in data-stream-url.
+const orderEventsScript = document.currentScript;
+
+document.addEventListener("DOMContentLoaded", function () {
+    const streamUrl = orderEventsScript && orderEventsScript.dataset.streamUrl;
+    if (!window.EventSource || !streamUrl) {
+        return;
+    }
+
+    const STATUS_DISPLAY = {
+        pending: "Order Placed",
+        confirmed: "Confirmed",
+        preparing: "Being Prepared",
+        ready_for_pickup: "Ready for Pickup",
+        out_for_delivery: "Out for Delivery",
+        delivered: "Delivered",
+        cancelled: "Cancelled"
+    };
+
+    function statusLabel(status, style) {
+        if (style === "raw") {
+            return status;
+        }
+        if (style === "display" && STATUS_DISPLAY[status]) {
+            return STATUS_DISPLAY[status];
+        }
+        return status.split("_").map(function (word) {
+            return word.charAt(0).toUpperCase() + word.slice(1);
+        }).join(" ");
+    }
+
+    let banner = null;
+
+    function showRefreshBanner() {
+        if (banner !== null) {
+            return;
+        }
+        banner = document.createElement("div");
+        banner.setAttribute("role", "status");
+        banner.style.cssText = "position:fixed;bottom:1rem;right:1rem;z-index:1000;padding:.75rem 1rem;" +
+            "border-radius:.5rem;background:#1f2937;color:#fff;box-shadow:0 4px 12px rgba(0,0,0,.2)";
+        banner.textContent = "Orders have changed. ";
+        const link = document.createElement("a");
+        link.href = location.href;
+        link.textContent = "Refresh";
+        link.style.cssText = "color:#fbbf24;font-weight:600";
+        banner.appendChild(link);
+        document.body.appendChild(banner);
+    }
+
+    function applyEvent(data) {
+        let matched = false;
+
+        document.querySelectorAll('[data-order-id="' + data.order_id + '"]').forEach(function (row) {
+            matched = true;
+            row.querySelectorAll("[data-order-status]").forEach(function (element) {
+                element.textContent = statusLabel(data.status, element.getAttribute("data-order-status"));
+            });
+            // Actions rendered for the old status no longer apply
+            row.querySelectorAll("button").forEach(function (button) {
+                button.disabled = true;
+            });
+        });
+
+        if (data.previous_status === "ready_for_pickup") {
+            document.querySelectorAll('[data-pickup-order-id="' + data.order_id + '"]').forEach(function (row) {
+                matched = true;
+                row.remove();
+            });
+        }
+
+        if (!matched) {
+            showRefreshBanner();
+        }
+    }
+
+    const source = new EventSource(streamUrl);
+
+    source.addEventListener("order_status", function (event) {
+        const data = JSON.parse(event.data);
+        applyEvent(data);
+        document.dispatchEvent(new CustomEvent("order-status", { detail: data }));
+    });
+
+    window.addEventListener("beforeunload", function () {
+        source.close();
+    });
+});
@@ -0,0 +1,69 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+from flask import g
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, seed_data
+from config import Config
+from db import db
+from models.user import User
+from utils.order_numbers import order_numbers
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App on a fresh seeded SQLite file, with its app context pushed"""
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(tmp_path / 'test.db'))
+    app = create_app()
+    app.config['TESTING'] = True
+    # Process-wide state that would otherwise leak from the previous test's database
+    order_numbers._reset()
+    with app.app_context():
+        db.create_all()
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed_data()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """login(role_or_user) signs the test client in for both utils.auth and Flask-Login routes"""
+    def login(user):
+        if isinstance(user, str):
+            user = User.query.filter_by(role=user).first()
+        with client.session_transaction() as session:
+            session.clear()
+            session['user_id'] = user.id
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+        # Requests share the fixture's app context, so drop the cached user
+        g.pop('current_user', None)
+        g.pop('identity_from_snapshot', None)
+        return user
+    return login
+
+
+@pytest.fixture
+def statements(app):
+    """List collecting every SQL statement run while the test is active"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', record)
@@ -0,0 +1,42 @@
+"""Batch assignment (OrderDAO.assign_orders) keeps one active delivery per courier."""
+import uuid
+
+from db import db
+from dao.order_dao import OrderDAO
+from models.order import Order
+from models.restaurant import Restaurant
+from models.user import User
+
+
+def _pickup():
+    order = Order(
+        customer_id=User.query.filter_by(role='customer').first().id,
+        restaurant_id=Restaurant.query.first().id, total_amount=100.0, status='ready_for_pickup',
+        booking_name='Test', phone='1', delivery_address='Street 1', payment_method='cod',
+        order_number='T' + uuid.uuid4().hex[:12]
+    )
+    db.session.add(order)
+    db.session.commit()
+    return order.id
+
+
+def test_assignment_skips_courier_who_self_claimed_after_planning(app):
+    courier_id = User.query.filter_by(role='delivery_person').first().id
+    planned, self_claimed = _pickup(), _pickup()
+    plan = [(planned, courier_id)]
+
+    # The courier claims another order between plan and apply
+    assert OrderDAO().claim_order(self_claimed, courier_id)
+    assert OrderDAO().assign_orders(plan) == []
+
+    db.session.expire_all()
+    order = db.session.get(Order, planned)
+    assert (order.status, order.delivery_person_id) == ('ready_for_pickup', None)
+    assert Order.query.filter_by(delivery_person_id=courier_id, status='out_for_delivery').count() == 1
+
+
+def test_assignment_gives_an_idle_courier_one_order(app):
+    courier_id = User.query.filter_by(role='delivery_person').first().id
+    first, second = _pickup(), _pickup()
+
+    assert OrderDAO().assign_orders([(first, courier_id), (second, courier_id)]) == [(first, courier_id)]
@@ -0,0 +1,55 @@
+"""Role decorators when the signed session snapshot outlives the user row."""
+import time
+
+from flask import g
+
+from db import db
+from models.user import User
+from utils.auth import require_role
+
+
+def _snapshot_login(client, user):
+    with client.session_transaction() as session:
+        session.clear()
+        session['user_id'] = user.id
+        session['_user_id'] = str(user.id)
+        session['user_role'] = user.role
+        session['user_active'] = bool(user.is_active)
+        session['identity_checked_at'] = int(time.time())
+    g.pop('current_user', None)
+    g.pop('identity_from_snapshot', None)
+
+
+def _new_customer():
+    user = User(username='gone', email='gone@example.com', first_name='Gone', last_name='User',
+                role='customer', is_verified=True)
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_deleted_user_with_trusted_snapshot_is_logged_out(app, client):
+    user = _new_customer()
+    _snapshot_login(client, user)
+    db.session.delete(user)
+    db.session.commit()
+    db.session.remove()
+
+    response = client.get('/customer/dashboard')
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
+    with client.session_transaction() as session:
+        assert 'user_id' not in session and 'user_role' not in session
+
+
+def test_require_role_rejects_deactivated_user(app, client):
+    app.add_url_rule('/test-require-role', 'test_require_role', require_role('customer')(lambda: 'ok'))
+    user = _new_customer()
+    user.is_active = False
+    db.session.commit()
+    _snapshot_login(client, user)
+
+    response = client.get('/test-require-role')
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
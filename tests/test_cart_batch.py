@@ -0,0 +1,77 @@
+"""POST /cart/batch (CartDAO.apply_operations)."""
+import pytest
+
+from db import db
+from dao.cart_dao import CartDAO
+from models.cart import Cart
+from models.menu import Menu
+
+
+@pytest.fixture
+def customer_id(login):
+    return login('customer').id
+
+
+@pytest.fixture
+def menu_ids(app):
+    return [menu.id for menu in Menu.query.filter_by(is_available=True).limit(2)]
+
+
+def _lines(customer_id):
+    db.session.expire_all()
+    return sorted((line.menu_id, line.quantity) for line in Cart.query.filter_by(user_id=customer_id))
+
+
+def _batch(client, operations):
+    db.session.remove()
+    return client.post('/cart/batch', json={'operations': operations})
+
+
+def test_operations_apply_in_order(client, customer_id, menu_ids):
+    first, second = menu_ids
+    CartDAO().add_items(customer_id, [(first, 5, '')])
+
+    response = _batch(client, [
+        {'op': 'clear'},
+        {'op': 'add', 'menu_id': second, 'quantity': 2},
+        {'op': 'add', 'menu_id': second, 'quantity': 1},
+    ])
+
+    assert response.status_code == 200
+    assert _lines(customer_id) == [(second, 3)]
+    assert response.get_json()['cart']['quantity'] == 3
+
+
+def test_one_bad_operation_rolls_back_the_batch(client, customer_id, menu_ids):
+    first, second = menu_ids
+    cart_id = CartDAO().add_items(customer_id, [(first, 2, '')])[(first, '')]
+
+    response = _batch(client, [
+        {'op': 'update', 'cart_id': cart_id, 'quantity': 9},
+        {'op': 'add', 'menu_id': second, 'quantity': 1},
+        {'op': 'add', 'menu_id': second, 'quantity': 0},
+    ])
+
+    assert response.status_code == 400
+    assert _lines(customer_id) == [(first, 2)]
+
+
+def test_unknown_cart_id_is_404(client, customer_id, menu_ids):
+    first, _ = menu_ids
+    CartDAO().add_items(customer_id, [(first, 2, '')])
+
+    response = _batch(client, [{'op': 'clear'}, {'op': 'remove', 'cart_id': 999999}])
+
+    assert response.status_code == 404
+    assert _lines(customer_id) == [(first, 2)]
+
+
+def test_operation_count_is_limited(app, client, customer_id, menu_ids):
+    app.config['CART_BATCH_MAX_ITEMS'] = 2
+    first, _ = menu_ids
+
+    response = _batch(client, [{'op': 'add', 'menu_id': first, 'quantity': 1}] * 3)
+
+    assert response.status_code == 400
+    assert 'At most 2' in response.get_json()['error']
+    assert _lines(customer_id) == []
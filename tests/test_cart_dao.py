@@ -0,0 +1,92 @@
+"""CartDAO write paths and the unique-cart-lines migration."""
+import os
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import text
+
+from app import create_app
+from config import Config
+from db import db
+from dao.cart_dao import CartDAO
+from models.cart import Cart
+from models.menu import Menu
+from models.user import User
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+@pytest.fixture
+def customer_id(app):
+    return User.query.filter_by(role='customer').first().id
+
+
+@pytest.fixture
+def menu_ids(app):
+    return [menu.id for menu in Menu.query.filter_by(is_available=True).limit(2)]
+
+
+def _lines(customer_id):
+    db.session.expire_all()
+    return sorted((line.menu_id, line.customization, line.quantity)
+                  for line in Cart.query.filter_by(user_id=customer_id))
+
+
+def test_add_items_merges_into_existing_lines(customer_id, menu_ids):
+    first, second = menu_ids
+    dao = CartDAO()
+    dao.add_items(customer_id, [(first, 1, None), (first, 2, ''), (second, 1, 'extra cheese')])
+    lines = dao.add_items(customer_id, [(first, 3, None), (second, 1, 'extra cheese'), (second, 1, None)])
+
+    # None and '' are the same customization; ON CONFLICT adds to the stored quantity
+    assert _lines(customer_id) == sorted([(first, '', 6), (second, 'extra cheese', 2), (second, '', 1)])
+    assert set(lines) == {(first, ''), (second, 'extra cheese'), (second, '')}
+
+
+def test_update_items_merges_lines_on_customization_change(customer_id, menu_ids):
+    first, _ = menu_ids
+    lines = CartDAO().add_items(customer_id, [(first, 2, ''), (first, 3, 'spicy')])
+    plain, spicy = lines[(first, '')], lines[(first, 'spicy')]
+
+    result = CartDAO().update_items(customer_id, [(plain, 4, 'spicy')])
+
+    assert result == {plain: 0, spicy: 7}
+    assert _lines(customer_id) == [(first, 'spicy', 7)]
+
+
+def test_update_items_quantity_zero_deletes(customer_id, menu_ids):
+    first, second = menu_ids
+    lines = CartDAO().add_items(customer_id, [(first, 2, ''), (second, 1, '')])
+
+    assert CartDAO().update_items(customer_id, [(lines[(first, '')], 0, None)]) == {lines[(first, '')]: 0}
+    assert _lines(customer_id) == [(second, '', 1)]
+
+
+def test_unique_cart_lines_migration_folds_duplicates(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(tmp_path / 'migrate.db'))
+    migrated = create_app()
+    with migrated.app_context():
+        upgrade(directory=MIGRATIONS, revision='4b8e2d61c9f5')
+        rows = [
+            # user 1, menu 1: NULL and '' are one line; id 1 survives with the total
+            (1, 1, 1, 2, None), (2, 1, 1, 3, ''), (3, 1, 1, 4, None),
+            # same item with a different customization stays separate
+            (4, 1, 1, 1, 'spicy'),
+            # another user's line is untouched
+            (5, 2, 1, 5, ''),
+        ]
+        for row in rows:
+            db.session.execute(text(
+                "INSERT INTO carts (id, user_id, menu_id, quantity, customization, created_at, updated_at) "
+                "VALUES (:id, :user_id, :menu_id, :quantity, :customization, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+            ), dict(zip(('id', 'user_id', 'menu_id', 'quantity', 'customization'), row)))
+        db.session.commit()
+
+        upgrade(directory=MIGRATIONS, revision='6c1f93a8e2d7')
+
+        result = db.session.execute(text(
+            "SELECT id, user_id, menu_id, quantity, customization FROM carts ORDER BY id"
+        )).all()
+        assert [tuple(row) for row in result] == [(1, 1, 1, 9, ''), (4, 1, 1, 1, 'spicy'), (5, 2, 1, 5, '')]
+        db.session.remove()
+        db.engine.dispose()
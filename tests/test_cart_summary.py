@@ -0,0 +1,52 @@
+"""Cart summaries are retired when a menu item in the cart changes."""
+from dao.cart_dao import CartDAO
+from dao.cart_summary import cart_summary
+from dao.menu_dao import MenuDAO
+from models.menu import Menu
+from models.user import User
+from utils.cache import LocalCacheBackend
+
+
+def _cart_with_two_items():
+    customer_id = User.query.filter_by(role='customer').first().id
+    first, second = Menu.query.filter_by(is_available=True).limit(2)
+    CartDAO().add_to_cart(customer_id, first.id, 1)
+    CartDAO().add_to_cart(customer_id, second.id, 1)
+    return customer_id, first
+
+
+def test_price_change_retires_summary(app):
+    customer_id, menu = _cart_with_two_items()
+    before = cart_summary.get(customer_id)['total']
+
+    menu.price = menu.price + 10
+    menu.discounted_price = None
+    MenuDAO().update_menu(menu)
+
+    assert cart_summary._load(customer_id) is None
+    assert cart_summary.get(customer_id)['total'] != before
+
+
+def test_availability_change_retires_summary(app):
+    customer_id, menu = _cart_with_two_items()
+    cart_summary.get(customer_id)
+    assert cart_summary._load(customer_id) is not None
+
+    assert MenuDAO().delete_menu(menu)
+    assert cart_summary._load(customer_id) is None
+
+    cart_summary.get(customer_id)
+    menu.is_available = True
+    MenuDAO().update_menu(menu)
+    assert cart_summary._load(customer_id) is None
+
+
+def test_shared_backend_writes_invalidate_instead_of_patching(app):
+    cart_summary.configure(ttl=30, shared=LocalCacheBackend())
+    customer_id, menu = _cart_with_two_items()
+    assert cart_summary.get(customer_id)['item_count'] == 2
+
+    # Another worker's stale copy must not survive a write
+    CartDAO().add_to_cart(customer_id, menu.id, 3)
+    assert cart_summary._load(customer_id) is None
+    assert cart_summary.get(customer_id)['quantity'] == 5
@@ -0,0 +1,99 @@
+"""Statement and flush counts for multi-restaurant checkout (OrderDAO.place_orders_from_cart)."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from db import db
+from dao.cart_dao import CartDAO
+from dao.order_dao import OrderDAO
+from models.cart import Cart
+from models.menu import Menu
+from models.order import Order, OrderItem
+from models.restaurant import Restaurant
+from models.user import User
+
+DETAILS = dict(booking_name='Test', phone='1', delivery_address='Street 1', payment_method='cod')
+
+
+@pytest.fixture
+def flushes(app):
+    flushed = []
+
+    def record(session, flush_context):
+        flushed.append(session)
+
+    event.listen(Session, 'after_flush', record)
+    yield flushed
+    event.remove(Session, 'after_flush', record)
+
+
+def _fill_cart(customer_id, lines_per_restaurant):
+    lines = 0
+    for restaurant in Restaurant.query.all():
+        for menu in Menu.query.filter_by(restaurant_id=restaurant.id).limit(lines_per_restaurant):
+            CartDAO().add_to_cart(customer_id, menu.id, 2)
+            lines += 1
+    return lines
+
+
+def _checkout(customer_id, statements, flushes):
+    db.session.remove()
+    del statements[:]
+    del flushes[:]
+    placed = OrderDAO().place_orders_from_cart(customer_id, DETAILS)
+    writes = [sql for sql, _ in statements if not sql.lstrip().upper().startswith('SELECT')]
+    return placed, len(statements), writes
+
+
+def test_checkout_statements_do_not_grow_with_cart_lines(app, statements, flushes):
+    customer_id = User.query.filter_by(role='customer').first().id
+    restaurant_count = Restaurant.query.count()
+    # Warm the order number block so both checkouts allocate the same way
+    _fill_cart(customer_id, 1)
+    OrderDAO().place_orders_from_cart(customer_id, DETAILS)
+
+    small_lines = _fill_cart(customer_id, 1)
+    small, small_count, _ = _checkout(customer_id, statements, flushes)
+    large_lines = _fill_cart(customer_id, 3)
+    large, large_count, writes = _checkout(customer_id, statements, flushes)
+
+    assert large_lines > small_lines
+    assert len(small) == len(large) == restaurant_count
+    assert large_count == small_count
+    assert flushes == []
+    # One priced SELECT, one INSERT each for orders, items and status events,
+    # one cart DELETE, and a rollup upsert plus counter UPDATE per restaurant
+    assert large_count == 5 + 2 * restaurant_count
+    assert sum(sql.lstrip().upper().startswith('INSERT INTO ORDER_ITEMS') for sql in writes) == 1
+
+
+def test_checkout_is_atomic_and_clears_cart(app):
+    customer_id = User.query.filter_by(role='customer').first().id
+    lines = _fill_cart(customer_id, 2)
+    placed = OrderDAO().place_orders_from_cart(customer_id, DETAILS)
+
+    assert Cart.query.filter_by(user_id=customer_id).count() == 0
+    order_ids = [order['id'] for order in placed]
+    assert OrderItem.query.filter(OrderItem.order_id.in_(order_ids)).count() == lines
+    assert {order.restaurant_id for order in Order.query.filter(Order.id.in_(order_ids))} == \
+        {restaurant.id for restaurant in Restaurant.query.all()}
+
+
+def test_place_order_uses_configured_tax_and_eta(app, client, login):
+    app.config['TAX_RATE'] = 0.1
+    app.config['DEFAULT_DELIVERY_TIME'] = 90
+    customer_id = login('customer').id
+    menu = Menu.query.first()
+    CartDAO().add_to_cart(customer_id, menu.id, 2)
+    subtotal = menu.get_effective_price() * 2
+    db.session.remove()
+
+    started = datetime.now()
+    response = client.post('/checkout/place_order', data=DETAILS)
+
+    assert response.status_code == 302
+    order = Order.query.filter_by(customer_id=customer_id).one()
+    assert order.tax_amount == pytest.approx(subtotal * 0.1)
+    assert order.estimated_delivery_time >= started + timedelta(minutes=89)
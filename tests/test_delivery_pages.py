@@ -0,0 +1,28 @@
+"""Rendering of the courier's own order list (/delivery/orders)."""
+import uuid
+
+from db import db
+from models.order import Order
+from models.restaurant import Restaurant
+from models.user import User
+
+
+def test_orders_page_renders_assigned_orders(app, client, login):
+    courier = login('delivery_person')
+    customer = User.query.filter_by(role='customer').first()
+    restaurant = Restaurant.query.first()
+    for status in ('out_for_delivery', 'delivered'):
+        db.session.add(Order(
+            customer_id=customer.id, restaurant_id=restaurant.id, total_amount=100.0, status=status,
+            booking_name='Test', phone='1', delivery_address='Street 1', payment_method='cod',
+            delivery_person_id=courier.id, order_number='T' + uuid.uuid4().hex[:12]
+        ))
+    db.session.commit()
+    username, restaurant_name = customer.username, restaurant.name
+    db.session.remove()
+
+    response = client.get('/delivery/orders')
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert body.count(username) >= 2
+    assert restaurant_name in body
@@ -0,0 +1,57 @@
+"""Channel selection and the open-stream cap for /events/orders."""
+import uuid
+
+from controllers import events_controller
+from controllers.events_controller import _order_channels
+from dao.order_dao import OrderDAO
+from db import db
+from models.order import Order
+from models.restaurant import Restaurant
+from models.user import User
+from utils.event_bus import event_bus
+
+
+def _identity(user):
+    return {'id': user.id, 'role': user.role, 'is_active': True}
+
+
+def test_courier_on_a_delivery_skips_pickup_pool(app):
+    courier = User.query.filter_by(role='delivery_person').first()
+    assert _order_channels(_identity(courier)) == [f'courier:{courier.id}', 'pickup_pool']
+
+    order = Order(
+        customer_id=User.query.filter_by(role='customer').first().id,
+        restaurant_id=Restaurant.query.first().id, total_amount=100.0, status='ready_for_pickup',
+        booking_name='Test', phone='1', delivery_address='Street 1', payment_method='cod',
+        order_number='T' + uuid.uuid4().hex[:12]
+    )
+    db.session.add(order)
+    db.session.commit()
+    assert OrderDAO().claim_order(order.id, courier.id)
+
+    assert _order_channels(_identity(courier)) == [f'courier:{courier.id}']
+
+
+def test_stream_limit_returns_503(app, client, login, monkeypatch):
+    app.config['EVENT_STREAM_MAX_CLIENTS'] = 1
+    monkeypatch.setattr(events_controller, '_open_streams', 1)
+    login('customer')
+
+    response = client.get('/events/orders')
+    assert response.status_code == 503
+    assert events_controller._open_streams == 1
+
+
+def test_unread_stream_releases_subscription_on_close(app, client, login):
+    customer = login('customer')
+    channel = f'customer:{customer.id}'
+
+    response = client.get('/events/orders')
+    assert response.status_code == 200
+    assert channel in event_bus._subscribers
+    assert events_controller._open_streams == 1
+
+    # Closed without ever iterating the body
+    response.close()
+    assert channel not in event_bus._subscribers
+    assert events_controller._open_streams == 0
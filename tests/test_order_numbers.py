@@ -0,0 +1,68 @@
+"""Uniqueness of utils.order_numbers under concurrent processes.
+
+ORDER_NUMBER_STRESS scales the run up, e.g. ORDER_NUMBER_STRESS=100000
+spreads 100k numbers over the worker processes.
+"""
+import multiprocessing
+import os
+import time
+
+from config import Config
+from db import db
+from models.order import Order, OrderNumberSequence
+from models.restaurant import Restaurant
+
+WORKERS = 4
+TOTAL = int(os.environ.get('ORDER_NUMBER_STRESS') or 2000)
+
+
+def _allocate(database_uri, count, block_size):
+    """Worker process: draw count numbers, every tenth inside an open write transaction"""
+    Config.SQLALCHEMY_DATABASE_URI = database_uri
+    from app import create_app
+    app = create_app()
+    app.config['ORDER_NUMBER_BLOCK_SIZE'] = block_size
+    numbers = []
+    with app.app_context():
+        restaurant = Restaurant.query.first()
+        for index in range(count):
+            if index % 10 == 0:
+                restaurant.delivery_time = index
+                db.session.flush()
+                numbers.append(Order.generate_order_number())
+                db.session.commit()
+            else:
+                numbers.append(Order.generate_order_number())
+    return numbers
+
+
+def test_numbers_are_unique_across_processes(app, tmp_path):
+    database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+    db.session.remove()
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(WORKERS) as pool:
+        results = pool.starmap(_allocate, [(database_uri, TOTAL // WORKERS, 7)] * WORKERS)
+
+    numbers = [number for result in results for number in result]
+    assert len(numbers) == (TOTAL // WORKERS) * WORKERS
+    assert len(set(numbers)) == len(numbers)
+
+
+def test_exhausted_block_inside_write_transaction_does_not_wait_for_lock(app):
+    app.config['ORDER_NUMBER_BLOCK_SIZE'] = 1
+    first = Order.generate_order_number()
+
+    # The session now holds SQLite's write lock; a second connection would block on it
+    restaurant = Restaurant.query.first()
+    restaurant.delivery_time = 99
+    db.session.flush()
+    started = time.monotonic()
+    inside = Order.generate_order_number()
+    assert time.monotonic() - started < 1
+    assert inside != first
+
+    # Rolling back returns the value; it was never handed to anyone else
+    db.session.rollback()
+    after = Order.generate_order_number()
+    assert after != first
+    assert OrderNumberSequence.query.one().next_value == int(after[-6:])
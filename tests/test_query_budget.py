@@ -0,0 +1,102 @@
+"""Per-page SQL statement budgets for the hot pages.
+
+The SQL_QUERY_BUDGET middleware is switched on (it raises in TESTING
+mode), each page is fetched with a fresh session, and its
+X-SQL-Query-Count must stay within the page's budget and must not grow
+when there are more orders on the page.
+"""
+import uuid
+
+import pytest
+from flask import g
+
+from config import Config
+from db import db
+from dao.cart_dao import CartDAO
+from models.menu import Menu
+from models.order import Order, OrderItem
+from models.restaurant import Restaurant
+from models.user import User
+
+# (role, path, budget); role None means anonymous
+PAGES = [
+    (None, '/', 3),
+    (None, '/restaurant/{restaurant_id}', 4),
+    ('customer', '/customer/dashboard', 8),
+    ('customer', '/customer/restaurants', 4),
+    ('customer', '/customer/cart', 4),
+    ('customer', '/customer/orders', 5),
+    ('restaurant_owner', '/restaurant-owner/dashboard', 7),
+    ('restaurant_owner', '/restaurant-owner/orders', 8),
+    ('delivery_person', '/delivery/dashboard', 9),
+    ('delivery_person', '/delivery/orders', 4),
+    ('delivery_person', '/delivery/available_orders', 5),
+    ('delivery_person', '/delivery/earnings', 4),
+    ('admin', '/admin/api/orders?per_page=5', 4),
+    ('admin', '/admin/api/orders?per_page=50', 4),
+]
+
+STATUSES = ['pending', 'ready_for_pickup', 'out_for_delivery', 'delivered']
+
+
+@pytest.fixture(autouse=True)
+def query_budget(monkeypatch):
+    # Ceiling for every request; pages are held to their own budgets below
+    monkeypatch.setattr(Config, 'SQL_QUERY_BUDGET', 20, raising=False)
+
+
+def _add_orders(count):
+    customer = User.query.filter_by(role='customer').first()
+    courier = User.query.filter_by(role='delivery_person').first()
+    for index in range(count):
+        status = STATUSES[index % len(STATUSES)]
+        for restaurant in Restaurant.query.all():
+            order = Order(
+                customer_id=customer.id, restaurant_id=restaurant.id, total_amount=100.0, status=status,
+                booking_name='Test', phone='1', delivery_address='Street 1', payment_method='cod',
+                delivery_person_id=courier.id if status in ('out_for_delivery', 'delivered') else None,
+                order_number='T' + uuid.uuid4().hex[:12]
+            )
+            for menu in Menu.query.filter_by(restaurant_id=restaurant.id).limit(2):
+                order.order_items.append(OrderItem(menu_id=menu.id, quantity=1, price=menu.price))
+            db.session.add(order)
+    db.session.commit()
+
+
+def _query_counts(client, login):
+    restaurant_id = Restaurant.query.first().id
+    counts = {}
+    for role, path, budget in PAGES:
+        if role:
+            login(role)
+        else:
+            with client.session_transaction() as session:
+                session.clear()
+            g.pop('current_user', None)
+        # Requests share the test's app context; start each from an empty identity map
+        db.session.remove()
+        response = client.get(path.format(restaurant_id=restaurant_id))
+        assert response.status_code == 200, path
+        counts[path] = int(response.headers['X-SQL-Query-Count'])
+    return counts
+
+
+def test_pages_stay_within_budget(app, client, login):
+    customer = User.query.filter_by(role='customer').first()
+    for menu in Menu.query.limit(4):
+        CartDAO().add_to_cart(customer.id, menu.id, 2)
+    _add_orders(4)
+
+    counts = _query_counts(client, login)
+    for role, path, budget in PAGES:
+        assert counts[path] <= budget, f'{path} issued {counts[path]} statements (budget {budget})'
+
+
+def test_query_counts_do_not_grow_with_orders(app, client, login):
+    _add_orders(4)
+    # Warm the catalog cache so both passes see the same cache state
+    _query_counts(client, login)
+    before = _query_counts(client, login)
+    _add_orders(8)
+    after = _query_counts(client, login)
+    assert after == before
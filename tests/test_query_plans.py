@@ -0,0 +1,104 @@
+"""EXPLAIN QUERY PLAN checks for the hot listing queries.
+
+Every SELECT a DAO call issues must be answered by index searches: no
+full table scan and no temp B-tree sort.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import db
+from dao.cart_dao import CartDAO
+from dao.menu_dao import MenuDAO
+from dao.order_dao import OrderDAO
+from dao.restaurant_dao import RestaurantDAO
+from models.menu import Menu
+from models.order import Order
+from models.restaurant import Restaurant
+from models.user import User
+
+
+def _plans(statements, call):
+    """EXPLAIN QUERY PLAN details for each SELECT issued by call()"""
+    db.session.expire_all()
+    del statements[:]
+    call()
+    selects = [(sql, params) for sql, params in statements if sql.lstrip().upper().startswith('SELECT')]
+    assert selects, 'call issued no SELECT'
+    connection = db.session.connection()
+    return [
+        (sql, [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, params).fetchall()])
+        for sql, params in selects
+    ]
+
+
+def _assert_indexed(statements, call):
+    for sql, plan in _plans(statements, call):
+        problems = [step for step in plan
+                    if 'TEMP B-TREE' in step or (step.startswith('SCAN ') and 'INDEX' not in step)]
+        assert not problems, f'{plan}\n{sql}'
+
+
+@pytest.fixture
+def orders(app):
+    """A few orders per restaurant across the pickup, delivery and history states"""
+    customer = User.query.filter_by(role='customer').first()
+    courier = User.query.filter_by(role='delivery_person').first()
+    now = datetime.utcnow()
+    for index, restaurant in enumerate(Restaurant.query.all()):
+        for offset, status in enumerate(['pending', 'ready_for_pickup', 'out_for_delivery', 'delivered']):
+            db.session.add(Order(
+                customer_id=customer.id, restaurant_id=restaurant.id, total_amount=100.0, status=status,
+                booking_name='Test', phone='1', delivery_address='Street 1', payment_method='cod',
+                delivery_person_id=courier.id if status in ('out_for_delivery', 'delivered') else None,
+                created_at=now - timedelta(minutes=index * 10 + offset),
+                order_number='T' + uuid.uuid4().hex[:12]
+            ))
+    db.session.commit()
+    return customer, courier
+
+
+def test_available_pickups(statements, orders):
+    _assert_indexed(statements, lambda: OrderDAO().get_available_orders_for_delivery())
+    listing_plan = _plans(statements, lambda: OrderDAO().get_available_orders_for_delivery())[0][1]
+    assert any('ix_orders_status_created_at' in step for step in listing_plan), listing_plan
+
+
+@pytest.mark.parametrize('status_filter', ['', 'pending'])
+def test_owner_order_lists(statements, orders, status_filter):
+    restaurant_ids = [restaurant.id for restaurant in Restaurant.query.all()]
+    dao = OrderDAO()
+    _assert_indexed(statements, lambda: dao.get_orders_by_restaurants(restaurant_ids, status_filter=status_filter))
+    _assert_indexed(statements, lambda: dao.get_orders_by_restaurants(restaurant_ids[:1], status_filter=status_filter))
+
+
+def test_merged_owner_orders_match_single_query_order(orders):
+    restaurant_ids = [restaurant.id for restaurant in Restaurant.query.all()]
+    expected = Order.query.filter(Order.restaurant_id.in_(restaurant_ids)) \
+        .order_by(Order.created_at.desc(), Order.id.desc()).all()
+    page_one = OrderDAO().get_orders_by_restaurants(restaurant_ids, page=1, per_page=5)
+    page_two = OrderDAO().get_orders_by_restaurants(restaurant_ids, page=2, per_page=5)
+    assert page_one.total == len(expected)
+    assert [order.id for order in page_one.items + page_two.items] == [order.id for order in expected[:10]]
+
+
+def test_customer_and_courier_order_lists(statements, orders):
+    customer, courier = orders
+    dao = OrderDAO()
+    _assert_indexed(statements, lambda: dao.get_orders_by_user(customer.id))
+    _assert_indexed(statements, lambda: dao.get_orders_by_delivery_person(courier.id))
+
+
+@pytest.mark.parametrize('sort_by', ['rating', 'delivery_time', 'name', 'newest'])
+def test_restaurant_listing_sorts(statements, app, sort_by):
+    _assert_indexed(statements, lambda: RestaurantDAO().get_restaurants(sort_by=sort_by))
+
+
+def test_menu_and_cart(statements, app):
+    restaurant = Restaurant.query.first()
+    customer = User.query.filter_by(role='customer').first()
+    menu = Menu.query.filter_by(restaurant_id=restaurant.id).first()
+    CartDAO().add_to_cart(customer.id, menu.id, 2)
+    _assert_indexed(statements, lambda: MenuDAO().get_menu_by_restaurant(restaurant.id))
+    _assert_indexed(statements, lambda: CartDAO().get_cart_items(customer.id))
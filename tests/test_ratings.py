@@ -0,0 +1,38 @@
+"""Listed ratings are blended with order ratings, not replaced by them."""
+import uuid
+
+from db import db
+from dao.order_dao import OrderDAO
+from models.order import Order
+from models.restaurant import Restaurant
+from models.user import User
+
+
+def _delivered_order(restaurant_id, customer_id):
+    order = Order(
+        customer_id=customer_id, restaurant_id=restaurant_id, total_amount=100.0, status='delivered',
+        booking_name='Test', phone='1', delivery_address='Street 1', payment_method='cod',
+        order_number='T' + uuid.uuid4().hex[:12]
+    )
+    return OrderDAO().create_order(order)
+
+
+def test_first_rating_moves_listed_rating_gradually(app):
+    customer_id = User.query.filter_by(role='customer').first().id
+    restaurants = Restaurant.query.order_by(Restaurant.rating_score.desc()).all()
+    top = restaurants[0]
+    listed, weight = top.rating, top.seed_rating_count
+    assert weight > 0
+    # Seeded listings keep their order instead of all scoring the prior mean
+    assert [r.id for r in restaurants] == [r.id for r in sorted(restaurants, key=lambda r: -r.rating)]
+
+    assert OrderDAO().rate_order(_delivered_order(top.id, customer_id), customer_id, 1)
+    db.session.expire_all()
+    assert top.rating == (listed * weight + 1) / (weight + 1)
+    assert top.rating_count == 1
+
+    # Reconciling from orders keeps the seed
+    score = top.rating_score
+    assert OrderDAO().reconcile_restaurant_counters() == 0
+    db.session.expire_all()
+    assert top.rating_score == score
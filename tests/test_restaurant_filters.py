@@ -0,0 +1,15 @@
+"""Listing type filter on /customer/restaurants (RestaurantDAO)."""
+from dao.restaurant_dao import RestaurantDAO
+
+
+def test_type_filters(app):
+    dao = RestaurantDAO()
+    everything = dao.get_restaurants(per_page=50).total
+    assert dao.get_restaurants(per_page=50, type_filter='veg').total == everything
+    assert dao.get_restaurants(per_page=50, type_filter='non-veg').total == everything - 1
+    # 'both' is not a narrowing filter; it lists every type as it always has
+    assert dao.get_restaurants(per_page=50, type_filter='both').total == everything
+
+    facets = dao.get_facets(type_filter='both')
+    assert dict(facets['type']) == {'veg': everything, 'non-veg': everything - 1}
+    assert facets['total'] == everything
@@ -0,0 +1,109 @@
+from datetime import datetime
+from utils.geo import haversine_km
+
+INF = float('inf')
+
+
+def solve_assignment(cost):
+    """Minimum-cost matching for a rectangular cost matrix (list of rows).
+
+    Hungarian method with potentials (shortest augmenting paths),
+    O(n^2 * m) for n = min(rows, cols). Every row is matched when there
+    are no more rows than columns, otherwise every column. Use a large
+    finite cost, not inf, for pairs that must not be matched and filter
+    them from the result. Returns sorted (row, col) pairs.
+    """
+    if not cost or not cost[0]:
+        return []
+
+    transposed = len(cost) > len(cost[0])
+    if transposed:
+        cost = [list(column) for column in zip(*cost)]
+    n, m = len(cost), len(cost[0])
+
+    # 1-based potentials; p[j] is the row matched to column j (0 = free)
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = INF
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = row[j - 1] - ui0 - v[j]
+                    if reduced < minv[j]:
+                        minv[j] = reduced
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    pairs = [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return sorted(pairs)
+
+
+# Cost of a pair that must not be matched (beyond MAX_DELIVERY_DISTANCE)
+FORBIDDEN = 1e9
+
+
+def build_cost_matrix(couriers, orders, max_distance_km, wait_weight, now):
+    """Courier x order costs: pickup distance in km minus a credit per minute the order has waited.
+
+    couriers are (id, lat, lng); orders are (id, lat, lng, ready_at).
+    The wait credit only decides which orders win when there are more
+    orders than couriers; distance decides who gets them.
+    """
+    cost = []
+    for _, courier_lat, courier_lng in couriers:
+        row = []
+        for _, order_lat, order_lng, ready_at in orders:
+            distance = haversine_km(courier_lat, courier_lng, order_lat, order_lng)
+            if distance > max_distance_km:
+                row.append(FORBIDDEN)
+            else:
+                waited = (now - ready_at).total_seconds() / 60 if ready_at else 0
+                row.append(distance - wait_weight * waited)
+        cost.append(row)
+    return cost
+
+
+def plan_assignments(couriers, orders, max_distance_km, wait_weight=0.0, now=None):
+    """Optimal (order_id, courier_id, distance_km) pairs for one batch"""
+    if not couriers or not orders:
+        return []
+    now = now or datetime.utcnow()
+    cost = build_cost_matrix(couriers, orders, max_distance_km, wait_weight, now)
+    plan = []
+    for row, col in solve_assignment(cost):
+        if cost[row][col] >= FORBIDDEN:
+            continue
+        courier_id, courier_lat, courier_lng = couriers[row]
+        order_id, order_lat, order_lng, _ = orders[col]
+        plan.append((order_id, courier_id, haversine_km(courier_lat, courier_lng, order_lat, order_lng)))
+    return plan
@@ -1,110 +1,117 @@
-from flask import session, g, redirect, url_for, flash
+import time
+from flask import session, g, redirect, url_for, flash, current_app, abort
 from flask_login import login_user as flask_login_user, logout_user as flask_logout_user, current_user
 from functools import wraps
+from db import db
 from models.user import User
 
 def get_current_user():
-    """Get current user from session"""
+    """Get current user from session, loaded at most once per request.
+
+    A session whose user no longer exists is logged out. If a role
+    decorator already let the request through on the session snapshot,
+    the request is redirected to the login page instead of continuing
+    with no user.
+    """
+    if 'current_user' not in g:
+        user_id = session.get('user_id')
+        g.current_user = db.session.get(User, user_id) if user_id else None
+        if user_id and g.current_user is None:
+            trusted_snapshot = g.pop('identity_from_snapshot', False)
+            logout_user_session()
+            g.current_user = None
+            if trusted_snapshot:
+                flash('Please log in to access this page.', 'error')
+                abort(redirect(url_for('auth.login')))
+    return g.current_user
+
+def _store_identity(user):
+    """Write the signed role/active snapshot used by the role decorators"""
+    session['user_role'] = user.role
+    session['user_active'] = bool(user.is_active)
+    session['identity_checked_at'] = int(time.time())
+
+def get_current_identity():
+    """Get {'id', 'role', 'is_active'} for the logged in user, or None.
+
+    Within AUTH_SNAPSHOT_MAX_AGE seconds of the last check this is read
+    from the signed session cookie without touching the database; after
+    that (or for sessions without a snapshot) the user is reloaded and the
+    snapshot refreshed, so role or status changes apply within that window.
+    """
     user_id = session.get('user_id')
-    if user_id:
-        return User.query.get(user_id)
-    return None
+    if not user_id:
+        return None
+
+    max_age = current_app.config.get('AUTH_SNAPSHOT_MAX_AGE', 0)
+    checked_at = session.get('identity_checked_at')
+    if max_age and checked_at and 'user_role' in session and 'user_active' in session \
+            and time.time() - checked_at < max_age:
+        g.identity_from_snapshot = True
+        return {'id': user_id, 'role': session['user_role'], 'is_active': session['user_active']}
+
+    user = get_current_user()
+    if not user:
+        return None
+    _store_identity(user)
+    return {'id': user.id, 'role': user.role, 'is_active': bool(user.is_active)}
 
 def login_user_session(user):
     """Login user in both custom session and Flask-Login"""
     session['user_id'] = user.id
-    session['user_role'] = user.role
+    _store_identity(user)
+    g.current_user = user
     flask_login_user(user)
 
 def logout_user_session():
     """Logout user from both custom session and Flask-Login"""
     session.pop('user_id', None)
     session.pop('user_role', None)
+    session.pop('user_active', None)
+    session.pop('identity_checked_at', None)
+    g.pop('current_user', None)
     flask_logout_user()
 
+def _role_required(role, message):
+    """Build a decorator that requires a logged in, active user (optionally with a role)"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            identity = get_current_identity()
+            if not identity or not identity['is_active']:
+                flash('Please log in to access this page.', 'error')
+                return redirect(url_for('auth.login'))
+            if role and identity['role'] != role:
+                flash(message, 'error')
+                return redirect(url_for('public.index'))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
 def login_required(f):
     """Decorator to require user to be logged in"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not g.current_user:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('auth.login'))
-        return f(*args, **kwargs)
-    return decorated_function
+    return _role_required(None, None)(f)
 
 def customer_required(f):
     """Decorator to require customer role"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not g.current_user:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('auth.login'))
-        if not g.current_user.is_customer():
-            flash('Access denied. Customer access required.', 'error')
-            return redirect(url_for('public.index'))
-        return f(*args, **kwargs)
-    return decorated_function
+    return _role_required('customer', 'Access denied. Customer access required.')(f)
 
 def restaurant_owner_required(f):
     """Decorator to require restaurant owner role"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not g.current_user:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('auth.login'))
-        if not g.current_user.is_restaurant_owner():
-            flash('Access denied. Restaurant owner access required.', 'error')
-            return redirect(url_for('public.index'))
-        return f(*args, **kwargs)
-    return decorated_function
+    return _role_required('restaurant_owner', 'Access denied. Restaurant owner access required.')(f)
 
 def delivery_required(f):
     """Decorator to require delivery person role"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not g.current_user:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('auth.login'))
-        if not g.current_user.is_delivery_person():
-            flash('Access denied. Delivery person access required.', 'error')
-            return redirect(url_for('public.index'))
-        return f(*args, **kwargs)
-    return decorated_function
+    return _role_required('delivery_person', 'Access denied. Delivery person access required.')(f)
 
 def admin_required(f):
     """Decorator to require admin role"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not g.current_user:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('auth.login'))
-        if not g.current_user.is_admin():
-            flash('Access denied. Admin access required.', 'error')
-            return redirect(url_for('public.index'))
-        return f(*args, **kwargs)
-    return decorated_function
+    return _role_required('admin', 'Access denied. Admin access required.')(f)
 
 def delivery_person_required(f):
     """Decorator to require delivery person role (alias for delivery_required)"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not g.current_user:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('auth.login'))
-        if not g.current_user.is_delivery_person():
-            flash('Access denied. Delivery person access required.', 'error')
-            return redirect(url_for('public.index'))
-        return f(*args, **kwargs)
-    return decorated_function
+    return delivery_required(f)
 
 def require_role(role):
     """Decorator to require specific role"""
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            if not g.current_user or g.current_user.role != role:
-                flash('Access denied.', 'error')
-                return redirect(url_for('auth.login'))
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
\ No newline at end of file
+    return _role_required(role, 'Access denied.')
@@ -0,0 +1,155 @@
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from utils.geo import haversine_km
+from utils.assignment import plan_assignments
+
+
+def _poisson(rng, mean):
+    # Knuth's method; fine for the small per-tick means used here
+    limit, count, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def _nearest(courier, open_orders, radius_km):
+    best = None
+    for order in open_orders:
+        distance = haversine_km(courier['lat'], courier['lng'], order['lat'], order['lng'])
+        if distance <= radius_km and (best is None or distance < best[0]):
+            best = (distance, order)
+    return best
+
+
+def replay(policy, couriers=60, minutes=240, orders_per_minute=1.5, tick_seconds=30,
+           radius_km=10, speed_kmh=20, wait_weight=0.05, seed=42):
+    """Replay a synthetic shift under one assignment policy and report pickup metrics.
+
+    policy is 'greedy' (each idle courier, in random order, takes the
+    nearest open order, like first-come accept_order) or 'batch' (one
+    optimal matching per tick via utils.assignment.plan_assignments). Both
+    see the same order stream. pickup wait is the time from an order
+    being ready until its courier reaches the restaurant.
+    """
+    # Separate streams so both policies see identical couriers and orders
+    rng = random.Random(seed)
+    policy_rng = random.Random(seed + 1)
+    center_lat, center_lng, spread = 12.97, 77.59, 0.08
+    start = datetime(2025, 1, 1, 12, 0)
+
+    def point():
+        return center_lat + rng.uniform(-spread, spread), center_lng + rng.uniform(-spread, spread)
+
+    fleet = []
+    for courier_id in range(couriers):
+        lat, lng = point()
+        fleet.append({'id': courier_id, 'lat': lat, 'lng': lng, 'free_at': start})
+
+    open_orders = []
+    waits = []
+    next_id = 0
+    ticks = int(minutes * 60 / tick_seconds)
+    for tick in range(ticks):
+        now = start + timedelta(seconds=tick * tick_seconds)
+
+        # Poisson arrivals for this tick
+        for _ in range(_poisson(rng, orders_per_minute * tick_seconds / 60)):
+            lat, lng = point()
+            drop_lat, drop_lng = point()
+            open_orders.append({'id': next_id, 'lat': lat, 'lng': lng, 'drop': (drop_lat, drop_lng), 'ready_at': now})
+            next_id += 1
+
+        idle = [courier for courier in fleet if courier['free_at'] <= now]
+        assignments = []
+        if policy == 'batch':
+            by_id = {order['id']: order for order in open_orders}
+            plan = plan_assignments(
+                [(c['id'], c['lat'], c['lng']) for c in idle],
+                [(o['id'], o['lat'], o['lng'], o['ready_at']) for o in open_orders],
+                max_distance_km=radius_km, wait_weight=wait_weight, now=now
+            )
+            assignments = [(fleet[courier_id], by_id[order_id], distance) for order_id, courier_id, distance in plan]
+        else:
+            policy_rng.shuffle(idle)
+            taken = set()
+            for courier in idle:
+                best = _nearest(courier, [o for o in open_orders if o['id'] not in taken], radius_km)
+                if best:
+                    taken.add(best[1]['id'])
+                    assignments.append((courier, best[1], best[0]))
+
+        assigned_ids = set()
+        for courier, order, distance in assignments:
+            to_pickup = timedelta(hours=distance / speed_kmh)
+            drop_km = haversine_km(order['lat'], order['lng'], *order['drop'])
+            waits.append((now + to_pickup - order['ready_at']).total_seconds() / 60)
+            courier['free_at'] = now + to_pickup + timedelta(hours=drop_km / speed_kmh)
+            courier['lat'], courier['lng'] = order['drop']
+            assigned_ids.add(order['id'])
+        open_orders = [order for order in open_orders if order['id'] not in assigned_ids]
+
+    waits.sort()
+    return {
+        'policy': policy,
+        'orders': next_id,
+        'assigned': len(waits),
+        'throughput_per_hour': round(len(waits) / (minutes / 60), 1),
+        'avg_pickup_wait_min': round(sum(waits) / len(waits), 1) if waits else 0,
+        'p90_pickup_wait_min': round(waits[int(len(waits) * 0.9)], 1) if waits else 0,
+        'left_open': len(open_orders)
+    }
+
+
+def benchmark_grid(couriers=5000, orders=5000, radius_km=10, cell_km=1.0, seed=42, scan_sample=200):
+    """Time dao.dispatch.GridIndex against a linear haversine scan on synthetic points.
+
+    Ranks the 10 nearest pickups within radius_km for every courier. The
+    linear scan runs on the first scan_sample couriers and is
+    extrapolated; its results are also used to count couriers whose grid
+    ranking differs.
+    """
+    from dao.dispatch import GridIndex
+
+    rng = random.Random(seed)
+    # Points spread over a ~60 x 60 km metro area
+    center_lat, center_lng, spread = 12.97, 77.59, 0.27
+
+    def point():
+        return center_lat + rng.uniform(-spread, spread), center_lng + rng.uniform(-spread, spread)
+
+    pickups = [point() for _ in range(orders)]
+    positions = [point() for _ in range(couriers)]
+
+    started = time.perf_counter()
+    index = GridIndex(cell_km)
+    for order_id, (lat, lng) in enumerate(pickups):
+        index.insert(order_id, lat, lng)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    grid_results = [index.nearby(lat, lng, radius_km, limit=10) for lat, lng in positions]
+    grid = time.perf_counter() - started
+
+    sample = positions[:min(couriers, scan_sample)]
+    started = time.perf_counter()
+    scan_results = []
+    for lat, lng in sample:
+        found = [(haversine_km(lat, lng, plat, plng), order_id) for order_id, (plat, plng) in enumerate(pickups)]
+        scan_results.append(sorted(item for item in found if item[0] <= radius_km)[:10])
+    scan = (time.perf_counter() - started) / len(sample) * couriers if sample else 0
+
+    mismatches = sum(
+        1 for got, expected in zip(grid_results, scan_results)
+        if [key for _, key, _ in got] != [key for _, key in expected]
+    )
+    return {
+        'build_ms': build * 1000,
+        'rank_ms': grid * 1000,
+        'rank_us_per_courier': grid / couriers * 1e6 if couriers else 0,
+        'scan_ms': scan * 1000,
+        'sampled': len(sample),
+        'mismatches': mismatches
+    }
@@ -0,0 +1,93 @@
+import queue
+import threading
+from collections import defaultdict
+
+
+class Subscription:
+    """Queue of events for one listener across one or more channels"""
+
+    def __init__(self, bus, channels, maxsize):
+        self.bus = bus
+        self.channels = tuple(channels)
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Slow client; drop the event rather than block the publisher
+            pass
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within timeout seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class CallbackSubscription(Subscription):
+    """Subscription that runs a callback in the publisher's thread instead of queueing"""
+
+    def __init__(self, bus, channels, callback):
+        super().__init__(bus, channels, maxsize=1)
+        self.callback = callback
+
+    def put(self, event):
+        try:
+            self.callback(event)
+        except Exception as e:
+            print(f"Error in event listener: {e}")
+
+
+class EventBus:
+    """In-process publish/subscribe hub keyed by channel name.
+
+    Publishing never blocks: each subscriber has its own bounded queue and
+    events for a full queue are dropped. Only listeners in the same process
+    see an event, so multi-worker deployments need a shared broker in its
+    place with the same publish/subscribe interface.
+    """
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        return self._add(Subscription(self, channels, self.maxsize))
+
+    def listen(self, channels, callback):
+        """Call callback(event) synchronously for every event; keep it cheap"""
+        return self._add(CallbackSubscription(self, channels, callback))
+
+    def _add(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                listeners = self._subscribers.get(channel)
+                if listeners is not None:
+                    listeners.discard(subscription)
+                    if not listeners:
+                        del self._subscribers[channel]
+
+    def publish(self, channels, event):
+        """Deliver event once to every subscriber of any of the channels"""
+        with self._lock:
+            targets = set()
+            for channel in channels:
+                targets.update(self._subscribers.get(channel, ()))
+        for subscription in targets:
+            subscription.put(event)
+        return len(targets)
+
+
+event_bus = EventBus()
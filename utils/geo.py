@@ -0,0 +1,68 @@
+import math
+import re
+from utils.cache import LRUCache
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class Geocoder:
+    """Resolves addresses to (latitude, longitude) through a pluggable provider.
+
+    The provider is any callable taking an address string and returning
+    (lat, lng) or None, e.g. a thin wrapper around a geocoding API client;
+    without one, geocode() always returns None and dispatch falls back to
+    oldest-first. Answers (including misses) are kept in an LRU keyed by
+    the normalised address, and callers store the result on the row, so
+    each address is looked up once.
+    """
+
+    def __init__(self, provider=None, maxsize=4096, ttl=86400):
+        self.configure(provider, maxsize, ttl)
+
+    def configure(self, provider=None, maxsize=4096, ttl=86400):
+        self.provider = provider
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def normalize(*parts):
+        return ', '.join(re.sub(r'\s+', ' ', str(part)).strip().lower() for part in parts if part)
+
+    def geocode(self, *parts):
+        if self.provider is None:
+            return None
+        address = self.normalize(*parts)
+        if not address:
+            return None
+
+        cached = self._cache.get(address)
+        if cached is not None:
+            return cached or None
+
+        try:
+            coords = self.provider(address)
+        except Exception as e:
+            # Don't cache provider failures; the next checkout retries
+            print(f"Error geocoding '{address}': {e}")
+            return None
+        coords = (float(coords[0]), float(coords[1])) if coords else None
+        self._cache.set(address, coords or False)
+        return coords
+
+
+geocoder = Geocoder()
+
+
+def init_geocoder(app):
+    geocoder.configure(
+        provider=app.config.get('GEOCODER'),
+        maxsize=app.config.get('GEOCODER_CACHE_SIZE', 4096)
+    )
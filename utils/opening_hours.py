@@ -0,0 +1,67 @@
+from functools import lru_cache
+
+MINUTES_PER_DAY = 24 * 60
+ALWAYS_OPEN = ((0, MINUTES_PER_DAY),)
+
+
+def parse_minute(value):
+    """'HH:MM' (or 'HH:MM:SS', '24:00') to minutes past midnight"""
+    parts = value.strip().split(':')
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Invalid time: {value!r}")
+    hours, minutes = int(parts[0]), int(parts[1])
+    if not (0 <= minutes < 60 and 0 <= hours * 60 + minutes <= MINUTES_PER_DAY):
+        raise ValueError(f"Invalid time: {value!r}")
+    return hours * 60 + minutes
+
+
+def _window(open_minute, close_minute):
+    """One opening window as [open, close) intervals within a day; overnight windows are split at midnight"""
+    if open_minute == close_minute or (open_minute, close_minute) == (0, MINUTES_PER_DAY):
+        return [(0, MINUTES_PER_DAY)]
+    if open_minute < close_minute:
+        return [(open_minute, close_minute)]
+    intervals = [(open_minute, MINUTES_PER_DAY)]
+    if close_minute:
+        intervals.insert(0, (0, close_minute))
+    return intervals
+
+
+@lru_cache(maxsize=4096)
+def schedule_intervals(opening_time=None, closing_time=None, opening_hours=None):
+    """Sorted, merged (open_minute, close_minute) intervals for a restaurant's daily hours.
+
+    opening_hours ('11:00-15:00, 18:00-02:00') takes precedence over the
+    single opening_time/closing_time pair. Equal open and close times
+    mean open all day, as does having no hours at all.
+    """
+    windows = []
+    if opening_hours and opening_hours.strip():
+        for window in opening_hours.split(','):
+            if not window.strip():
+                continue
+            start, sep, end = window.partition('-')
+            if not sep:
+                raise ValueError(f"Invalid opening hours: {window.strip()!r}")
+            windows.append((parse_minute(start), parse_minute(end)))
+    elif opening_time and closing_time:
+        windows.append((parse_minute(opening_time), parse_minute(closing_time)))
+    if not windows:
+        return ALWAYS_OPEN
+
+    intervals = sorted(interval for window in windows for interval in _window(*window))
+    merged = [intervals[0]]
+    for start, end in intervals[1:]:
+        if start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def minute_of_day(moment):
+    return moment.hour * 60 + moment.minute
+
+
+def is_open_at(intervals, minute):
+    return any(start <= minute < end for start, end in intervals)
@@ -0,0 +1,105 @@
+import os
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import update, insert
+from sqlalchemy.exc import IntegrityError
+from db import db
+
+
+class OrderNumberAllocator:
+    """Hands out order numbers as ORD + YYYYMMDD + zero-padded daily counter.
+
+    Each process reserves a block of counter values from
+    order_number_sequences with one atomic UPDATE ... RETURNING in its own
+    transaction, then serves numbers from memory. Blocks never overlap, so
+    numbers cannot collide across threads, processes or hosts; unused
+    values in a block are simply skipped. A checkout rollback does not
+    return its numbers, which keeps reserved blocks monotonic.
+
+    On SQLite a second connection cannot write while the request's session
+    holds the write lock, so a block that runs out inside such a
+    transaction is not refilled; one value is taken on the session's own
+    connection instead (see _reserve_in_session).
+    """
+
+    PREFIX = 'ORD'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._day = None
+        self._next = 0
+        self._end = 0
+
+    def _advance(self, conn, day, size):
+        """Move today's counter on by size; the new last value, or None if today has no row yet"""
+        from models.order import OrderNumberSequence
+        return conn.execute(
+            update(OrderNumberSequence)
+            .where(OrderNumberSequence.day == day)
+            .values(next_value=OrderNumberSequence.next_value + size)
+            .returning(OrderNumberSequence.next_value)
+        ).scalar()
+
+    def _reserve_block(self, day, size):
+        from models.order import OrderNumberSequence
+        while True:
+            with db.engine.begin() as conn:
+                end = self._advance(conn, day, size)
+                if end is not None:
+                    return end - size + 1, end
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(insert(OrderNumberSequence).values(day=day, next_value=size))
+                return 1, size
+            except IntegrityError:
+                # Another worker created today's row first; reserve from it
+                continue
+
+    def _session_write_connection(self):
+        """The session's connection if it holds an open SQLite write transaction, else None"""
+        if db.engine.dialect.name != 'sqlite' or db.session().get_transaction() is None:
+            return None
+        conn = db.session.connection()
+        return conn if conn.connection.dbapi_connection.in_transaction else None
+
+    def _reserve_in_session(self, conn, day):
+        """One value taken inside the session's own write transaction.
+
+        It is not cached: if the transaction rolls back the counter goes
+        back with it, and no other caller was ever handed the value.
+        """
+        from models.order import OrderNumberSequence
+        value = self._advance(conn, day, 1)
+        if value is None:
+            # The write lock is ours, so nobody can insert today's row meanwhile
+            conn.execute(insert(OrderNumberSequence).values(day=day, next_value=1))
+            value = 1
+        return value
+
+    def next_number(self):
+        day = datetime.now().date()
+        size = current_app.config.get('ORDER_NUMBER_BLOCK_SIZE', 50)
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: never reuse the parent's block
+                self._reset()
+            conn = None
+            if self._day != day or self._next > self._end:
+                conn = self._session_write_connection()
+                if conn is None:
+                    self._next, self._end = self._reserve_block(day, size)
+                    self._day = day
+            if conn is not None:
+                value = self._reserve_in_session(conn, day)
+            else:
+                value = self._next
+                self._next += 1
+        return f"{self.PREFIX}{day.strftime('%Y%m%d')}{value:06d}"
+
+
+order_numbers = OrderNumberAllocator()
@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import datetime
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import tuple_
+from utils.cache import TTLCache
+
+# Approximate totals: one COUNT(*) per distinct filter per minute
+_count_cache = TTLCache(ttl=60)
+
+
+def encode_cursor(created_at, row_id, direction='next'):
+    """Opaque token for the (created_at, id) position to continue from"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id, direction[0]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """(created_at, id, direction) for a token, or None for an empty or malformed one"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, row_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(created_at) if created_at else None
+        return created_at, int(row_id), 'prev' if direction == 'p' else 'next'
+    except (ValueError, TypeError):
+        return None
+
+
+class KeysetPagination:
+    """One page of a cursor-paginated listing.
+
+    Templates tell the modes apart by `next_cursor is defined`; total is
+    None unless requested (and only approximate with total='approx').
+    """
+
+    def __init__(self, items, per_page, next_cursor, prev_cursor, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.has_next = next_cursor is not None
+        self.has_prev = prev_cursor is not None
+        self.total = total
+
+    def to_dict(self, serialize=None):
+        return {
+            'items': [serialize(item) if serialize else item for item in self.items],
+            'per_page': self.per_page,
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor,
+            'total': self.total
+        }
+
+
+class ListPagination(Pagination):
+    """Offset pagination whose rows come from load_items(offset, limit) and total from load_count()"""
+
+    def _query_items(self):
+        return self._query_args['load_items'](self._query_offset, self.per_page)
+
+    def _query_count(self):
+        return self._query_args['load_count']()
+
+
+def _count(query, total):
+    if not total:
+        return None
+    query = query.order_by(None)
+    if total != 'approx':
+        return query.count()
+    compiled = query.statement.compile()
+    key = (str(compiled), repr(sorted(compiled.params.items())))
+    return _count_cache.get_or_set(key, query.count)
+
+
+def keyset_paginate(query, created_column, id_column, cursor=None, per_page=20, total=False):
+    """Newest-first page of query keyed on (created_at, id).
+
+    Each page is one indexed range scan of per_page + 1 rows, however deep
+    it is; no OFFSET and, unless total is 'exact' or 'approx', no COUNT.
+    The query must not be ordered yet.
+    """
+    position = decode_cursor(cursor)
+    key = tuple_(created_column, id_column)
+    page_query = query
+    backwards = position is not None and position[2] == 'prev'
+    if position is not None:
+        value = tuple_(position[0], position[1])
+        page_query = page_query.filter(key > value if backwards else key < value)
+    if backwards:
+        page_query = page_query.order_by(created_column.asc(), id_column.asc())
+    else:
+        page_query = page_query.order_by(created_column.desc(), id_column.desc())
+
+    rows = page_query.limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def edge(row, direction):
+        return encode_cursor(getattr(row, created_column.key), getattr(row, id_column.key), direction)
+
+    next_cursor = prev_cursor = None
+    if rows:
+        # The extra row means more rows in the direction we read
+        if backwards:
+            next_cursor = edge(rows[-1], 'next')
+            prev_cursor = edge(rows[0], 'prev') if more else None
+        else:
+            next_cursor = edge(rows[-1], 'next') if more else None
+            prev_cursor = edge(rows[0], 'prev') if position is not None else None
+    return KeysetPagination(rows, per_page, next_cursor, prev_cursor, _count(query, total))
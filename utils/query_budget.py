@@ -0,0 +1,47 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request issues more SQL statements than SQL_QUERY_BUDGET allows"""
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_query_count = g.get('sql_query_count', 0) + 1
+
+
+def get_query_count():
+    """Number of SQL statements issued so far in the current request"""
+    return g.get('sql_query_count', 0)
+
+
+def init_query_budget(app):
+    """Count SQL statements per request and enforce SQL_QUERY_BUDGET.
+
+    Over-budget requests are logged; with TESTING or SQL_QUERY_BUDGET_STRICT
+    enabled they raise QueryBudgetExceeded so N+1 regressions fail loudly.
+    A budget of 0 disables the check.
+    """
+    budget = app.config.get('SQL_QUERY_BUDGET', 0)
+    if not budget:
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _count_statement):
+        event.listen(Engine, 'before_cursor_execute', _count_statement)
+
+    @app.before_request
+    def reset_query_count():
+        g.sql_query_count = 0
+
+    @app.after_request
+    def check_query_budget(response):
+        count = get_query_count()
+        response.headers['X-SQL-Query-Count'] = str(count)
+        if count > budget:
+            message = f"{request.method} {request.path} issued {count} SQL statements (budget {budget})"
+            if app.testing or app.config.get('SQL_QUERY_BUDGET_STRICT'):
+                raise QueryBudgetExceeded(message)
+            app.logger.warning(message)
+        return response
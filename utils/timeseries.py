@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from db import db
+
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def bucket_start(value, granularity='day'):
+    """Get the first day of the bucket a date falls into (weeks start on Monday)"""
+    if isinstance(value, datetime):
+        value = value.date()
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def bucket_range(start_date, end_date, granularity='day'):
+    """List every bucket start between two dates (inclusive)"""
+    buckets = []
+    current = bucket_start(start_date, granularity)
+    while current <= end_date:
+        buckets.append(current)
+        if granularity == 'week':
+            current += timedelta(days=7)
+        elif granularity == 'month':
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=1)
+    return buckets
+
+
+def bucket_expression(column, granularity='day'):
+    """SQL expression truncating a date/datetime column to its bucket start"""
+    if db.engine.dialect.name == 'sqlite':
+        if granularity == 'week':
+            return func.date(column, 'weekday 0', '-6 days')
+        if granularity == 'month':
+            return func.strftime('%Y-%m-01', column)
+        return func.date(column)
+    if granularity == 'day':
+        return func.date(column)
+    return func.date(func.date_trunc(granularity, column))
+
+
+def minutes_between(start_column, end_column):
+    """SQL expression for the number of minutes between two datetime columns"""
+    if db.engine.dialect.name == 'sqlite':
+        return (func.julianday(end_column) - func.julianday(start_column)) * 1440
+    return func.extract('epoch', end_column - start_column) / 60
+
+
+def to_date(value):
+    """Normalise a bucket value returned by the database to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def fill_buckets(rows, buckets, fields):
+    """Spread grouped (bucket, *values) rows over the full bucket list.
+
+    Buckets with no row are filled with 0, so a window of N buckets always
+    yields N points regardless of how many rows the query returned.
+    """
+    index = {bucket: position for position, bucket in enumerate(buckets)}
+    columns = {field: [0] * len(buckets) for field in fields}
+    for row in rows:
+        position = index.get(to_date(row[0]))
+        if position is None:
+            continue
+        for field, value in zip(fields, row[1:]):
+            columns[field][position] = value if value is not None else 0
+
+    return [
+        dict({'date': bucket.strftime('%Y-%m-%d')}, **{field: columns[field][i] for field in fields})
+        for i, bucket in enumerate(buckets)
+    ]